@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Register the signal handlers that keep the membership cache, church counters and other derived data up to date
+        from . import signals  # noqa: F401
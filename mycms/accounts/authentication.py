@@ -0,0 +1,64 @@
+import copy
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from .cache import LRUCache
+
+
+_cache_settings = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+
+# Process-local token key -> (user, token) cache. Evictions only reach the process they happen in,
+# so other processes keep a deleted token or deactivated user for up to TIMEOUT: keep it short.
+token_cache = LRUCache(
+    max_size=_cache_settings.get('MAX_SIZE', 1024),
+    timeout=_cache_settings.get('TIMEOUT', 30),
+)
+
+# Optional Django cache alias shared between processes (e.g. Redis/Memcached). When set it replaces the
+# local cache, so evictions reach every process at once.
+SHARED_CACHE_ALIAS = _cache_settings.get('SHARED_CACHE_ALIAS')
+SHARED_CACHE_KEY = 'token_auth:%s'
+
+
+def _get_entry(key):
+    if SHARED_CACHE_ALIAS:
+        return caches[SHARED_CACHE_ALIAS].get(SHARED_CACHE_KEY % key)
+    return token_cache.get(key)
+
+
+def _set_entry(key, entry):
+    if SHARED_CACHE_ALIAS:
+        caches[SHARED_CACHE_ALIAS].set(SHARED_CACHE_KEY % key, entry, token_cache.timeout)
+    else:
+        token_cache.set(key, entry)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication that remembers token -> user lookups,
+    so repeat requests with the same token do not hit the database.
+    Entries are evicted when the token is deleted or its user is saved (e.g. deactivated); see
+    TOKEN_AUTH_CACHE for how long other processes may still accept them.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = _get_entry(key)
+        if entry is None:
+            # Validates the token and that the user is active
+            user, token = super().authenticate_credentials(key)
+            entry = (user, token)
+            _set_entry(key, entry)
+
+        user, token = entry
+        # Each request gets its own copy so per-request changes to the user are not shared
+        return (copy.copy(user), token)
+
+
+def evict_token(*keys):
+    """
+    Drop cached lookups for the given token keys.
+    """
+    for key in keys:
+        token_cache.delete(key)
+    if SHARED_CACHE_ALIAS:
+        caches[SHARED_CACHE_ALIAS].delete_many([SHARED_CACHE_KEY % key for key in keys])
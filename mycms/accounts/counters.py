@@ -0,0 +1,186 @@
+from collections import Counter
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from announcement.models import ChurchAnnouncement
+from choice.views import status_choices
+from church_activity.models import ChurchActivity
+from song.models import ChoirSong
+from .models import (
+    ChurchAccount, ChurchCounters, MemberRegistration, ChoirMemberAccount, ChoirDirectorAccount, SecretaryAccount,
+)
+
+
+COUNTER_FIELDS = tuple(
+    field.name for field in ChurchCounters._meta.concrete_fields if field.name not in ('church', 'updated_at')
+)
+GENDER_PREFIXES = {'Male': 'male', 'Female': 'female'}
+STATUSES = [status for status, _ in status_choices]
+
+# Models whose live rows (is_deleted=False) are counted in a single counter
+SIMPLE_COUNTERS = {
+    ChoirDirectorAccount: 'choir_directors',
+    SecretaryAccount: 'secretaries',
+    ChurchAnnouncement: 'announcements',
+    ChoirSong: 'songs',
+    ChurchActivity: 'activities',
+}
+
+# Fields each tracked model's counters depend on
+TRACKED_FIELDS = {
+    MemberRegistration: ('church_id', 'is_deleted', 'gender', 'status'),
+    ChoirMemberAccount: ('church_id', 'is_deleted', 'member_id'),
+    **{model: ('church_id', 'is_deleted') for model in SIMPLE_COUNTERS},
+}
+
+
+def member_gender(member_id):
+    return MemberRegistration.objects.filter(pk=member_id).values_list('gender', flat=True).first()
+
+
+def counters_for(model, state):
+    """
+    What one row in `state` contributes to its church's counters.
+    """
+    if state is None or state['is_deleted']:
+        return Counter()
+    if model is MemberRegistration:
+        counts = Counter(members=1)
+        if state['gender'] in GENDER_PREFIXES:
+            counts[f"{GENDER_PREFIXES[state['gender']]}_members"] = 1
+        if state['status'] in STATUSES:
+            counts[f"{state['status']}_members"] = 1
+        return counts
+    if model is ChoirMemberAccount:
+        counts = Counter(choir_members=1)
+        gender = member_gender(state['member_id'])
+        if gender in GENDER_PREFIXES:
+            counts[f"{GENDER_PREFIXES[gender]}_choir_members"] = 1
+        return counts
+    return Counter({SIMPLE_COUNTERS[model]: 1})
+
+
+def apply_deltas(deltas, create_missing=True):
+    """
+    Add `deltas` ({church_id: Counter}) to the counters rows with F() increments.
+    A church without a counters row gets one rebuilt from its data instead.
+    """
+    for church_id, delta in deltas.items():
+        changes = {field: F(field) + value for field, value in delta.items() if value}
+        if not changes:
+            continue
+        updated = ChurchCounters.objects.filter(church_id=church_id).update(updated_at=timezone.now(), **changes)
+        if not updated and create_missing:
+            rebuild_counters([church_id])
+
+
+def record_change(model, old_state, new_state, instance=None):
+    """
+    Apply the difference between a row's counters before and after a change.
+    """
+    if old_state == new_state:
+        return
+    deltas = {}
+    if old_state is not None:
+        deltas.setdefault(old_state['church_id'], Counter()).subtract(counters_for(model, old_state))
+    if new_state is not None:
+        deltas.setdefault(new_state['church_id'], Counter()).update(counters_for(model, new_state))
+
+    # A live member changing gender moves their live choir accounts between the gendered choir counters
+    if model is MemberRegistration and old_state and new_state and old_state['gender'] != new_state['gender']:
+        choirs = ChoirMemberAccount.objects.filter(member_id=instance.pk, is_deleted=False).values('church_id').annotate(total=Count('pk'))
+        for row in choirs:
+            delta = deltas.setdefault(row['church_id'], Counter())
+            if old_state['gender'] in GENDER_PREFIXES:
+                delta[f"{GENDER_PREFIXES[old_state['gender']]}_choir_members"] -= row['total']
+            if new_state['gender'] in GENDER_PREFIXES:
+                delta[f"{GENDER_PREFIXES[new_state['gender']]}_choir_members"] += row['total']
+
+    apply_deltas(deltas, create_missing=new_state is not None)
+
+
+def _grouped(queryset, **aggregates):
+    return {
+        row.pop('church_id'): row
+        for row in queryset.order_by().values('church_id').annotate(**aggregates)
+    }
+
+
+def compute_counters(church_ids=None):
+    """
+    Count every counter from the tables, keyed by church id.
+    """
+    def live(model):
+        queryset = model.objects.filter(is_deleted=False)
+        if church_ids is not None:
+            queryset = queryset.filter(church_id__in=church_ids)
+        return queryset
+
+    churches = ChurchAccount.all_objects.all()
+    if church_ids is not None:
+        churches = churches.filter(pk__in=church_ids)
+    counters = {church_id: dict.fromkeys(COUNTER_FIELDS, 0) for church_id in churches.values_list('pk', flat=True)}
+
+    grouped = [
+        _grouped(
+            live(MemberRegistration),
+            members=Count('pk'),
+            male_members=Count('pk', filter=Q(gender='Male')),
+            female_members=Count('pk', filter=Q(gender='Female')),
+            **{f"{status}_members": Count('pk', filter=Q(status=status)) for status in STATUSES},
+        ),
+        _grouped(
+            live(ChoirMemberAccount),
+            choir_members=Count('pk'),
+            male_choir_members=Count('pk', filter=Q(member__gender='Male')),
+            female_choir_members=Count('pk', filter=Q(member__gender='Female')),
+        ),
+    ]
+    grouped += [_grouped(live(model), **{field: Count('pk')}) for model, field in SIMPLE_COUNTERS.items()]
+
+    for rows in grouped:
+        for church_id, values in rows.items():
+            if church_id in counters:
+                counters[church_id].update(values)
+    return counters
+
+
+def rebuild_counters(church_ids=None):
+    """
+    Recount the counters of the given churches (all churches by default) and store them.
+    Returns {church_id: {field: (stored, counted)}} for every counter that had drifted.
+    """
+    counted = compute_counters(church_ids)
+    stored = ChurchCounters.objects.in_bulk(list(counted))
+
+    drift, rows = {}, []
+    for church_id, values in counted.items():
+        current = stored.get(church_id)
+        changed = {
+            field: (getattr(current, field) if current else None, value)
+            for field, value in values.items()
+            if current is None or getattr(current, field) != value
+        }
+        if changed:
+            drift[church_id] = changed
+            rows.append(ChurchCounters(church_id=church_id, updated_at=timezone.now(), **values))
+
+    ChurchCounters.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['church'],
+        update_fields=[*COUNTER_FIELDS, 'updated_at'],
+    )
+    return drift
+
+
+def get_church_counters(church_id):
+    """
+    The counters row of a church, rebuilt first if it does not exist yet.
+    """
+    try:
+        return ChurchCounters.objects.get(church_id=church_id)
+    except ChurchCounters.DoesNotExist:
+        rebuild_counters([church_id])
+        return ChurchCounters.objects.get(church_id=church_id)
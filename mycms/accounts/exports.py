@@ -0,0 +1,122 @@
+import csv
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+
+# Rows fetched per database round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer produces strings to stream.
+    """
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Selects `?format=csv`. Exports stream their own response; this only renders
+    the error responses (e.g. permission denied) of a CSV request.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        writer = csv.writer(Echo())
+        lines = []
+        if rows and isinstance(rows[0], dict):
+            lines.append(writer.writerow(rows[0].keys()))
+            lines.extend(writer.writerow(row.values()) for row in rows)
+        return "".join(lines).encode(self.charset)
+
+
+class JSONLinesRenderer(BaseRenderer):
+    """
+    Selects `?format=jsonl` (one JSON object per line); renders error responses like CSVRenderer.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows).encode(self.charset)
+
+
+EXPORT_RENDERERS = {renderer.format: renderer for renderer in (CSVRenderer, JSONLinesRenderer)}
+
+
+def export_value(value):
+    """
+    A value as both export formats write it, so CSV and JSON lines agree: datetimes in ISO 8601 in the
+    current time zone with UTC as 'Z' (as the API renders them), dates and times in ISO 8601 and decimals
+    as exact strings.
+    """
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([export_value(value) for value in row])
+
+
+def jsonl_lines(rows, fields):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode({field: export_value(value) for field, value in zip(fields, row)}) + "\n"
+
+
+def stream_export(queryset, fields, export_format, filename):
+    """
+    Stream `fields` of every row of the queryset as CSV or JSON lines.
+    Rows come from a values_list() iterator, so memory use does not grow with the table.
+    """
+    rows = queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    lines = csv_lines(rows, fields) if export_format == 'csv' else jsonl_lines(rows, fields)
+    renderer = EXPORT_RENDERERS[export_format]
+    response = StreamingHttpResponse(lines, content_type=f"{renderer.media_type}; charset={renderer.charset}")
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+class ExportMixin:
+    """
+    List view mixin adding `?format=csv` and `?format=jsonl` exports of the whole (unpaginated) queryset.
+    Views list the exported columns in `export_fields`, as values() lookups (e.g. 'member__full_name').
+    """
+    export_fields = ()
+    export_filename = 'export'
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, JSONLinesRenderer]
+
+    def list(self, request, *args, **kwargs):
+        export_format = request.accepted_renderer.format
+        if export_format not in EXPORT_RENDERERS:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_queryset()
+        if not queryset.query.order_by:
+            queryset = queryset.order_by('pk')
+        return stream_export(queryset, self.export_fields, export_format, self.export_filename)
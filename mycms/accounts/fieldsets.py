@@ -0,0 +1,68 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def readable_fields(fields):
+    """
+    Names of the fields a serializer renders, in declaration order.
+    """
+    return [name for name, field in fields.items() if not field.write_only]
+
+
+def select_fields(request, available, default=None):
+    """
+    The fields to render out of `available`, from `?fields=` (a comma-separated list, or `*` for all)
+    and `?omit=`. Without `?fields=`, `default` (or every field) is rendered.
+    """
+    params = request.query_params
+    errors = {}
+
+    requested = parse_field_names(params.get('fields', ''))
+    if '*' in requested:
+        selected = list(available)
+    elif requested:
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            errors['fields'] = [f"Unknown field(s): {', '.join(unknown)}."]
+        selected = [name for name in available if name in requested]
+    elif default is not None:
+        selected = [name for name in available if name in default]
+    else:
+        selected = list(available)
+
+    omitted = parse_field_names(params.get('omit', ''))
+    unknown = [name for name in omitted if name not in available]
+    if unknown:
+        errors['omit'] = [f"Unknown field(s): {', '.join(unknown)}."]
+    if errors:
+        raise ValidationError(errors)
+    return [name for name in selected if name not in omitted]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin rendering only the fields a GET request asks for with `?fields=` / `?omit=`.
+    List views using SerializerRelatedMixin resolve the selection themselves (it also narrows their
+    SQL) and pass it as context['fields']. Only the top-level serializer is narrowed, never nested ones.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        # The child of a many=True list serializer renders the list's items
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+
+        selected = self.context.get('fields')
+        if selected is None:
+            request = self.context.get('request')
+            if request is None or request.method != 'GET':
+                return fields
+            selected = select_fields(request, readable_fields(fields))
+        return {name: field for name, field in fields.items() if field.write_only or name in selected}
@@ -0,0 +1,125 @@
+import csv
+import datetime
+import io
+from itertools import islice
+
+from django.db import transaction
+from django_countries import countries
+from rest_framework import serializers
+
+from .counters import rebuild_counters
+from .models import ChurchDepartment, MemberRegistration
+from .search import index_members
+from .serializers import MemberImportSerializer
+
+
+# Rows validated and inserted together; bounds memory whatever the file size
+IMPORT_CHUNK_SIZE = 500
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+
+def read_csv(upload):
+    """
+    Yield each row of an uploaded CSV file as a dict, reading the file lazily.
+    """
+    text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Leave the upload open for Django to clean up
+        text.detach()
+
+
+def read_xlsx(upload):
+    """
+    Yield each row of the first sheet of an uploaded XLSX file as a dict, in openpyxl's streaming mode.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise serializers.ValidationError({"file": ["XLSX import requires the openpyxl package; upload a CSV file instead."]})
+
+    workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def clean_row(row, country_codes):
+    """
+    Normalize spreadsheet values: trim text, turn dates/datetimes into dates and country names into codes.
+    """
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(' ', '_')
+        if isinstance(value, datetime.datetime):
+            value = value.date()
+        elif isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (int, float)) and key == 'phone_number':
+            value = str(int(value))
+        cleaned[key] = value
+    nationality = cleaned.get('nationality')
+    if isinstance(nationality, str) and len(nationality) > 3:
+        cleaned['nationality'] = country_codes.get(nationality.lower(), nationality)
+    return cleaned
+
+
+def import_members(upload, church_id, file_format):
+    """
+    Validate and insert the members of an uploaded spreadsheet in chunks.
+    Valid rows are created, invalid rows are reported with their row number (the header is row 1).
+    """
+    reader = read_xlsx(upload) if file_format == 'xlsx' else read_csv(upload)
+
+    departments = {}
+    for department in ChurchDepartment.objects.filter(church_id=church_id, is_deleted=False):
+        departments[str(department.pk)] = department
+        departments[department.name.lower()] = department
+    serializer = MemberImportSerializer(context={"church_id": church_id, "departments": departments})
+    # countries.by_name() scans every country, so names are mapped once per import
+    country_codes = {str(name).lower(): code for code, name in countries}
+
+    created, errors, seen_emails = 0, [], set()
+    rows = enumerate(reader, start=2)
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            chunk = [(number, clean_row(row, country_codes)) for number, row in chunk]
+
+            # One query for the emails of the whole chunk
+            emails = {row.get('email') for _, row in chunk if row.get('email')}
+            taken = set(MemberRegistration.objects.filter(email__in=emails).values_list('email', flat=True))
+
+            members = []
+            for number, row in chunk:
+                try:
+                    data = serializer.run_validation(row)
+                except serializers.ValidationError as exc:
+                    errors.append({"row": number, "errors": exc.detail})
+                    continue
+                if data['email'] in taken or data['email'] in seen_emails:
+                    errors.append({"row": number, "errors": {"email": ["member registration with this email already exists."]}})
+                    continue
+                seen_emails.add(data['email'])
+                members.append(MemberRegistration(church_id=church_id, **data))
+
+            members = MemberRegistration.objects.bulk_create(members)
+            index_members(members)
+            created += len(members)
+
+        # bulk_create skips the signals that maintain the church counters
+        if created:
+            rebuild_counters([church_id])
+
+    return {"created": created, "failed": len(errors), "errors": errors}
@@ -0,0 +1,276 @@
+import datetime
+import json
+import logging
+import statistics
+import time
+import warnings
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.test import APIClient
+
+from accounts.authentication import token_cache
+from accounts.membership import membership_cache
+from accounts.models import ChurchAccount, ChoirDirectorAccount, MemberRegistration, SecretaryAccount
+from attendance.models import ChoirAttendance
+from due.models import ChoirDue
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+
+# URL prefixes that are not part of the API
+EXCLUDED_PREFIXES = ('admin/', 'api-auth/', 'media/', 'static/')
+
+# Detail views that declare neither a queryset nor a serializer_class
+DETAIL_MODELS = {
+    'ChurchAccountDeleteView': ChurchAccount,
+    'SecretaryAccountDeleteView': SecretaryAccount,
+    'ChoirDirectorAccountDetailAPIView': ChoirDirectorAccount,
+    'ChoirDirectorAccountUpdateDeleteAPIView': ChoirDirectorAccount,
+}
+
+# Routes that need more than a primary key: route -> Command method building the request from the church's rows.
+# The POST routes are idempotent, so requests repeating the seeded rows write nothing.
+ROUTE_REQUESTS = {
+    'api/members/search/': 'member_search_request',
+    'api/sync/<str:resource>/': 'sync_request',
+    'attendance/api/choir/attendance/roll-call/': 'roll_call_request',
+    'attendance/api/choir/attendance/rates/': 'attendance_rates_request',
+    'due/api/generate/choir-dues/': 'generate_dues_request',
+}
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every GET endpoint in mycms/urls.py (and the idempotent POST endpoints in ROUTE_REQUESTS) "
+        "with an in-process client and compare p50/p95 latency, "
+        "query count and response size with a checked-in baseline. Run it against a seeded database (see seed_load)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, help="Church id whose admin makes the requests (defaults to the church with the most members).")
+        parser.add_argument('--user', help="Username to make the requests as, instead of the church admin.")
+        parser.add_argument('--repeat', type=int, default=20, help="Number of timed requests per endpoint.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Path of the baseline JSON file.")
+        parser.add_argument('--update-baseline', action='store_true', help="Write the results to the baseline file instead of comparing.")
+        parser.add_argument('--filter', default='', help="Only benchmark routes containing this text.")
+        parser.add_argument('--latency-tolerance', type=float, default=0.5, help="Allowed p95 growth over the baseline, as a fraction.")
+        parser.add_argument('--latency-floor', type=float, default=5.0, help="p95 growth in ms that is always allowed (timer noise).")
+        parser.add_argument('--size-tolerance', type=float, default=0.1, help="Allowed response size growth, as a fraction.")
+        parser.add_argument('--query-slack', type=int, default=0, help="Extra queries allowed over the baseline.")
+
+    def handle(self, *args, **options):
+        # Lets the test client through ALLOWED_HOSTS
+        setup_test_environment()
+
+        church = self.get_church(options['church'])
+        user = User.objects.get(username=options['user']) if options['user'] else church.church_admin
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        # 4xx responses are recorded, not logged, and pagination warnings would repeat for every request
+        request_logger = logging.getLogger('django.request')
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        results = {}
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for route, view_class in self.collect_routes():
+                    if options['filter'] not in route:
+                        continue
+                    if route in ROUTE_REQUESTS:
+                        request = getattr(self, ROUTE_REQUESTS[route])(route, church)
+                    else:
+                        url = self.build_url(route, view_class, church)
+                        request = None if url is None else ('get', url, None)
+                    if request is None:
+                        self.stdout.write(self.style.WARNING(f"skipped {route}: no row to request"))
+                        continue
+                    results[route] = self.measure(client, *request, options['repeat'])
+        finally:
+            request_logger.setLevel(log_level)
+
+        self.report(results)
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline = {
+                'church_members': MemberRegistration.objects.filter(church=church).count(),
+                'repeat': options['repeat'],
+                'endpoints': results,
+            }
+            baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            return
+
+        if not baseline_path.exists():
+            raise CommandError(f"No baseline at {baseline_path}. Create one with --update-baseline.")
+        failures = self.compare(results, json.loads(baseline_path.read_text())['endpoints'], options)
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} endpoint budget(s) exceeded.")
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget."))
+
+    def get_church(self, church_id):
+        if church_id:
+            try:
+                return ChurchAccount.objects.get(pk=church_id)
+            except ChurchAccount.DoesNotExist:
+                raise CommandError(f"Church {church_id} does not exist.")
+        church = ChurchAccount.objects.annotate(members=Count('church')).order_by('-members').first()
+        if church is None:
+            raise CommandError("No church data found. Seed the database first.")
+        return church
+
+    def collect_routes(self, patterns=None, prefix=''):
+        """
+        Yield (route, view class) for every URL pattern whose view answers GET, and for the routes in ROUTE_REQUESTS.
+        """
+        if patterns is None:
+            patterns = get_resolver().url_patterns
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if route.startswith(EXCLUDED_PREFIXES):
+                continue
+            if isinstance(pattern, URLResolver):
+                yield from self.collect_routes(pattern.url_patterns, route)
+            elif isinstance(pattern, URLPattern):
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if view_class is not None and (hasattr(view_class, 'get') or route in ROUTE_REQUESTS):
+                    yield route, view_class
+
+    def build_url(self, route, view_class, church):
+        """
+        Fill a route's <int:pk> with a row of the benchmarked church.
+        """
+        if '<int:pk>' not in route:
+            return '/' + route
+        model = self.get_model(view_class)
+        if model is None:
+            return None
+        if model is ChurchAccount:
+            pk = church.pk
+        else:
+            pk = model.objects.filter(church=church, is_deleted=False).values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        return '/' + route.replace('<int:pk>', str(pk))
+
+    def get_model(self, view_class):
+        if getattr(view_class, 'queryset', None) is not None:
+            return view_class.queryset.model
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        if serializer_class is not None:
+            return serializer_class.Meta.model
+        return DETAIL_MODELS.get(view_class.__name__)
+
+    def member_search_request(self, route, church):
+        full_name = MemberRegistration.objects.filter(church=church, is_deleted=False).values_list('full_name', flat=True).first()
+        if not full_name:
+            return None
+        return 'get', '/' + route, {'q': full_name.split()[0]}
+
+    def sync_request(self, route, church):
+        return 'get', '/' + route.replace('<str:resource>', 'members'), None
+
+    def roll_call_request(self, route, church):
+        """
+        Resubmit the church's latest roll call as it was recorded.
+        """
+        latest = ChoirAttendance.objects.filter(church=church, is_deleted=False).order_by('-date').values('activities_id', 'date').first()
+        if latest is None:
+            return None
+        records = ChoirAttendance.objects.filter(
+            church=church, is_deleted=False, activities_id=latest['activities_id'], date=latest['date'],
+        ).values_list('choir_id', 'is_present')
+        return 'post', '/' + route, {
+            'activity': latest['activities_id'],
+            'date': latest['date'].isoformat(),
+            'present': sorted({choir_id for choir_id, is_present in records if is_present}),
+            'absent': sorted({choir_id for choir_id, is_present in records if not is_present}),
+        }
+
+    def attendance_rates_request(self, route, church):
+        """
+        The default 90-day window, ending at the church's latest attendance instead of today.
+        """
+        end = ChoirAttendance.objects.filter(church=church, is_deleted=False).order_by('-date').values_list('date', flat=True).first()
+        if end is None:
+            return None
+        start = end - datetime.timedelta(days=89)
+        return 'get', '/' + route, {'start': start.isoformat(), 'end': end.isoformat()}
+
+    def generate_dues_request(self, route, church):
+        """
+        Generate the church's latest month of dues again.
+        """
+        due = ChoirDue.objects.filter(church=church, is_deleted=False).order_by('-period').values('month', 'year', 'amount_due').first()
+        if due is None:
+            return None
+        return 'post', '/' + route, {'month': due['month'], 'year': due['year'], 'amount_due': str(due['amount_due'])}
+
+    def measure(self, client, method, url, data, repeat):
+        # Start cold so the warm-up request includes the membership/token lookups, then time warm requests
+        membership_cache.clear()
+        token_cache.clear()
+        if method == 'get':
+            send = partial(client.get, url, data)
+        else:
+            send = partial(client.post, url, data, format='json')
+        response = send()
+
+        samples = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = send()
+                samples.append((time.perf_counter() - start) * 1000)
+        return {
+            'status': response.status_code,
+            'queries': len(context.captured_queries),
+            'p50_ms': round(statistics.median(samples), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'bytes': len(response.content),
+        }
+
+    def report(self, results):
+        self.stdout.write(f"{'endpoint':<60} {'status':>6} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>9}")
+        for route, result in results.items():
+            self.stdout.write(
+                f"{route:<60} {result['status']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['bytes']:>9}"
+            )
+
+    def compare(self, results, baseline, options):
+        failures = []
+        for route, result in results.items():
+            expected = baseline.get(route)
+            if expected is None:
+                self.stdout.write(self.style.WARNING(f"{route} is not in the baseline"))
+                continue
+            if result['status'] != expected['status']:
+                failures.append(f"{route}: status {result['status']}, baseline {expected['status']}")
+            if result['queries'] > expected['queries'] + options['query_slack']:
+                failures.append(f"{route}: {result['queries']} queries, baseline {expected['queries']}")
+            latency_budget = expected['p95_ms'] * (1 + options['latency_tolerance']) + options['latency_floor']
+            if result['p95_ms'] > latency_budget:
+                failures.append(f"{route}: p95 {result['p95_ms']:.2f} ms, budget {latency_budget:.2f} ms")
+            size_budget = expected['bytes'] * (1 + options['size_tolerance'])
+            if result['bytes'] > size_budget:
+                failures.append(f"{route}: {result['bytes']} bytes, budget {size_budget:.0f} bytes")
+        return failures
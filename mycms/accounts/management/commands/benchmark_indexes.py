@@ -0,0 +1,115 @@
+import datetime
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max
+
+from accounts.models import MemberRegistration
+from announcement.models import ChurchAnnouncement
+from attendance.models import ChurchServiceAttendance, ChoirAttendance
+from due.models import ChoirDue
+from expenditure.models import ChurchExpenditure
+from song.models import ChoirSong
+from tithe.models import ChurchTithe
+
+
+# (model, ordering field, whether it has a month `period` column)
+BENCHMARKED_MODELS = [
+    (MemberRegistration, '-created_at', False),
+    (ChurchTithe, '-created_at', True),
+    (ChurchExpenditure, '-created_at', True),
+    (ChoirDue, '-created_at', True),
+    (ChoirSong, '-created_at', False),
+    (ChurchAnnouncement, '-created_at', False),
+    (ChurchServiceAttendance, '-date_recorded', True),
+    (ChoirAttendance, '-date_recorded', True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Show query plans and latency of the church-scoped list queries with and without "
+        "the composite/partial church indexes. Run it against a seeded database (see seed_load), never production: "
+        "the indexes are dropped and rebuilt. It only runs with DEBUG on or --i-know."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, help="Church id to query (defaults to the church with the most tithes).")
+        parser.add_argument('--repeat', type=int, default=20, help="Number of timed runs per query.")
+        parser.add_argument('--no-plans', action='store_true', help="Only print latencies, not query plans.")
+        parser.add_argument('--i-know', action='store_true', help="Run with DEBUG off, knowing the indexes of this database are dropped and rebuilt.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['i_know']:
+            raise CommandError(
+                "This drops and rebuilds the indexes of the configured database, locking its tables meanwhile. "
+                "Run it on a copy with DEBUG on, or pass --i-know."
+            )
+
+        church_id = options['church'] or self.busiest_church()
+        if church_id is None:
+            raise CommandError("No church data found. Seed the database first.")
+
+        queries = self.build_queries(church_id)
+
+        # "Before": temporarily drop the indexes, then recreate them
+        indexes = [(model, index) for model, _, _ in BENCHMARKED_MODELS for index in model._meta.indexes]
+        with connection.schema_editor() as schema_editor:
+            for model, index in indexes:
+                schema_editor.remove_index(model, index)
+        try:
+            before = self.run(queries, 'before', options)
+        finally:
+            with connection.schema_editor() as schema_editor:
+                for model, index in indexes:
+                    schema_editor.add_index(model, index)
+
+        after = self.run(queries, 'after', options)
+
+        self.stdout.write("")
+        self.stdout.write(f"{'query':<55} {'before (ms)':>12} {'after (ms)':>12}")
+        for name in queries:
+            self.stdout.write(f"{name:<55} {before[name]:>12.2f} {after[name]:>12.2f}")
+
+    def busiest_church(self):
+        row = (
+            ChurchTithe.objects.values('church_id')
+            .annotate(total=Count('id'))
+            .order_by('-total')
+            .first()
+        )
+        return row['church_id'] if row else None
+
+    def build_queries(self, church_id):
+        """
+        The queries the list endpoints run: a page of live rows in display order, and the rows of the last six months.
+        """
+        queries = {}
+        for model, ordering, has_period in BENCHMARKED_MODELS:
+            name = model.__name__
+            queries[f"{name} page"] = (
+                model.objects.filter(church_id=church_id, is_deleted=False).order_by(ordering)[:10]
+            )
+            if has_period:
+                latest = model.objects.filter(church_id=church_id).aggregate(latest=Max('period'))['latest']
+                if latest:
+                    start = datetime.date(latest.year - (latest.month <= 5), (latest.month - 6) % 12 + 1, 1)
+                    queries[f"{name} period"] = model.objects.filter(church_id=church_id, period__range=(start, latest))
+        return queries
+
+    def run(self, queries, label, options):
+        timings = {}
+        for name, queryset in queries.items():
+            if not options['no_plans']:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"[{label}] {name}"))
+                self.stdout.write(queryset.explain())
+            samples = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(queryset.all())
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(samples)
+        return timings
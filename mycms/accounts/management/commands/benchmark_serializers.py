@@ -0,0 +1,105 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import ChurchAccount, MemberRegistration
+from accounts.prefetch import optimize_for_serializer
+from accounts.renderers import ORJSONRenderer
+from accounts.serializers import MemberRegistrationSerializer
+from accounts.values import build_rows, values_mapping
+from attendance.models import ChurchServiceAttendance
+from attendance.serializers import ChurchServiceAttendanceSerializer
+from due.models import ChoirDue
+from due.serializers import ChoirDueSerializer
+from expenditure.models import ChurchExpenditure
+from expenditure.serializers import ExpenditureSerializer
+from tithe.models import ChurchTithe
+from tithe.serializers import TitheSerializer
+
+
+# The list endpoints served by ValuesListMixin: name -> (model, serializer)
+LISTS = {
+    'members': (MemberRegistration, MemberRegistrationSerializer),
+    'tithes': (ChurchTithe, TitheSerializer),
+    'dues': (ChoirDue, ChoirDueSerializer),
+    'attendance': (ChurchServiceAttendance, ChurchServiceAttendanceSerializer),
+    'expenditures': (ChurchExpenditure, ExpenditureSerializer),
+}
+
+
+def timed(function, repeat):
+    """
+    Median wall time of `function` in milliseconds, and its last result.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ModelSerializer + JSONRenderer read path of the list endpoints with the "
+        "values() + ORJSONRenderer one (accounts.values) at several page sizes, and check both give the same JSON. "
+        "Run it against a seeded database (see seed_load)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, help="Church whose rows are listed (defaults to the church with the most members).")
+        parser.add_argument('--sizes', default='10,100,1000', help="Comma-separated page sizes.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per path and page size (the median is reported).")
+        parser.add_argument('--only', choices=sorted(LISTS), action='append', help="Benchmark only this list; repeat for several.")
+
+    def handle(self, *args, **options):
+        church_id = options['church'] or (
+            ChurchAccount.objects.annotate(total=Count('church')).order_by('-total').values_list('pk', flat=True).first()
+        )
+        if church_id is None:
+            raise CommandError("No church to benchmark; seed one with `manage.py seed_load`.")
+        sizes = [int(size) for size in options['sizes'].split(',')]
+
+        self.stdout.write(
+            f"{'list':<13} {'rows':>5} {'serializer ms':>14} {'values ms':>10} {'speedup':>8} "
+            f"{'render ms':>10} {'orjson ms':>10} {'speedup':>8} {'total x':>8}"
+        )
+        mismatches = []
+        for name in options['only'] or LISTS:
+            model, serializer_class = LISTS[name]
+            mapping = values_mapping(serializer_class, model)
+            if mapping is None:
+                self.stdout.write(self.style.WARNING(f"{name}: {serializer_class.__name__} cannot be mapped to values()"))
+                continue
+            queryset = model.objects.filter(church_id=church_id).order_by('-pk')
+            lookups = [lookup for _, lookup, _ in mapping]
+
+            for size in sizes:
+                def serialize():
+                    rows = optimize_for_serializer(queryset, serializer_class)[:size]
+                    return serializer_class(rows, many=True).data
+
+                def build():
+                    return build_rows(queryset.values(*lookups)[:size], mapping)
+
+                serializer_ms, serialized = timed(serialize, options['repeat'])
+                values_ms, built = timed(build, options['repeat'])
+                render_ms, rendered = timed(lambda: JSONRenderer().render(serialized), options['repeat'])
+                orjson_ms, fast = timed(lambda: ORJSONRenderer().render(built), options['repeat'])
+
+                if json.loads(rendered) != json.loads(fast):
+                    mismatches.append(f"{name} ({size} rows)")
+                rows = len(serialized)
+                self.stdout.write(
+                    f"{name:<13} {rows:>5} {serializer_ms:>14.2f} {values_ms:>10.2f} {serializer_ms / values_ms:>7.1f}x "
+                    f"{render_ms:>10.2f} {orjson_ms:>10.2f} {render_ms / orjson_ms:>7.1f}x "
+                    f"{(serializer_ms + render_ms) / (values_ms + orjson_ms):>7.1f}x"
+                )
+
+        if mismatches:
+            raise CommandError(f"The two paths give different output for: {', '.join(mismatches)}")
+        self.stdout.write(self.style.SUCCESS("Both paths give the same output."))
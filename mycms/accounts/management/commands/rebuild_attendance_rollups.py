@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from attendance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the weekly, monthly and yearly service attendance rollups from the attendance rows (backfill, or after writes that skip signals)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, action='append', help="Church id to rebuild; repeat for several (defaults to all churches).")
+
+    def handle(self, *args, **options):
+        total = rebuild_rollups(options['church'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} rollup row(s)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from accounts.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the per-church counters (ChurchCounters) from the tables and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, action='append', help="Church id to rebuild; repeat for several (defaults to all churches).")
+
+    def handle(self, *args, **options):
+        drift = rebuild_counters(options['church'])
+        for church_id, fields in sorted(drift.items()):
+            changes = ", ".join(f"{field} {stored} -> {counted}" for field, (stored, counted) in fields.items())
+            self.stdout.write(f"Church {church_id}: {changes}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters, {len(drift)} church(es) had drifted."))
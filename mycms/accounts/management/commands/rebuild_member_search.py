@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.search import rebuild_member_search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the trigram index of the fuzzy member search (after bulk inserts or updates that skip signals)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--church', type=int, action='append', help="Church id to reindex; repeat for several (defaults to all churches).")
+
+    def handle(self, *args, **options):
+        total = rebuild_member_search(options['church'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} member(s)."))
@@ -0,0 +1,306 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.counters import rebuild_counters
+from accounts.search import rebuild_member_search
+from attendance.rollups import rebuild_rollups
+from accounts.models import (
+    ChurchAccount, ChurchDepartment, MemberRegistration, ChoirDirectorAccount, ChoirMemberAccount, SecretaryAccount,
+)
+from announcement.models import ChurchAnnouncement
+from attendance.models import ChurchServiceAttendance, ChoirAttendance
+from choice.views import month_choices, days_of_week_choices, expense_types_choices
+from church_activity.models import ChurchActivity
+from due.models import ChoirDue
+from expenditure.models import ChurchExpenditure
+from song.models import ChoirSong
+from tithe.models import ChurchTithe
+
+
+MONTHS = [month for month, _ in month_choices]
+DAYS = [day for day, _ in days_of_week_choices]
+EXPENSE_TYPES = [expense_type for expense_type, _ in expense_types_choices]
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patience', 'Joseph', 'Grace', 'Samuel', 'Esther', 'David', 'Ruth',
+               'Emmanuel', 'Comfort', 'Moses', 'Hannah', 'Peter', 'Faith', 'Daniel', 'Mercy', 'Paul', 'Blessing']
+LAST_NAMES = ['Johnson', 'Kollie', 'Doe', 'Tarr', 'Sirleaf', 'Weah', 'Cooper', 'Flomo', 'Kamara', 'Togba',
+              'Mensah', 'Boakai', 'Gbowee', 'Harris', 'Nyenpan', 'Sumo', 'Kpoto', 'Dennis', 'Brownell', 'Zinnah']
+# Last day of the seeded history unless --end-date says otherwise: fixed, so a seed gives the same data any day
+DEFAULT_END_DATE = datetime.date(2026, 6, 30)
+WORDS = ['grace', 'glory', 'praise', 'mercy', 'light', 'shepherd', 'river', 'mountain', 'heaven', 'hope',
+         'faith', 'love', 'peace', 'joy', 'throne', 'lamb', 'king', 'cross', 'word', 'spirit']
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic synthetic dataset (churches, members, choir accounts and years of "
+        "tithes, dues, attendance and expenditures) for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--churches', type=int, default=2, help="Number of churches to create.")
+        parser.add_argument('--members', type=int, default=2000, help="Members per church.")
+        parser.add_argument('--choir-members', type=int, default=60, help="Choir member accounts per church.")
+        parser.add_argument('--years', type=int, default=3, help="Years of history per church, ending in the year of --end-date.")
+        parser.add_argument(
+            '--end-date', type=datetime.date.fromisoformat, default=DEFAULT_END_DATE,
+            help=f"Last day of the seeded history, YYYY-MM-DD ({DEFAULT_END_DATE} by default).",
+        )
+        parser.add_argument('--songs', type=int, default=300, help="Songs per church.")
+        parser.add_argument('--announcements', type=int, default=200, help="Announcements per church.")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed; the same seed and --end-date on the same database give the same data.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per bulk_create batch.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Hashing is slow, so every seeded user shares one password hash
+        self.password = make_password('password')
+        self.totals = {}
+
+        self.end_date = options['end_date']
+        end_year = self.end_date.year
+        self.years = list(range(end_year - options['years'] + 1, end_year + 1))
+
+        # Continue numbering after existing churches so the command can be run more than once
+        offset = ChurchAccount.all_objects.count()
+        for number in range(offset, offset + options['churches']):
+            with transaction.atomic():
+                church = self.seed_church(number, options)
+                # bulk_create skips the signals that maintain the counters, the member search index and the attendance rollups
+                rebuild_counters([church.pk])
+                rebuild_member_search([church.pk])
+                rebuild_rollups([church.pk])
+            self.stdout.write(f"Seeded church {number + 1 - offset}/{options['churches']}")
+
+        for name, total in self.totals.items():
+            self.stdout.write(f"{name}: {total}")
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def bulk_create(self, model, objs):
+        """
+        Insert rows in batches. bulk_create skips the models' save() overrides,
+        so derived fields are computed by the caller.
+        """
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.totals[model.__name__] = self.totals.get(model.__name__, 0) + len(created)
+        return created
+
+    def create_users(self, prefix, count):
+        self.bulk_create(User, [
+            User(username=f"{prefix}{i}@seed.example", email=f"{prefix}{i}@seed.example", password=self.password)
+            for i in range(count)
+        ])
+        # Primary keys are not returned by bulk_create on every database
+        return list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+    def seed_church(self, number, options):
+        rnd = self.random
+        prefix = f"seed{number}-"
+
+        admin = self.create_users(f"{prefix}admin-", 1)[0]
+        church = ChurchAccount.objects.create(
+            church_name=f"Seed Church {number}",
+            address=f"{rnd.randint(1, 999)} Broad Street",
+            phone_number=self.phone(),
+            email=f"{prefix}church@seed.example",
+            church_admin=admin,
+        )
+        self.totals['ChurchAccount'] = self.totals.get('ChurchAccount', 0) + 1
+
+        self.bulk_create(ChurchDepartment, [
+            ChurchDepartment(church=church, name=name)
+            for name in ['Ushers', 'Choir', 'Youth', 'Women', 'Men', 'Sunday School']
+        ])
+        departments = list(ChurchDepartment.objects.filter(church=church))
+
+        self.bulk_create(MemberRegistration, [
+            MemberRegistration(
+                church=church,
+                full_name=f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                gender=rnd.choice(['Male', 'Female']),
+                date_of_birth=datetime.date(rnd.randint(1950, 2010), rnd.randint(1, 12), rnd.randint(1, 28)),
+                phone_number=self.phone(),
+                email=f"{prefix}member{i}@seed.example",
+                nationality=rnd.choice(['LR', 'GH', 'NG', 'SL', 'US']),
+                address=f"{rnd.randint(1, 999)} Tubman Boulevard",
+                department=rnd.choice(departments),
+                status=rnd.choices(['active', 'inactive', 'dropped', 'deceased'], weights=[85, 8, 5, 2])[0],
+                is_deleted=rnd.random() < 0.03,
+            )
+            for i in range(options['members'])
+        ])
+        members = list(MemberRegistration.objects.filter(church=church).order_by('id'))
+
+        # Leadership and choir accounts are drawn from distinct members
+        leaders = rnd.sample(members, min(len(members), options['choir_members'] + 3))
+        secretary_users = self.create_users(f"{prefix}secretary-", 2)
+        self.bulk_create(SecretaryAccount, [
+            SecretaryAccount(user=user, member=member, church=church)
+            for user, member in zip(secretary_users, leaders[0:2])
+        ])
+        director_user = self.create_users(f"{prefix}director-", 1)[0]
+        self.bulk_create(ChoirDirectorAccount, [ChoirDirectorAccount(user=director_user, member=leaders[2], church=church)])
+        choir_users = self.create_users(f"{prefix}choir-", len(leaders) - 3)
+        self.bulk_create(ChoirMemberAccount, [
+            ChoirMemberAccount(user=user, member=member, church=church)
+            for user, member in zip(choir_users, leaders[3:])
+        ])
+        choirs = list(ChoirMemberAccount.objects.filter(church=church).order_by('id'))
+
+        self.bulk_create(ChurchActivity, [
+            ChurchActivity(church=church, name=name, start_time=datetime.time(hour), end_time=datetime.time(hour + 2), day=day)
+            for name, day, hour in [('Choir Practice', 'Wednesday', 17), ('Choir Practice', 'Saturday', 15),
+                                    ('Sunday Service', 'Sunday', 9)]
+        ])
+        activities = list(ChurchActivity.objects.filter(church=church).order_by('id'))
+
+        self.seed_tithes(church, members)
+        self.seed_dues(church, choirs)
+        self.seed_service_attendance(church)
+        self.seed_choir_attendance(church, choirs, activities[:2])
+        self.seed_expenditures(church)
+        self.seed_songs(church, options['songs'])
+        self.seed_announcements(church, options['announcements'])
+        return church
+
+    def seed_tithes(self, church, members):
+        # ChurchTithe is unique per (member, church), so each member has a single tithe record
+        rnd = self.random
+        rows = []
+        for member in members:
+            payment_date = self.random_date()
+            rows.append(ChurchTithe(
+                church=church, member=member,
+                usd_amount=self.amount(5, 200), lrd_amount=self.amount(500, 20000),
+                payment_date=payment_date, month=MONTHS[payment_date.month - 1], year=payment_date.year,
+                period=payment_date.replace(day=1),
+                is_deleted=rnd.random() < 0.02,
+            ))
+        self.bulk_create(ChurchTithe, rows)
+
+    def seed_dues(self, church, choirs):
+        rnd = self.random
+        rows = []
+        for year, month in self.months():
+            for choir in choirs:
+                amount_due = Decimal('250.00')
+                amount_paid = rnd.choice([Decimal('0.00'), Decimal('100.00'), amount_due, amount_due])
+                rows.append(ChoirDue(
+                    church=church, choir_member=choir,
+                    amount_due=amount_due, amount_paid=amount_paid,
+                    # ChoirDue.save() normally computes the balance
+                    balance=amount_due - amount_paid,
+                    date_paid=datetime.date(year, month, rnd.randint(1, 28)),
+                    month=MONTHS[month - 1], year=year, period=datetime.date(year, month, 1),
+                ))
+        self.bulk_create(ChoirDue, rows)
+
+    def seed_service_attendance(self, church):
+        rnd = self.random
+        rows = []
+        for date in self.weekly_dates(6):  # Sundays
+            for attendance_type in ['First Service', 'Second Service']:
+                counts = {
+                    'number_of_men': rnd.randint(20, 150),
+                    'number_of_women': rnd.randint(30, 200),
+                    'number_of_male_children': rnd.randint(5, 60),
+                    'number_of_female_children': rnd.randint(5, 60),
+                    'vistor': rnd.randint(0, 20),
+                }
+                rows.append(ChurchServiceAttendance(
+                    church=church, attendance_type=attendance_type, date=date,
+                    month=MONTHS[date.month - 1], year=date.year, period=date.replace(day=1),
+                    # ChurchServiceAttendance.save() normally computes the total
+                    total_attendees=sum(counts.values()),
+                    **counts,
+                ))
+        self.bulk_create(ChurchServiceAttendance, rows)
+
+    def seed_choir_attendance(self, church, choirs, activities):
+        rnd = self.random
+        rows = []
+        for activity in activities:
+            weekday = DAYS.index(activity.day)
+            for date in self.weekly_dates((weekday - 1) % 7):
+                present = [choir for choir in choirs if rnd.random() < 0.8]
+                for choir in present:
+                    rows.append(ChoirAttendance(
+                        church=church, activities=activity, choir=choir,
+                        day=activity.day, week=str((date.day - 1) // 7 + 1), date=date,
+                        month=MONTHS[date.month - 1], year=date.year, period=date.replace(day=1),
+                    ))
+                if len(rows) >= self.batch_size * 10:
+                    self.bulk_create(ChoirAttendance, rows)
+                    rows = []
+        self.bulk_create(ChoirAttendance, rows)
+
+    def seed_expenditures(self, church):
+        rnd = self.random
+        rows = []
+        for year, month in self.months():
+            for _ in range(rnd.randint(3, 12)):
+                rows.append(ChurchExpenditure(
+                    church=church, expenses_type=rnd.choice(EXPENSE_TYPES),
+                    item=f"{rnd.choice(WORDS).title()} supplies",
+                    usd_amount=self.amount(10, 2000), lrd_amount=self.amount(1000, 100000),
+                    descriptions="Seeded expenditure", month=MONTHS[month - 1], year=year,
+                    period=datetime.date(year, month, 1),
+                ))
+        self.bulk_create(ChurchExpenditure, rows)
+
+    def seed_songs(self, church, count):
+        rnd = self.random
+        self.bulk_create(ChoirSong, [
+            ChoirSong(
+                church=church,
+                author=f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                title=" ".join(rnd.sample(WORDS, 3)).title(),
+                song_content="\n".join(" ".join(rnd.choices(WORDS, k=8)) for _ in range(rnd.randint(8, 24))),
+                is_deleted=rnd.random() < 0.02,
+            )
+            for _ in range(count)
+        ])
+
+    def seed_announcements(self, church, count):
+        rnd = self.random
+        self.bulk_create(ChurchAnnouncement, [
+            ChurchAnnouncement(
+                church=church, author="Church Secretary",
+                title=f"{rnd.choice(WORDS).title()} {rnd.choice(['Crusade', 'Program', 'Meeting', 'Rally'])}",
+                content=" ".join(rnd.choices(WORDS, k=60)),
+                is_deleted=rnd.random() < 0.05,
+            )
+            for _ in range(count)
+        ])
+
+    def months(self):
+        for year in self.years:
+            for month in range(1, 13):
+                if (year, month) <= (self.end_date.year, self.end_date.month):
+                    yield year, month
+
+    def weekly_dates(self, weekday):
+        """
+        Every date with the given weekday (Monday is 0) in the seeded years, up to the end date.
+        """
+        date = datetime.date(self.years[0], 1, 1)
+        date += datetime.timedelta(days=(weekday - date.weekday()) % 7)
+        while date <= self.end_date:
+            yield date
+            date += datetime.timedelta(days=7)
+
+    def random_date(self):
+        start = datetime.date(self.years[0], 1, 1)
+        return start + datetime.timedelta(days=self.random.randint(0, (self.end_date - start).days))
+
+    def amount(self, low, high):
+        return Decimal(self.random.randint(low * 100, high * 100)) / 100
+
+    def phone(self):
+        return f"+231{self.random.randint(770000000, 889999999)}"
@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Value, CharField, IntegerField
+from .cache import LRUCache
+from .models import ChurchAccount
+
+
+# Roles a user can hold within a church, in the order they take precedence.
+CHURCH_ADMIN = 'church_admin'
+SECRETARY = 'secretary'
+CHOIR_DIRECTOR = 'choir_director'
+CHOIR_MEMBER = 'choir_member'
+
+ALL_ROLES = (CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER)
+
+_cache_settings = getattr(settings, 'CHURCH_MEMBERSHIP_CACHE', {})
+
+# Process-local user id -> (church_id, role, roles) cache
+membership_cache = LRUCache(
+    max_size=_cache_settings.get('MAX_SIZE', 1024),
+    timeout=_cache_settings.get('TIMEOUT', 300),
+)
+
+# Optional Django cache alias shared between processes, e.g. 'default' when it points at Redis/Memcached
+SHARED_CACHE_ALIAS = _cache_settings.get('SHARED_CACHE_ALIAS')
+SHARED_CACHE_KEY = 'church_membership:v2:%s'
+
+shared_cache_hits = 0
+
+
+class ChurchMembership:
+    """
+    The church a user belongs to and the roles they hold in it; `role` is the one taking precedence.
+    A user without any church has `church_id` and `role` set to None and no `roles`.
+    The church itself is only loaded if a view needs more than its id.
+    """
+
+    def __init__(self, church_id=None, role=None, church=None, roles=None):
+        self.church_id = church_id
+        self.role = role
+        self.roles = frozenset(roles if roles is not None else ([role] if role else []))
+        self._church = church
+
+    @property
+    def church(self):
+        if self._church is None and self.church_id is not None:
+            self._church = ChurchAccount.objects.get(pk=self.church_id)
+        return self._church
+
+    def allows(self, *roles):
+        """
+        Return True if the user belongs to a church and holds one of the given roles in it.
+        """
+        return self.church_id is not None and not self.roles.isdisjoint(roles)
+
+    def __bool__(self):
+        return self.church_id is not None
+
+    def __repr__(self):
+        return f"<ChurchMembership church={self.church_id} roles={sorted(self.roles)}>"
+
+
+def _church_for_role(role, rank, **filters):
+    return ChurchAccount.objects.filter(**filters).annotate(
+        role=Value(role, output_field=CharField()),
+        rank=Value(rank, output_field=IntegerField()),
+    )
+
+
+def resolve_church_membership(user):
+    """
+    Work out the user's church and roles with a single UNION query instead of
+    trying each account table in turn. A user holding several roles keeps all of those
+    held in the church of their highest-ranked role.
+    """
+    if user is None or not user.is_authenticated:
+        return ChurchMembership()
+
+    churches = _church_for_role(CHURCH_ADMIN, 0, church_admin=user).union(
+        _church_for_role(SECRETARY, 1, church_secretary__user=user, church_secretary__is_deleted=False),
+        _church_for_role(CHOIR_DIRECTOR, 2, church_members__user=user, church_members__is_deleted=False),
+        _church_for_role(CHOIR_MEMBER, 3, church_choir__user=user, church_choir__is_deleted=False),
+    ).order_by('rank')
+
+    churches = list(churches)
+    if not churches:
+        return ChurchMembership()
+    church = churches[0]
+    roles = [row.role for row in churches if row.pk == church.pk]
+    return ChurchMembership(church_id=church.pk, role=church.role, church=church, roles=roles)
+
+
+def get_cached_church_membership(user):
+    """
+    Return the user's membership from the local cache, then the shared cache, and only
+    query the database when neither has it.
+    """
+    global shared_cache_hits
+
+    if user is None or not user.is_authenticated:
+        return ChurchMembership()
+
+    entry = membership_cache.get(user.pk)
+    if entry is None and SHARED_CACHE_ALIAS:
+        entry = caches[SHARED_CACHE_ALIAS].get(SHARED_CACHE_KEY % user.pk)
+        if entry is not None:
+            shared_cache_hits += 1
+            membership_cache.set(user.pk, entry)
+    if entry is not None:
+        return ChurchMembership(church_id=entry[0], role=entry[1], roles=entry[2])
+
+    membership = resolve_church_membership(user)
+    entry = (membership.church_id, membership.role, tuple(sorted(membership.roles)))
+    membership_cache.set(user.pk, entry)
+    if SHARED_CACHE_ALIAS:
+        caches[SHARED_CACHE_ALIAS].set(SHARED_CACHE_KEY % user.pk, entry, membership_cache.timeout)
+    return membership
+
+
+def evict_church_membership(*user_ids):
+    """
+    Drop cached memberships for the given users so their next request resolves them again.
+    """
+    for user_id in user_ids:
+        membership_cache.delete(user_id)
+    if SHARED_CACHE_ALIAS:
+        caches[SHARED_CACHE_ALIAS].delete_many([SHARED_CACHE_KEY % user_id for user_id in user_ids])
+
+
+def membership_cache_stats():
+    """
+    Hit/miss counters for the membership cache.
+    """
+    stats = membership_cache.stats()
+    stats['shared_cache_alias'] = SHARED_CACHE_ALIAS
+    stats['shared_hits'] = shared_cache_hits
+    return stats
+
+
+def get_church_membership(request):
+    """
+    Return the membership for the request's user, resolving it at most once per request.
+    """
+    user = request.user
+    cached = getattr(request, '_cached_church_membership', None)
+    # DRF authenticates tokens after middleware has run, so re-resolve if the user changed.
+    if cached is None or cached[0] != user.pk:
+        cached = (user.pk, get_cached_church_membership(user))
+        request._cached_church_membership = cached
+    return cached[1]
@@ -0,0 +1,103 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+from .membership import get_church_membership
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChurchMembershipMiddleware:
+    """
+    Attach `request.church_membership` (the user's church and role) to every request.
+    It is resolved lazily on first access, i.e. inside the view once DRF has authenticated the user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.church_membership = SimpleLazyObject(lambda: get_church_membership(request))
+        return self.get_response(request)
+
+
+class QueryTimingMiddleware:
+    """
+    Time every request, and count the SQL queries and database time of a sample of them.
+    Responses get a `Server-Timing` header (with the database share when sampled), and every request
+    slower than the threshold is logged with its DRF view class, plus its slowest statements when sampled.
+    Settings: QUERY_TIMING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'QUERY_TIMING', {})
+        self.sample_rate = options.get('SAMPLE_RATE', 1)
+        self.slow_request_ms = options.get('SLOW_REQUEST_MS', 500)
+        self.top_queries = options.get('TOP_QUERIES', 5)
+
+    def __call__(self, request):
+        # Timing is cheap; wrapping every statement is what gets sampled
+        sampled = self.sample_rate > 0 and random.uniform(0, 100) < self.sample_rate
+        recorder = QueryRecorder() if sampled else None
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            if sampled:
+                # Wrapping does not open a connection; it applies whenever this thread's connection is used
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        timing = f'total;dur={total_ms:.2f}'
+        if sampled:
+            timing = f'db;dur={recorder.duration_ms:.2f};desc="{len(recorder.queries)} queries", {timing}'
+        response['Server-Timing'] = timing
+        if total_ms >= self.slow_request_ms:
+            self.log_slow_request(request, response, recorder, total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # as_view() keeps a reference to the class based view it wraps
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        request._timing_view_name = view_class.__name__ if view_class else view_func.__name__
+
+    def log_slow_request(self, request, response, recorder, total_ms):
+        view_name = getattr(request, '_timing_view_name', 'unresolved')
+        if recorder is None:
+            logger.warning(
+                "Slow request %s %s (%s) -> %s: %.2f ms (queries not sampled)",
+                request.method, request.get_full_path(), view_name, response.status_code, total_ms,
+            )
+            return
+        slowest = sorted(recorder.queries, key=lambda query: query[1], reverse=True)[:self.top_queries]
+        statements = "".join(f"\n  {duration:.2f} ms: {sql}" for sql, duration in slowest)
+        logger.warning(
+            "Slow request %s %s (%s) -> %s: %.2f ms, %d queries, %.2f ms in the database%s",
+            request.method, request.get_full_path(), view_name,
+            response.status_code, total_ms, len(recorder.queries), recorder.duration_ms, statements,
+        )
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording each statement's SQL and duration.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.duration_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.duration_ms += duration
+            self.queries.append((sql, duration))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_memberregistration_member_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChurchCounters',
+            fields=[
+                ('church', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='accounts.churchaccount')),
+                ('members', models.IntegerField(default=0)),
+                ('male_members', models.IntegerField(default=0)),
+                ('female_members', models.IntegerField(default=0)),
+                ('active_members', models.IntegerField(default=0)),
+                ('inactive_members', models.IntegerField(default=0)),
+                ('suspended_members', models.IntegerField(default=0)),
+                ('dropped_members', models.IntegerField(default=0)),
+                ('deceased_members', models.IntegerField(default=0)),
+                ('choir_members', models.IntegerField(default=0)),
+                ('male_choir_members', models.IntegerField(default=0)),
+                ('female_choir_members', models.IntegerField(default=0)),
+                ('choir_directors', models.IntegerField(default=0)),
+                ('secretaries', models.IntegerField(default=0)),
+                ('announcements', models.IntegerField(default=0)),
+                ('songs', models.IntegerField(default=0)),
+                ('activities', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Church Counters',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+STATUSES = ['active', 'inactive', 'suspended', 'dropped', 'deceased']
+
+
+def populate_counters(apps, schema_editor):
+    ChurchAccount = apps.get_model('accounts', 'ChurchAccount')
+    ChurchCounters = apps.get_model('accounts', 'ChurchCounters')
+    simple_counters = [
+        (apps.get_model('accounts', 'ChoirDirectorAccount'), 'choir_directors'),
+        (apps.get_model('accounts', 'SecretaryAccount'), 'secretaries'),
+        (apps.get_model('announcement', 'ChurchAnnouncement'), 'announcements'),
+        (apps.get_model('song', 'ChoirSong'), 'songs'),
+        (apps.get_model('church_activity', 'ChurchActivity'), 'activities'),
+    ]
+
+    for church in ChurchAccount.objects.all():
+        values = church.church.filter(is_deleted=False).aggregate(
+            members=Count('pk'),
+            male_members=Count('pk', filter=Q(gender='Male')),
+            female_members=Count('pk', filter=Q(gender='Female')),
+            **{f"{status}_members": Count('pk', filter=Q(status=status)) for status in STATUSES},
+        )
+        values.update(church.church_choir.filter(is_deleted=False).aggregate(
+            choir_members=Count('pk'),
+            male_choir_members=Count('pk', filter=Q(member__gender='Male')),
+            female_choir_members=Count('pk', filter=Q(member__gender='Female')),
+        ))
+        for model, field in simple_counters:
+            values[field] = model.objects.filter(church=church, is_deleted=False).count()
+        ChurchCounters.objects.update_or_create(church=church, defaults=values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_churchcounters'),
+        ('announcement', '0002_churchannouncement_announce_church_deleted_idx_and_more'),
+        ('church_activity', '0001_initial'),
+        ('song', '0002_choirsong_song_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
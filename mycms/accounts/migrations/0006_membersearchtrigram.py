@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_populate_churchcounters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('church', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.churchaccount')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to='accounts.memberregistration')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['church', 'trigram', 'member'], name='member_trigram_idx')],
+            },
+        ),
+    ]
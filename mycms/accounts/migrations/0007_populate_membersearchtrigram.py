@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from accounts.search import member_trigrams
+
+
+def populate_trigrams(apps, schema_editor):
+    MemberRegistration = apps.get_model('accounts', 'MemberRegistration')
+    MemberSearchTrigram = apps.get_model('accounts', 'MemberSearchTrigram')
+
+    rows = []
+    members = MemberRegistration.objects.only('church', 'full_name', 'phone_number', 'email').order_by('pk')
+    for member in members.iterator(chunk_size=2000):
+        rows.extend(
+            MemberSearchTrigram(church_id=member.church_id, member_id=member.pk, trigram=trigram)
+            for trigram in member_trigrams(member.full_name, member.phone_number, member.email)
+        )
+        if len(rows) >= 5000:
+            MemberSearchTrigram.objects.bulk_create(rows)
+            rows = []
+    MemberSearchTrigram.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_membersearchtrigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_trigrams, migrations.RunPython.noop),
+    ]
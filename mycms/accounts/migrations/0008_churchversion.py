@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_populate_membersearchtrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChurchVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=50)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+                ('church', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='accounts.churchaccount')),
+            ],
+            options={
+                'verbose_name_plural': 'Church Versions',
+                'constraints': [models.UniqueConstraint(fields=('church', 'resource'), name='church_version_unique')],
+            },
+        ),
+    ]
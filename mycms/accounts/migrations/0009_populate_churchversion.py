@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+RESOURCES = ['announcements', 'songs', 'activities', 'departments']
+
+
+def populate_versions(apps, schema_editor):
+    ChurchAccount = apps.get_model('accounts', 'ChurchAccount')
+    ChurchVersion = apps.get_model('accounts', 'ChurchVersion')
+    now = timezone.now()
+    ChurchVersion.objects.bulk_create(
+        [
+            ChurchVersion(church_id=church_id, resource=resource, updated_at=now)
+            for church_id in ChurchAccount.objects.values_list('pk', flat=True)
+            for resource in RESOURCES
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_churchversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_populate_churchversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='memberregistration',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='member_church_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedrecord',
+            name='church',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.churchaccount'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedrecord',
+            index=models.Index(fields=['church', 'resource', 'deleted_at', 'object_id'], name='deleted_record_sync_idx'),
+        ),
+    ]
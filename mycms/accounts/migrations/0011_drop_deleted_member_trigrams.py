@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def drop_deleted_member_trigrams(apps, schema_editor):
+    MemberSearchTrigram = apps.get_model('accounts', 'MemberSearchTrigram')
+    MemberSearchTrigram.objects.filter(member__is_deleted=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_deleted_member_trigrams, migrations.RunPython.noop),
+    ]
@@ -71,6 +71,13 @@ class MemberRegistration(models.Model):
     def __str__(self):
         return f"{self.full_name}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='member_church_deleted_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='member_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='member_church_updated_idx'),
+        ]
+
 class ChoirDirectorAccount(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='church_members')
@@ -105,3 +112,90 @@ class SecretaryAccount(models.Model):
         return self.member.full_name
     
 
+
+class ChurchCounters(models.Model):
+    """
+    Live totals of a church, kept up to date by the signal handlers in accounts.counters.
+    Writes that skip signals (bulk_create, queryset.update) are reconciled with `manage.py rebuild_counters`.
+    """
+    church = models.OneToOneField(ChurchAccount, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    members = models.IntegerField(default=0)
+    male_members = models.IntegerField(default=0)
+    female_members = models.IntegerField(default=0)
+    active_members = models.IntegerField(default=0)
+    inactive_members = models.IntegerField(default=0)
+    suspended_members = models.IntegerField(default=0)
+    dropped_members = models.IntegerField(default=0)
+    deceased_members = models.IntegerField(default=0)
+    choir_members = models.IntegerField(default=0)
+    male_choir_members = models.IntegerField(default=0)
+    female_choir_members = models.IntegerField(default=0)
+    choir_directors = models.IntegerField(default=0)
+    secretaries = models.IntegerField(default=0)
+    announcements = models.IntegerField(default=0)
+    songs = models.IntegerField(default=0)
+    activities = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Counters of {self.church_id}"
+
+    class Meta:
+        verbose_name_plural = 'Church Counters'
+
+
+class ChurchVersion(models.Model):
+    """
+    Version of one of a church's resources (announcements, songs, ...), bumped on every write to it
+    by the signal handlers in accounts.versions. Clients revalidate against it with ETag / Last-Modified.
+    """
+    church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='versions')
+    resource = models.CharField(max_length=50)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.resource} of {self.church_id}: v{self.version}"
+
+    class Meta:
+        verbose_name_plural = 'Church Versions'
+        constraints = [
+            models.UniqueConstraint(fields=['church', 'resource'], name='church_version_unique'),
+        ]
+
+
+class DeletedRecord(models.Model):
+    """
+    Tombstone of a hard-deleted row of a synced resource, so the delta sync feeds (accounts.sync)
+    can tell offline clients to drop it. Soft-deleted rows stay in their table and need none.
+    """
+    church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='+')
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.resource} {self.object_id} deleted"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'resource', 'deleted_at', 'object_id'], name='deleted_record_sync_idx'),
+        ]
+
+
+class MemberSearchTrigram(models.Model):
+    """
+    One trigram of a member's full name, phone number or email, for the fuzzy member search (accounts.search).
+    Rows are rewritten whenever the member is saved; bulk inserts are indexed with `manage.py rebuild_member_search`.
+    """
+    church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='+')
+    member = models.ForeignKey(MemberRegistration, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    def __str__(self):
+        return f"{self.trigram} -> {self.member_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'trigram', 'member'], name='member_trigram_idx'),
+        ]
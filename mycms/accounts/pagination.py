@@ -0,0 +1,207 @@
+import base64
+import json
+from collections import OrderedDict
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Above this many rows an estimated count stops counting and reports the cap
+ESTIMATED_COUNT_CAP = 10000
+
+
+def estimate_count(queryset, cap=ESTIMATED_COUNT_CAP):
+    """
+    Cheaply estimate the number of rows in a queryset.
+    On PostgreSQL the planner's row estimate is used; elsewhere rows are only counted up to `cap`.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset.order_by()[:cap].count()
+
+
+def count_queryset(queryset, view):
+    """
+    The queryset to count the rows of a page from. Views listing values() rows (see accounts.values) set
+    `count_queryset` to their rows before the projection, whose joins for related fields the count does not need.
+    """
+    counted = getattr(view, 'count_queryset', None)
+    return queryset if counted is None else counted
+
+
+class CountedPaginator(Paginator):
+    """
+    Django paginator that counts `count_queryset` instead of the listed rows,
+    with `estimate_count` instead of an exact COUNT(*) when `estimated`.
+    """
+
+    def __init__(self, object_list, per_page, count_queryset=None, estimated=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_queryset = object_list if count_queryset is None else count_queryset
+        self.estimated = estimated
+
+    @cached_property
+    def count(self):
+        if self.estimated:
+            return estimate_count(self.count_queryset)
+        return self.count_queryset.count()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by (created_at, id), newest first.
+    Pages are fetched with an indexed range condition instead of OFFSET, so deep pages are as fast as the first.
+    Views whose rows have no `created_at` set `keyset_ordering_field` (e.g. 'date_recorded').
+
+    Pass `?count=estimated` or `?count=exact` to include a total count in the response.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering_field = 'created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.field = getattr(view, 'keyset_ordering_field', self.ordering_field)
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(count_queryset(queryset, view), request)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor['reverse']
+        if cursor is not None:
+            # Rows after the cursor in (field, id) order: older rows going forward, newer going back
+            lookup = 'gt' if reverse else 'lt'
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": cursor['value']})
+                | Q(**{self.field: cursor['value'], f"id__{lookup}": cursor['id']})
+            )
+
+        if reverse:
+            queryset = queryset.order_by(self.field, 'id')
+        else:
+            queryset = queryset.order_by(f"-{self.field}", '-id')
+
+        # Fetch one extra row to know whether there is a further page
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = cursor is not None and (has_more if reverse else True)
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimated':
+            return estimate_count(queryset)
+        return None
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.build_link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.build_link(self.rows[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        # Rows are model instances, or dicts for views listing queryset.values() (see accounts.values)
+        if isinstance(row, dict):
+            value, pk = row[self.field], row['id']
+        else:
+            value, pk = getattr(row, self.field), row.pk
+        payload = json.dumps({'v': value.isoformat(), 'id': pk, 'r': reverse})
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            value = parse_datetime(payload['v'])
+            if value is None:
+                raise ValueError
+            return {'value': value, 'id': int(payload['id']), 'reverse': bool(payload['r'])}
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+
+class CustomPagination(PageNumberPagination):
+    """
+    Page number pagination used by the list views.
+    - `?cursor=` (or `?pagination=cursor` for the first page) switches to keyset pagination.
+    - `?count=estimated` skips the exact COUNT(*) on large tables.
+    """
+    page_size = 10  # Default items per page
+    page_size_query_param = 'page_size'  # Allow client to specify page size
+    max_page_size = 100  # Max items per page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if request.query_params.get('cursor') or request.query_params.get('pagination') == 'cursor':
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.django_paginator_class = partial(
+            CountedPaginator, count_queryset=count_queryset(queryset, view),
+            estimated=request.query_params.get('count') == 'estimated',
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ReportPagination(PageNumberPagination):
+    """
+    Page number pagination of aggregated reports, whose grouped rows have no (created_at, id) to page by with a cursor.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -0,0 +1,76 @@
+import datetime
+
+from rest_framework.exceptions import ValidationError
+
+from choice.views import month_choices
+
+
+MONTHS = [month for month, _ in month_choices]
+
+# `?ordering=` values accepted by the period-keyed lists; the id breaks ties within a month
+PERIOD_ORDERINGS = {
+    'period': ('period', 'id'),
+    '-period': ('-period', '-id'),
+}
+
+
+def month_period(month, year):
+    """
+    First day of the month stored as a month name and a year, the `period` of tithes, dues, expenditures
+    and attendance. None for rows without a valid month (e.g. the 'Select' default of service attendance).
+    """
+    try:
+        return datetime.date(year, MONTHS.index(month) + 1, 1)
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_period(params, name):
+    """
+    The month given by query parameter `name` as YYYY-MM (or a YYYY-MM-DD date within it), or None if absent.
+    """
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        year, month = value.split('-')[:2]
+        return datetime.date(int(year), int(month), 1)
+    except ValueError:
+        raise ValidationError({name: ["Enter a month as YYYY-MM."]})
+
+
+def parse_day(params, name):
+    """
+    The date given by query parameter `name` as YYYY-MM-DD, or None if absent.
+    """
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: ["Enter a valid date (YYYY-MM-DD)."]})
+
+
+def filter_by_period(queryset, params):
+    """
+    Narrow a list to the months from `?period_from=` to `?period_to=` (YYYY-MM, both included) and
+    sort it by month with `?ordering=period` or `?ordering=-period`, seeking the (church, period) index.
+    Keyset pages are ordered by their own field and id, so a month ordering is paged with ?page= only.
+    """
+    start, end = parse_period(params, 'period_from'), parse_period(params, 'period_to')
+    if start and end:
+        queryset = queryset.filter(period__range=(start, end))
+    elif start:
+        queryset = queryset.filter(period__gte=start)
+    elif end:
+        queryset = queryset.filter(period__lte=end)
+
+    ordering = params.get('ordering')
+    if ordering:
+        if ordering not in PERIOD_ORDERINGS:
+            raise ValidationError({'ordering': [f"Choose one of: {', '.join(PERIOD_ORDERINGS)}."]})
+        if params.get('cursor') or params.get('pagination') == 'cursor':
+            raise ValidationError({'ordering': ["Month orderings are paged with ?page=, not ?cursor= or ?pagination=cursor."]})
+        queryset = queryset.order_by(*PERIOD_ORDERINGS[ordering])
+    return queryset
@@ -0,0 +1,142 @@
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from .fieldsets import readable_fields, select_fields
+
+
+def _rendered_fields(serializer_class, fields):
+    serializer = serializer_class()
+    return [
+        field for name, field in serializer.fields.items()
+        if not field.write_only and (fields is None or name in fields)
+    ]
+
+
+# Keyed by serializer and field selection (?fields=), so bounded rather than unlimited
+@lru_cache(maxsize=256)
+def related_lookups(serializer_class, model, fields=None):
+    """
+    Work out the select_related and prefetch_related lookups a serializer needs,
+    from the dotted `source` of its fields (e.g. 'choir_member.member.full_name')
+    and from nested serializers. `fields` restricts this to some of the serializer's fields.
+    """
+    select, prefetch = set(), set()
+    for field in _rendered_fields(serializer_class, fields):
+        if field.source == '*':
+            continue
+        _add_lookups(field, model, '', False, select, prefetch)
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+@lru_cache(maxsize=256)
+def column_lookups(serializer_class, model, fields):
+    """
+    The only() lookups that load what the given fields of a serializer read (e.g. 'title',
+    'church' for church_id, 'choir_member__member__full_name'), plus the sources that are not
+    model fields (annotations, properties). None if a field reads the whole instance.
+    """
+    columns, other_sources = set(), set()
+    for field in _rendered_fields(serializer_class, fields):
+        if field.source == '*':
+            return None
+        path, current = [], model
+        for name in field.source.split('.'):
+            try:
+                model_field = current._meta.get_field(name)
+            except FieldDoesNotExist:
+                if not path:
+                    other_sources.add(name)
+                break
+            path.append(name)
+            if not model_field.is_relation or model_field.many_to_many or model_field.one_to_many:
+                break
+            current = model_field.related_model
+        # A relation left at the end of the path (a primary key field or nested serializer) loads whole
+        if path and not (model_field.many_to_many or model_field.one_to_many):
+            columns.add('__'.join(path))
+    return tuple(sorted(columns)), tuple(sorted(other_sources))
+
+
+def _add_lookups(field, model, prefix, many, select, prefetch):
+    parts = field.source.split('.')
+    nested = isinstance(field, (serializers.BaseSerializer, serializers.ListSerializer))
+    # The last part of a plain field's source is a value; for a nested serializer it is a relation too
+    relations = parts if nested else parts[:-1]
+
+    path, current = prefix, model
+    for name in relations:
+        try:
+            model_field = current._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Properties and methods cannot be optimized
+            return
+        if not model_field.is_relation:
+            return
+        path = f"{path}__{name}" if path else name
+        many = many or model_field.many_to_many or model_field.one_to_many
+        (prefetch if many else select).add(path)
+        current = model_field.related_model
+
+    if nested:
+        child = field.child if isinstance(field, serializers.ListSerializer) else field
+        for child_field in child.fields.values():
+            if not child_field.write_only and child_field.source != '*':
+                _add_lookups(child_field, current, path, many, select, prefetch)
+
+
+def optimize_for_serializer(queryset, serializer_class, fields=None, keep=()):
+    """
+    Apply select_related/prefetch_related so serializing the queryset costs a constant number of queries.
+    When only some `fields` are rendered, the columns nothing reads are not loaded either
+    (`keep` names extra columns to load, e.g. the pagination's ordering field).
+    """
+    select, prefetch = related_lookups(serializer_class, queryset.model, fields)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+
+    lookups = column_lookups(serializer_class, queryset.model, fields) if fields is not None else None
+    if lookups is not None:
+        columns, other_sources = lookups
+        # Properties and methods may read any column. Other sources are either computed by the query
+        # (extra()/annotate()) or absent, and then skipped by the serializer.
+        computed = set(queryset.query.extra_select) | set(queryset.query.annotation_select)
+        if not any(hasattr(queryset.model, name) for name in other_sources if name not in computed):
+            queryset = queryset.only(*columns, *keep)
+    return queryset
+
+
+class SerializerRelatedMixin:
+    """
+    List view mixin that joins/prefetches whatever relations the view's serializer reads.
+    It also handles sparse fieldsets: `?fields=` / `?omit=` (see accounts.fieldsets) narrow both the
+    response and the SQL. Views can set `summary_fields` to render fewer fields by default.
+    """
+    summary_fields = None
+
+    def get_sparse_fields(self):
+        """
+        The names of the serializer fields this request renders, and whether that is fewer than all of them.
+        """
+        if not hasattr(self, '_sparse_fields'):
+            available = readable_fields(self.get_serializer_class()().fields)
+            selected = select_fields(self.request, available, self.summary_fields)
+            self._sparse_fields = (tuple(selected), len(selected) < len(available))
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], _ = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, narrowed = self.get_sparse_fields()
+        if not narrowed:
+            return optimize_for_serializer(queryset, self.get_serializer_class())
+
+        # The pagination reads the ordering field of the last row to build the next cursor
+        ordering_field = getattr(self, 'keyset_ordering_field', 'created_at')
+        keep = [field.name for field in queryset.model._meta.concrete_fields if field.name == ordering_field]
+        return optimize_for_serializer(queryset, self.get_serializer_class(), fields, keep)
@@ -0,0 +1,143 @@
+import math
+import re
+import unicodedata
+
+from django.db.models import Count
+
+from .models import MemberRegistration, MemberSearchTrigram
+
+
+# Share of the query's trigrams a member must contain to be a match. Low enough that a typo
+# (which breaks up to three trigrams) still finds the member; ranking sorts out the rest.
+SIMILARITY_THRESHOLD = 0.3
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def normalize(text):
+    """
+    Lowercase and strip accents, so 'Adélé' and 'adele' index the same.
+    """
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def search_words(full_name='', phone_number='', email=''):
+    """
+    The words indexed for a member: the words of the name, the local part of the email
+    (every address shares its domain, which would only add noise) and the digits of the phone number.
+    """
+    words = re.findall(r'[^\W_]+', normalize(full_name))
+    words += re.findall(r'[^\W_]+', normalize(email).split('@')[0])
+    digits = re.sub(r'\D', '', str(phone_number or ''))
+    if digits:
+        words.append(digits)
+    return words
+
+
+def word_trigrams(word, prefix=False):
+    """
+    Trigrams of a word padded with a space on each side, so word starts and ends get trigrams of their own.
+    A prefix (the word being typed) gets no closing trigram. Unlike pg_trgm there is no two-space
+    '  x' trigram: one per initial letter, it would be the most common and least telling of all.
+    """
+    padded = f" {word}" if prefix else f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def member_trigrams(full_name='', phone_number='', email=''):
+    trigrams = set()
+    for word in search_words(full_name, phone_number, email):
+        trigrams |= word_trigrams(word)
+    return trigrams
+
+
+def query_trigrams(text):
+    """
+    Trigrams of a search query. The last word is matched as a prefix unless the query ends with a space;
+    an email domain and the non-digits of a phone number are dropped like they are when indexing.
+    """
+    words = []
+    for token in str(text).split():
+        if '@' in token:
+            token = token.split('@')[0]
+        if re.fullmatch(r'[\d+()\-.]+', token):
+            token = re.sub(r'\D', '', token)
+        words += re.findall(r'[^\W_]+', normalize(token))
+
+    trigrams = set()
+    for position, word in enumerate(words):
+        is_last = position == len(words) - 1
+        trigrams |= word_trigrams(word, prefix=is_last and not text[-1:].isspace())
+    return trigrams
+
+
+def index_members(members):
+    """
+    (Re)write the trigrams of the given members. Soft-deleted members are left out of the index.
+    """
+    members = list(members)
+    MemberSearchTrigram.objects.filter(member__in=[member.pk for member in members]).delete()
+    MemberSearchTrigram.objects.bulk_create([
+        MemberSearchTrigram(church_id=member.church_id, member_id=member.pk, trigram=trigram)
+        for member in members
+        if not member.is_deleted
+        for trigram in member_trigrams(member.full_name, member.phone_number, member.email)
+    ], batch_size=5000)
+
+
+def rebuild_member_search(church_ids=None):
+    """
+    Reindex every live member of the given churches (all churches by default). Returns the number of members indexed.
+    """
+    members = (
+        MemberRegistration.objects.filter(is_deleted=False)
+        .only('church', 'full_name', 'phone_number', 'email', 'is_deleted')
+        .order_by('pk')
+    )
+    if church_ids is not None:
+        members = members.filter(church_id__in=church_ids)
+        MemberSearchTrigram.objects.filter(church_id__in=church_ids).delete()
+    else:
+        MemberSearchTrigram.objects.all().delete()
+
+    total, batch = 0, []
+    for member in members.iterator(chunk_size=2000):
+        batch.append(member)
+        if len(batch) == 2000:
+            index_members(batch)
+            total, batch = total + len(batch), []
+    index_members(batch)
+    return total + len(batch)
+
+
+def search_members(queryset, church_id, text, limit=SEARCH_LIMIT):
+    """
+    The live members of `queryset` in the church best matching `text`, most similar first.
+    Each member gets a `score`: the share of the query's trigrams found in their name, phone number or email.
+    """
+    trigrams = query_trigrams(text)
+    if not trigrams:
+        return []
+
+    # Candidates come from the (church, trigram, member) index alone: count the query trigrams
+    # each member shares and keep the best few. Only those members are then loaded.
+    candidates = (
+        MemberSearchTrigram.objects
+        .filter(church_id=church_id, trigram__in=trigrams)
+        .values('member_id')
+        .annotate(hits=Count('trigram'))
+        .filter(hits__gte=max(1, math.ceil(len(trigrams) * SIMILARITY_THRESHOLD)))
+        .order_by('-hits', 'member_id')
+    )[:limit * 3]
+    hits = {row['member_id']: row['hits'] for row in candidates}
+
+    members = list(queryset.filter(church_id=church_id, is_deleted=False, pk__in=hits))
+    ranks = {}
+    for member in members:
+        member.score = round(hits[member.pk] / len(trigrams), 3)
+        # Equal hits (e.g. every name starting with the prefix) go to the member with the fewest other trigrams
+        extra = len(member_trigrams(member.full_name, member.phone_number, member.email)) - hits[member.pk]
+        ranks[member.pk] = (-hits[member.pk], extra, member.full_name.lower())
+    members.sort(key=lambda member: ranks[member.pk])
+    return members[:limit]
@@ -7,9 +7,11 @@ from .models import ChoirDirectorAccount
 from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
+from django.utils.translation import get_language
+from .fieldsets import SparseFieldsetMixin
 
 
-class ChurchAccountSerializer(serializers.ModelSerializer):
+class ChurchAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)  # Optional for update
     confirm_password = serializers.CharField(write_only=True, required=False)  # Optional for update
 
@@ -82,11 +84,39 @@ class ChurchAccountSerializer(serializers.ModelSerializer):
         return instance
     
 
+class CountryNameField(CountrySerializerField):
+    """
+    Country field that accepts a code or a name and displays the full name
+    (None when no country is set, '' for a code that is not a country).
+    """
+
+    def to_representation(self, obj):
+        code = str(obj) if obj else ''
+        if not code:
+            return None
+        return str(self.countries.name(code))
+
+    def values_converter(self):
+        """
+        Same output from the stored code, for rows built from queryset.values() (see accounts.values).
+        """
+        names = {}
+
+        def country_name(code):
+            if not code:
+                return None
+            language = get_language()
+            if language not in names:
+                names[language] = {code: str(name) for code, name in self.countries}
+            return names[language].get(code, '')
+        return country_name
+
+
 # member serializer
-class MemberRegistrationSerializer(serializers.ModelSerializer):
+class MemberRegistrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     
     gender = serializers.ChoiceField(choices=gender_choices)
-    nationality = CountrySerializerField()
+    nationality = CountryNameField()
 
     class Meta:
         model = MemberRegistration
@@ -95,27 +125,52 @@ class MemberRegistrationSerializer(serializers.ModelSerializer):
                  ]
         read_only_fields = ['church', 'is_deleted', 'created_at', 'updated_at', 'status']
     
-    def to_representation(self, instance):
-        # Get the default representation
-        representation = super().to_representation(instance)
-        # Override the country field to display the full name
-        representation['nationality'] = instance.nationality.name if instance.nationality else None
-        return representation
-    
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new member
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
 
 
+class MemberSearchResultSerializer(MemberRegistrationSerializer):
+    """
+    A member found by the fuzzy member search, with its similarity score (0 to 1).
+    """
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(MemberRegistrationSerializer.Meta):
+        fields = [*MemberRegistrationSerializer.Meta.fields, 'score']
+
+
+class MemberImportSerializer(MemberRegistrationSerializer):
+    """
+    Validate one row of a member spreadsheet (see accounts.imports).
+    Same rules as MemberRegistrationSerializer plus the phone number; email uniqueness is
+    checked per chunk of rows and the department is looked up by id or name in the church's departments.
+    """
+    department = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    class Meta(MemberRegistrationSerializer.Meta):
+        fields = ['full_name', 'email', 'phone_number', 'gender', 'date_of_birth', 'nationality', 'address', 'department']
+        extra_kwargs = {'email': {'validators': []}}
+
+    def validate_department(self, value):
+        if not value:
+            return None
+        departments = self.context["departments"]
+        department = departments.get(str(value).strip().lower())
+        if department is None:
+            raise serializers.ValidationError("Department not found in this church.")
+        return department
+
+
 #############################################################
 
-class ChoirDirectorAccountSerializer(serializers.ModelSerializer):
+class ChoirDirectorAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source='member.full_name', read_only=True)
     email = serializers.EmailField(source='member.email', read_only=True)  # Automatically retrieve email
     password = serializers.CharField(write_only=True, style={'input_type': 'password'})
@@ -158,7 +213,7 @@ class ChoirDirectorAccountSerializer(serializers.ModelSerializer):
         # Create the choir director account
         choir_director_account = ChoirDirectorAccount.objects.create(
             user=user,
-            church=self.context['church'],  # Pass church from context
+            church_id=self.context['church_id'],  # Pass church from context
             member=member
         )
 
@@ -166,7 +221,7 @@ class ChoirDirectorAccountSerializer(serializers.ModelSerializer):
 
 ############################################################
 
-class ChoirMemberAccountSerializer(serializers.ModelSerializer):
+class ChoirMemberAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source='member.full_name', read_only=True)
     email = serializers.EmailField(source='member.email', read_only=True)  # Use member's existing email
     password = serializers.CharField(write_only=True, style={'input_type': 'password'})
@@ -254,13 +309,13 @@ class ChoirMemberAccountSerializer(serializers.ModelSerializer):
         # Create the choir director account
         choir_member_account = ChoirMemberAccount.objects.create(
             user=user,
-            church=self.context['church'],  # Pass church from context
+            church_id=self.context['church_id'],  # Pass church from context
             member=member
         )
 
         return choir_member_account
 
-class SecretaryAccountAccountSerializer(serializers.ModelSerializer):
+class SecretaryAccountAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source='member.full_name', read_only=True)
     email = serializers.EmailField(source='member.email', read_only=True)
     password = serializers.CharField(write_only=True, style={'input_type': 'password'})
@@ -301,7 +356,7 @@ class SecretaryAccountAccountSerializer(serializers.ModelSerializer):
         secretary_account = SecretaryAccount.objects.create(
             user=user,
             member=validated_data['member'],
-            church=self.context['church'],  # Pass church from context
+            church_id=self.context['church_id'],  # Pass church from context
         )
         return secretary_account
 
@@ -318,7 +373,7 @@ class SecretaryAccountAccountSerializer(serializers.ModelSerializer):
 
 #####################################
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ChurchDepartment
         fields = ['id', 'church', 'name', 'is_deleted', 'created_at', 'updated_at']
@@ -328,24 +383,24 @@ class DepartmentSerializer(serializers.ModelSerializer):
         """
         Ensure that the department name is unique within the same church.
         """
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Check for duplicate name within the same church
-        if ChurchDepartment.objects.filter(church=church_account, name=value, is_deleted=False).exists():
+        if ChurchDepartment.objects.filter(church_id=church_id, name=value, is_deleted=False).exists():
             raise serializers.ValidationError("A department with this name already exists in your church.")
 
         return value
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new department
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
 
 
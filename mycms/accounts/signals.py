@@ -0,0 +1,125 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .models import ChurchAccount, ChurchCounters, MemberRegistration, SecretaryAccount, ChoirDirectorAccount, ChoirMemberAccount
+from .membership import evict_church_membership
+from .authentication import evict_token
+from .counters import TRACKED_FIELDS, record_change
+from .search import index_members
+from .versions import VERSIONED_MODELS, bump_version_on_write, create_versions
+from .sync import SYNC_MODELS, record_deletion
+from attendance.models import ChurchServiceAttendance
+from attendance.rollups import load_rollup_state, update_rollups_on_save, update_rollups_on_delete
+
+
+@receiver([post_save, post_delete], sender=ChurchAccount)
+def evict_church_users(sender, instance, **kwargs):
+    """
+    A church that changes (e.g. soft-deleted or given a new admin) invalidates the
+    cached membership of everyone who belongs to it.
+    """
+    user_ids = {instance.church_admin_id}
+    for model in (SecretaryAccount, ChoirDirectorAccount, ChoirMemberAccount):
+        user_ids.update(model.objects.filter(church_id=instance.pk).values_list('user_id', flat=True))
+    evict_church_membership(*user_ids)
+
+
+@receiver([post_save, post_delete], sender=SecretaryAccount)
+@receiver([post_save, post_delete], sender=ChoirDirectorAccount)
+@receiver([post_save, post_delete], sender=ChoirMemberAccount)
+def evict_role_user(sender, instance, **kwargs):
+    """
+    Creating, updating or deleting a role account changes that user's membership.
+    """
+    evict_church_membership(instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """
+    A deleted token must stop authenticating immediately.
+    """
+    evict_token(instance.key)
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_user_tokens(sender, instance, **kwargs):
+    """
+    A user that is deactivated (or otherwise changed) must not keep authenticating from the cache.
+    """
+    evict_token(*Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
+
+
+@receiver(post_save, sender=ChurchAccount)
+def create_church_counters(sender, instance, created, **kwargs):
+    if created:
+        ChurchCounters.objects.get_or_create(church=instance)
+
+
+@receiver(post_save, sender=ChurchAccount)
+def create_church_versions(sender, instance, created, **kwargs):
+    if created:
+        create_versions([instance.pk])
+
+
+@receiver(post_save, sender=MemberRegistration)
+def index_member_search(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the member's search trigrams in step with their name, phone number and email,
+    and drop them while the member is soft-deleted.
+    """
+    if update_fields is None or {'church', 'full_name', 'phone_number', 'email', 'is_deleted'} & set(update_fields):
+        index_members([instance])
+
+
+def load_counter_state(sender, instance, **kwargs):
+    """
+    Read the counted fields as currently stored, so the change can be applied once the write is done.
+    Reading them from the database rather than the instance keeps stale or partially loaded instances correct.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance._counter_state = None
+        return
+    rows = sender._base_manager.filter(pk=instance.pk)
+    if connection.in_atomic_block:
+        rows = rows.select_for_update()
+    instance._counter_state = rows.values(*TRACKED_FIELDS[sender]).first()
+
+
+def update_counters_on_save(sender, instance, created, **kwargs):
+    """
+    Creating, soft-deleting, restoring or re-classifying (gender, status) a row adjusts its church's counters.
+    """
+    old_state = None if created else getattr(instance, '_counter_state', None)
+    # Fields that were deferred and not saved keep their stored value
+    new_state = {**(old_state or {}), **{
+        field: value for field, value in instance.__dict__.items() if field in TRACKED_FIELDS[sender]
+    }}
+    record_change(sender, old_state, new_state, instance)
+    instance._counter_state = None
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    record_change(sender, getattr(instance, '_counter_state', None), None, instance)
+    instance._counter_state = None
+
+
+for model in TRACKED_FIELDS:
+    pre_save.connect(load_counter_state, sender=model)
+    post_save.connect(update_counters_on_save, sender=model)
+    pre_delete.connect(load_counter_state, sender=model)
+    post_delete.connect(update_counters_on_delete, sender=model)
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_version_on_write, sender=model)
+    post_delete.connect(bump_version_on_write, sender=model)
+
+for model in SYNC_MODELS:
+    post_delete.connect(record_deletion, sender=model)
+
+pre_save.connect(load_rollup_state, sender=ChurchServiceAttendance)
+post_save.connect(update_rollups_on_save, sender=ChurchServiceAttendance)
+pre_delete.connect(load_rollup_state, sender=ChurchServiceAttendance)
+post_delete.connect(update_rollups_on_delete, sender=ChurchServiceAttendance)
@@ -0,0 +1,44 @@
+from .counters import rebuild_counters
+from .models import ChurchCounters
+
+
+# Response keys of the statistics views and the ChurchCounters fields they are read from
+STATISTICS_FIELDS = {
+    'total_members': 'members',
+    'total_female': 'female_members',
+    'total_male': 'male_members',
+    'total_choirs': 'choir_members',
+    'total_announcements': 'announcements',
+}
+CHOIR_STATISTICS_FIELDS = {
+    'total_choirs': 'choir_members',
+    'total_female': 'female_choir_members',
+    'total_male': 'male_choir_members',
+}
+
+
+def church_statistics(church_ids=None, fields=STATISTICS_FIELDS):
+    """
+    Totals per church read from the maintained counters, keyed by church id (a single query).
+    `church_ids=None` covers every church that is not deleted.
+    """
+    counters = ChurchCounters.objects.filter(church__is_deleted=False)
+    if church_ids is not None:
+        counters = counters.filter(church_id__in=church_ids)
+    counters = counters.order_by('church_id').values('church_id', 'church__church_name', *fields.values())
+
+    rows = list(counters)
+    missing = set(church_ids or ()) - {row['church_id'] for row in rows}
+    if missing:
+        # Churches created without signals (e.g. bulk_create) get their counters on first use
+        rebuild_counters(missing)
+        rows = list(counters.all())
+
+    statistics = {}
+    for row in rows:
+        statistics[row['church_id']] = {
+            'church': row['church_id'],
+            'church_name': row['church__church_name'],
+            **{key: row[field] for key, field in fields.items()},
+        }
+    return statistics
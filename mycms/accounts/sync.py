@@ -0,0 +1,170 @@
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from announcement.models import ChurchAnnouncement
+from announcement.serializers import ChurchAnnouncementSerializer
+from attendance.models import ChurchServiceAttendance, ChoirAttendance
+from attendance.serializers import ChurchServiceAttendanceSerializer, ChoirAttendanceSerializer
+from church_activity.models import ChurchActivity
+from church_activity.serializers import ChurchActivitySerializer
+from due.models import ChoirDue
+from due.serializers import ChoirDueSerializer
+from song.models import ChoirSong
+from song.serializers import SongSerializer
+from tithe.models import ChurchTithe
+from tithe.serializers import TitheSerializer
+from .membership import ALL_ROLES, CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER
+from .models import ChurchAccount, DeletedRecord, MemberRegistration
+from .prefetch import optimize_for_serializer
+from .serializers import MemberRegistrationSerializer
+from .values import build_rows, values_mapping
+
+
+# Resources with a delta sync feed: name -> (model, serializer, roles allowed to read it)
+SYNC_RESOURCES = {
+    'members': (MemberRegistration, MemberRegistrationSerializer, (CHURCH_ADMIN, SECRETARY)),
+    'songs': (ChoirSong, SongSerializer, ALL_ROLES),
+    'announcements': (ChurchAnnouncement, ChurchAnnouncementSerializer, ALL_ROLES),
+    'activities': (ChurchActivity, ChurchActivitySerializer, ALL_ROLES),
+    'dues': (ChoirDue, ChoirDueSerializer, (CHURCH_ADMIN, CHOIR_DIRECTOR)),
+    'tithes': (ChurchTithe, TitheSerializer, (CHURCH_ADMIN, SECRETARY)),
+    'church-attendance': (ChurchServiceAttendance, ChurchServiceAttendanceSerializer, ALL_ROLES),
+    'choir-attendance': (ChoirAttendance, ChoirAttendanceSerializer, (CHURCH_ADMIN, CHOIR_DIRECTOR, CHOIR_MEMBER)),
+}
+SYNC_MODELS = {model: resource for resource, (model, _, _) in SYNC_RESOURCES.items()}
+
+_sync_settings = getattr(settings, 'DELTA_SYNC', {})
+PAGE_SIZE = _sync_settings.get('PAGE_SIZE', 100)
+MAX_PAGE_SIZE = _sync_settings.get('MAX_PAGE_SIZE', 500)
+# updated_at is set when a row is saved, not when its transaction commits: a feed reaching right up to now
+# could move its cursor past a change that commits a moment later. Changes younger than this wait for the next sync.
+SETTLE_SECONDS = _sync_settings.get('SETTLE_SECONDS', 2)
+
+
+def record_deletion(sender, instance, origin=None, **kwargs):
+    """
+    Leave a tombstone for a hard-deleted row of a synced resource.
+    Rows deleted along with their whole church need none (the church's tombstones go with it).
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(origin_model, ChurchAccount):
+        return
+    DeletedRecord.objects.create(
+        church_id=instance.church_id, resource=SYNC_MODELS[sender], object_id=instance.pk, deleted_at=timezone.now(),
+    )
+
+
+def encode_cursor(updated_at, pk):
+    payload = json.dumps({'v': updated_at.isoformat(), 'id': pk})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(encoded):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        value = parse_datetime(payload['v'])
+        if value is None:
+            raise ValueError
+        return value, None if payload['id'] is None else int(payload['id'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValidationError({'cursor': ["Invalid cursor."]})
+
+
+def parse_position(params):
+    """
+    Where a feed resumes: after a `?cursor=` from a previous response, or after `?updated_since=`
+    (an ISO 8601 timestamp; naive ones are in the current time zone). None starts from the beginning.
+    """
+    if params.get('cursor'):
+        return decode_cursor(params['cursor'])
+    since = params.get('updated_since')
+    if not since:
+        return None
+    try:
+        value = parse_datetime(since)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({'updated_since': ["Enter an ISO 8601 date and time, e.g. 2024-05-01T08:00:00Z."]})
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    # Every change at or before the timestamp is already known
+    return value, None
+
+
+def after(position, time_field, id_field):
+    value, pk = position
+    if pk is None:
+        return Q(**{f"{time_field}__gt": value})
+    # The redundant >= bounds the index range scan, which the OR alone does not
+    return Q(**{f"{time_field}__gte": value}) & (
+        Q(**{f"{time_field}__gt": value}) | Q(**{time_field: value, f"{id_field}__gt": pk})
+    )
+
+
+def tombstone(pk, updated_at):
+    return {'id': pk, 'is_deleted': True, 'updated_at': updated_at}
+
+
+def sync_page(queryset, resource, church_id, position, page_size, fields=None, request=None):
+    """
+    The next changes of a church's resource after `position`, oldest first: the rows created or updated,
+    in the serializer's output (narrowed to `fields`), and tombstones ({id, is_deleted: true, updated_at})
+    for rows soft-deleted or hard-deleted since. `position` is an (updated_at, id) pair (id None to resume
+    after everything at updated_at), or None for the whole history.
+    Returns (items, the cursor to resume from, whether more changes follow).
+    """
+    model, serializer_class, _ = SYNC_RESOURCES[resource]
+    horizon = timezone.now() - datetime.timedelta(seconds=SETTLE_SECONDS)
+
+    rows = queryset.filter(church_id=church_id, updated_at__lte=horizon)
+    deletions = DeletedRecord.objects.filter(church_id=church_id, resource=resource, deleted_at__lte=horizon)
+    if position is not None:
+        rows = rows.filter(after(position, 'updated_at', 'id'))
+        deletions = deletions.filter(after(position, 'deleted_at', 'object_id'))
+    rows = rows.order_by('updated_at', 'id')
+    deletions = deletions.order_by('deleted_at', 'object_id').values_list('object_id', 'deleted_at')[:page_size + 1]
+
+    mapping = values_mapping(serializer_class, model, fields)
+    if mapping is not None:
+        lookups = {lookup for _, lookup, _ in mapping}
+        rows = list(rows.values(*lookups, *({'id', 'updated_at', 'is_deleted'} - lookups))[:page_size + 1])
+        changes = [(row['updated_at'], row['id'], row) for row in rows]
+    else:
+        rows = list(optimize_for_serializer(rows, serializer_class)[:page_size + 1])
+        changes = [(row.updated_at, row.pk, row) for row in rows]
+    changes += [(deleted_at, pk, None) for pk, deleted_at in deletions]
+    changes.sort(key=lambda change: change[:2])
+
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+
+    # Live rows are rendered together, then put back in feed order between the tombstones
+    live = [row for _, _, row in changes if row is not None and not _is_deleted(row)]
+    if mapping is not None:
+        rendered = iter(build_rows(live, mapping, request))
+    else:
+        context = {'request': request, 'fields': fields} if fields is not None else {'request': request}
+        rendered = iter(serializer_class(live, many=True, context=context).data)
+
+    items = []
+    for updated_at, pk, row in changes:
+        if row is None or _is_deleted(row):
+            items.append(tombstone(pk, updated_at))
+        else:
+            items.append(next(rendered))
+    if changes:
+        position = changes[-1][:2]
+    cursor = encode_cursor(*position) if position is not None else None
+    return items, cursor, has_more
+
+
+def _is_deleted(row):
+    return row['is_deleted'] if isinstance(row, dict) else row.is_deleted
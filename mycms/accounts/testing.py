@@ -0,0 +1,89 @@
+import datetime
+from itertools import count
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .authentication import token_cache
+from .membership import membership_cache
+from .models import ChurchAccount, MemberRegistration
+
+
+# Keeps the emails of the rows created by the builders below unique within a test run
+_sequence = count(1)
+
+
+def create_church(name='Grace Chapel'):
+    """
+    A church and the user who administers it.
+    """
+    number = next(_sequence)
+    admin = User.objects.create_user(username=f'admin{number}@example.com', email=f'admin{number}@example.com')
+    return ChurchAccount.objects.create(
+        church_name=name, address='1 Broad Street', phone_number='231770000000',
+        email=f'office{number}@example.com', church_admin=admin,
+    )
+
+
+def create_member(church, full_name='Ama Mensah', **fields):
+    """
+    A registered member of `church`; any other member field can be given.
+    """
+    number = next(_sequence)
+    fields = {
+        'gender': 'Female', 'date_of_birth': datetime.date(1990, 1, 1), 'phone_number': f'2317700{number:05d}',
+        'email': f'member{number}@example.com', 'nationality': 'LR', 'address': 'Sinkor', **fields,
+    }
+    return MemberRegistration.objects.create(church=church, full_name=full_name, **fields)
+
+
+def create_account(model, church, member=None, **member_fields):
+    """
+    A role account (SecretaryAccount, ChoirDirectorAccount or ChoirMemberAccount) of `church`,
+    with its own user, for `member` or a new member.
+    """
+    member = member or create_member(church, **member_fields)
+    user = User.objects.create_user(username=member.email, email=member.email)
+    return model.objects.create(user=user, member=member, church=church)
+
+
+class QueryCountAssertionsMixin:
+    """
+    Test case mixin (for rest_framework.test.APITestCase) that fails when an endpoint
+    runs more SQL queries than its budget, or when its query count grows with the number of rows (N+1).
+    Queries are counted on a warm request, i.e. once the user's church membership is cached.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Database rows are rolled back between tests, cached lookups are not
+        membership_cache.clear()
+        token_cache.clear()
+
+    def get_endpoint_queries(self, url, user=None, method='get', **kwargs):
+        if user is not None:
+            self.client.force_authenticate(user=user)
+        if method == 'get':
+            self.client.get(url, **kwargs)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url} returned {response.status_code}")
+        return context.captured_queries
+
+    def assertEndpointQueries(self, url, max_queries, user=None, method='get', **kwargs):
+        """
+        Assert the endpoint runs at most `max_queries` queries.
+        """
+        queries = self.get_endpoint_queries(url, user=user, method=method, **kwargs)
+        if len(queries) > max_queries:
+            statements = "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(queries, start=1))
+            self.fail(f"{url} ran {len(queries)} queries, budget is {max_queries}:\n{statements}")
+
+    def assertConstantQueries(self, url, add_rows, user=None, method='get', **kwargs):
+        """
+        Assert the endpoint's query count does not change after `add_rows()` creates more rows.
+        """
+        before = len(self.get_endpoint_queries(url, user=user, method=method, **kwargs))
+        add_rows()
+        after = len(self.get_endpoint_queries(url, user=user, method=method, **kwargs))
+        self.assertEqual(before, after, f"{url} went from {before} to {after} queries after adding rows (N+1)")
@@ -1,3 +1,584 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from announcement.models import ChurchAnnouncement
+from attendance.models import ChoirAttendance
+from due.models import ChoirDue
+from song.models import ChoirSong
+from tithe.models import ChurchTithe
+from .authentication import token_cache
+from . import values
+from .cache import LRUCache
+from .counters import rebuild_counters
+from .membership import (
+    CHOIR_DIRECTOR, CHOIR_MEMBER, CHURCH_ADMIN, SECRETARY, get_cached_church_membership, membership_cache,
+)
+from .models import (
+    ChurchAccount, ChurchCounters, ChurchDepartment, ChoirDirectorAccount, DeletedRecord, ChoirMemberAccount, MemberRegistration, MemberSearchTrigram, SecretaryAccount,
+)
+from .serializers import MemberRegistrationSerializer
+from .testing import QueryCountAssertionsMixin, create_account, create_church, create_member
+
+
+class LRUCacheTests(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_entries_expire(self):
+        cache = LRUCache(timeout=-1)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+
+class ChurchMembershipCacheTests(APITestCase):
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+
+    def test_membership_is_resolved_once(self):
+        admin = self.church.church_admin
+        self.assertEqual(get_cached_church_membership(admin).role, CHURCH_ADMIN)
+        with self.assertNumQueries(0):
+            membership = get_cached_church_membership(admin)
+        self.assertEqual((membership.church_id, membership.role), (self.church.pk, CHURCH_ADMIN))
+
+    def test_role_account_changes_evict_the_user(self):
+        choir = create_account(ChoirMemberAccount, self.church)
+        self.assertEqual(get_cached_church_membership(choir.user).role, CHOIR_MEMBER)
+
+        secretary = SecretaryAccount.objects.create(user=choir.user, member=choir.member, church=self.church)
+        self.assertEqual(get_cached_church_membership(choir.user).role, SECRETARY)
+
+        secretary.delete()
+        choir.is_deleted = True
+        choir.save()
+        self.assertFalse(get_cached_church_membership(choir.user))
+
+    def test_users_keep_every_role_they_hold(self):
+        director = create_account(ChoirDirectorAccount, self.church)
+        SecretaryAccount.objects.create(user=director.user, member=director.member, church=self.church)
+        membership = get_cached_church_membership(director.user)
+        self.assertEqual((membership.role, membership.roles), (SECRETARY, {SECRETARY, CHOIR_DIRECTOR}))
+        # Cached entries keep them all too
+        self.assertEqual(get_cached_church_membership(director.user).roles, {SECRETARY, CHOIR_DIRECTOR})
+
+        self.client.force_authenticate(director.user)
+        # Director-only and secretary-only lists
+        self.assertEqual(self.client.get('/due/api/choir-dues/').status_code, 200)
+        self.assertEqual(self.client.get('/api/members/').status_code, 200)
+        self.assertEqual(self.client.get('/api/secretaries/').status_code, 200)
+
+    def test_soft_deleted_secretaries_lose_the_role(self):
+        choir = create_account(ChoirMemberAccount, self.church)
+        secretary = SecretaryAccount.objects.create(user=choir.user, member=choir.member, church=self.church)
+        self.assertTrue(get_cached_church_membership(choir.user).allows(SECRETARY))
+
+        secretary.is_deleted = True
+        secretary.save()
+        membership = get_cached_church_membership(choir.user)
+        self.assertEqual(membership.roles, {CHOIR_MEMBER})
+        self.assertFalse(membership.allows(SECRETARY, CHURCH_ADMIN))
+
+        self.client.force_authenticate(choir.user)
+        self.assertEqual(self.client.get('/api/members/').status_code, 403)
+        self.assertEqual(self.client.get('/song/api/songs/').status_code, 200)
+
+    def test_church_changes_evict_its_users(self):
+        choir = create_account(ChoirMemberAccount, self.church)
+        get_cached_church_membership(choir.user)
+        get_cached_church_membership(self.church.church_admin)
+
+        self.church.is_deleted = True
+        self.church.save()
+        self.assertIsNone(membership_cache.get(choir.user.pk))
+        self.assertIsNone(membership_cache.get(self.church.church_admin_id))
+        self.assertFalse(get_cached_church_membership(choir.user))
+
+    def test_church_scoped_writes_do_not_load_the_church(self):
+        admin = self.church.church_admin
+        self.client.force_authenticate(admin)
+        get_cached_church_membership(admin)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/api/create/departments/', {'name': 'Ushers'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['church'], self.church.pk)
+        self.assertFalse([query for query in context.captured_queries if 'FROM "accounts_churchaccount"' in query['sql']])
+
+    def test_records_of_other_churches_are_not_found(self):
+        other = create_member(create_church('Bethel'))
+        self.client.force_authenticate(self.church.church_admin)
+        self.assertEqual(self.client.get(f'/api/members/{other.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/members/{create_member(self.church).pk}/').status_code, 200)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        membership_cache.clear()
+        self.church = create_church()
+        self.token = Token.objects.create(user=self.church.church_admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_token_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/departments/')
+        return response, [query for query in context.captured_queries if 'authtoken_token' in query['sql']]
+
+    def test_repeat_requests_skip_the_token_lookup(self):
+        response, queries = self.get_token_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.get_token_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_deleted_token_stops_authenticating(self):
+        self.get_token_queries()
+        self.token.delete()
+        self.assertEqual(str(self.get_token_queries()[0].data['detail']), "Invalid token.")
+
+    def test_deactivated_user_stops_authenticating(self):
+        self.get_token_queries()
+        admin = self.church.church_admin
+        admin.is_active = False
+        admin.save()
+        self.assertEqual(str(self.get_token_queries()[0].data['detail']), "User inactive or deleted.")
+
+    @mock.patch('accounts.authentication.SHARED_CACHE_ALIAS', 'default')
+    def test_shared_cache_evictions_reach_every_process(self):
+        self.assertEqual(len(self.get_token_queries()[1]), 1)
+        # Another process starts with an empty local cache but finds the shared entry
+        token_cache.clear()
+        response, queries = self.get_token_queries()
+        self.assertEqual((response.status_code, queries), (200, []))
+
+        self.token.delete()
+        self.assertEqual(str(self.get_token_queries()[0].data['detail']), "Invalid token.")
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        members = [create_member(self.church, full_name=f'Member {number}') for number in range(7)]
+        # Rows sharing a created_at are ordered by id, so no page boundary skips or repeats them
+        tied = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        MemberRegistration.objects.filter(pk__in=[member.pk for member in members[2:5]]).update(created_at=tied)
+        self.expected = list(
+            MemberRegistration.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+        self.client.force_authenticate(self.church.church_admin)
+
+    def test_pages_follow_created_at_then_id(self):
+        seen, url = [], '/api/members/?pagination=cursor&page_size=2&count=exact'
+        while url:
+            data = self.client.get(url).data
+            self.assertEqual(data['count'], 7)
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_link_returns_the_page_before(self):
+        first = self.client.get('/api/members/?pagination=cursor&page_size=3').data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        self.assertEqual([row['id'] for row in second['results']], self.expected[3:6])
+        back = self.client.get(second['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], self.expected[:3])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/members/?cursor=garbage').status_code, 404)
+
+
+class ChoirAccountListQueryTests(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.church = create_church()
+        self.admin = self.church.church_admin
+
+    def add_accounts(self, model, count):
+        for _ in range(count):
+            create_account(model, self.church)
+
+    def test_choir_directors(self):
+        self.add_accounts(ChoirDirectorAccount, 2)
+        self.assertConstantQueries(
+            '/api/choir/directors/', lambda: self.add_accounts(ChoirDirectorAccount, 5), user=self.admin,
+        )
+        self.assertEndpointQueries('/api/choir/directors/', 1, user=self.admin)
+
+    def test_choir_members(self):
+        self.add_accounts(ChoirMemberAccount, 2)
+        self.assertConstantQueries(
+            '/api/choir/members/', lambda: self.add_accounts(ChoirMemberAccount, 5), user=self.admin,
+        )
+        self.assertEndpointQueries('/api/choir/members/', 2, user=self.admin)
+
+    def test_secretaries(self):
+        self.add_accounts(SecretaryAccount, 2)
+        self.assertConstantQueries(
+            '/api/secretaries/', lambda: self.add_accounts(SecretaryAccount, 5), user=self.admin,
+        )
+        self.assertEndpointQueries('/api/secretaries/', 1, user=self.admin)
+
+
+class SeedLoadTests(TestCase):
+    def test_seeds_consistent_data(self):
+        call_command(
+            'seed_load', churches=1, members=30, choir_members=5, years=1, songs=3, announcements=3,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(MemberRegistration.objects.count(), 30)
+        self.assertEqual(ChoirMemberAccount.objects.count(), 5)
+        # The derived tables are rebuilt after the bulk inserts
+        self.assertEqual(rebuild_counters(), {})
+        self.assertTrue(MemberSearchTrigram.objects.exists())
+        self.assertFalse(ChoirDue.objects.filter(period__isnull=True).exists())
+
+    def test_same_seed_and_end_date_give_the_same_data(self):
+        options = dict(churches=1, members=10, choir_members=3, years=1, songs=1, announcements=1, stdout=io.StringIO())
+        for _ in range(2):
+            call_command('seed_load', end_date=datetime.date(2025, 3, 31), **options)
+        first, second = (
+            list(ChurchTithe.objects.filter(church=church).order_by('member_id').values_list('payment_date', 'usd_amount'))
+            for church in ChurchAccount.objects.order_by('pk')
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(ChoirDue.objects.latest('period').period, datetime.date(2025, 3, 1))
+        self.assertLessEqual(ChoirAttendance.objects.latest('date').date, datetime.date(2025, 3, 31))
+
+
+class BenchmarkIndexesTests(TestCase):
+    def test_refuses_to_drop_indexes_without_debug(self):
+        with self.assertRaisesMessage(CommandError, "--i-know"):
+            call_command('benchmark_indexes')
+        # Past the guard, an empty database has nothing to benchmark
+        with self.assertRaisesMessage(CommandError, "No church data found"):
+            call_command('benchmark_indexes', i_know=True)
+
+
+class QueryTimingMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.church = create_church()
+        self.client.force_authenticate(self.church.church_admin)
+
+    @override_settings(QUERY_TIMING={'SAMPLE_RATE': 100})
+    def test_sampled_requests_get_server_timing(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/departments/')
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', response['Server-Timing'])
+
+    @override_settings(QUERY_TIMING={'SAMPLE_RATE': 0})
+    def test_unsampled_requests_are_timed_without_query_capture(self):
+        self.assertRegex(self.client.get('/api/departments/')['Server-Timing'], r'^total;dur=[\d.]+$')
+
+    @override_settings(QUERY_TIMING={'SAMPLE_RATE': 0, 'SLOW_REQUEST_MS': 0})
+    def test_unsampled_slow_requests_are_logged(self):
+        with self.assertLogs('accounts.middleware', 'WARNING') as logs:
+            self.client.get('/api/departments/')
+        self.assertIn('DepartmentListView', logs.output[0])
+        self.assertIn('queries not sampled', logs.output[0])
+
+    @override_settings(QUERY_TIMING={'SAMPLE_RATE': 100, 'SLOW_REQUEST_MS': 0})
+    def test_slow_requests_are_logged_with_their_view(self):
+        with self.assertLogs('accounts.middleware', 'WARNING') as logs:
+            self.client.get('/api/departments/')
+        self.assertIn('DepartmentListView', logs.output[0])
+
+
+class StatisticsViewTests(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.church = create_church()
+        self.other = create_church('Bethel')
+        create_member(self.church, gender='Male')
+        create_account(ChoirMemberAccount, self.church, gender='Female')
+        create_member(self.other)
+
+    def test_church_users_get_their_church_totals(self):
+        self.client.force_authenticate(self.church.church_admin)
+        data = self.client.get('/api/general-stats/').data
+        self.assertEqual(
+            data, {'total_members': 2, 'total_female': 1, 'total_male': 1, 'total_choirs': 1, 'total_announcements': 0}
+        )
+        data = self.client.get('/api/choir-stats/').data
+        self.assertEqual(data, {'total_choirs': 1, 'total_female': 1, 'total_male': 0})
+        self.assertEndpointQueries('/api/general-stats/', 1)
+
+    def test_system_admins_get_every_church(self):
+        superuser = User.objects.create_superuser(username='root', email='root@example.com')
+        self.client.force_authenticate(superuser)
+        data = self.client.get('/api/general-stats/').data
+        self.assertEqual(data['total_members'], 3)
+        self.assertEqual(
+            {church['church']: church['total_members'] for church in data['churches']},
+            {self.church.pk: 2, self.other.pk: 1},
+        )
+        data = self.client.get(f'/api/general-stats/?church={self.other.pk}').data
+        self.assertEqual((data['church'], data['total_members']), (self.other.pk, 1))
+
+
+class ChurchCountersTests(TestCase):
+    def setUp(self):
+        self.church = create_church()
+
+    def counters(self, *fields):
+        counters = ChurchCounters.objects.get(church=self.church)
+        return tuple(getattr(counters, field) for field in fields)
+
+    def test_signals_keep_counters_in_step(self):
+        male = create_member(self.church, gender='Male')
+        choir = create_account(ChoirMemberAccount, self.church, gender='Female')
+        create_member(self.church, status='suspended')
+        create_account(SecretaryAccount, self.church)
+        song = ChoirSong.objects.create(church=self.church, title='Amazing Grace', song_content='How sweet the sound')
+        ChurchAnnouncement.objects.create(church=self.church, title='Harvest', content='Sunday')
+        self.assertEqual(self.counters('members', 'male_members', 'suspended_members', 'choir_members'), (4, 1, 1, 1))
+
+        # A choir member changing gender moves between the gendered choir counters
+        choir.member.gender = 'Male'
+        choir.member.save()
+        self.assertEqual(self.counters('female_choir_members', 'male_choir_members'), (0, 1))
+
+        male.is_deleted = True
+        male.save()
+        choir.is_deleted = True
+        choir.save()
+        song.delete()
+        self.assertEqual(self.counters('members', 'male_members', 'choir_members', 'songs'), (3, 1, 0, 0))
+
+        # Nothing left for a recount to correct
+        self.assertEqual(rebuild_counters(), {})
+
+    def test_rebuild_fixes_writes_that_skip_signals(self):
+        create_member(self.church)
+        create_member(self.church)
+        MemberRegistration.objects.filter(church=self.church).update(is_deleted=True)
+
+        output = io.StringIO()
+        call_command('rebuild_counters', church=[self.church.pk], stdout=output)
+        self.assertIn('members 2 -> 0', output.getvalue())
+        self.assertEqual(self.counters('members', 'female_members', 'active_members'), (0, 0, 0))
+        self.assertEqual(rebuild_counters(), {})
+
+
+class MemberImportTests(APITestCase):
+    url = '/api/import/members/'
+    header = 'full_name,email,phone_number,gender,date_of_birth,nationality,address,department\n'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.department = ChurchDepartment.objects.create(church=self.church, name='Ushers')
+        self.taken = create_member(self.church)
+        self.client.force_authenticate(self.church.church_admin)
+
+    def upload(self, rows, name='members.csv'):
+        upload = SimpleUploadedFile(name, (self.header + rows).encode(), content_type='text/csv')
+        return self.client.post(self.url, {'file': upload}, format='multipart')
+
+    @mock.patch('accounts.imports.IMPORT_CHUNK_SIZE', 2)
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        response = self.upload(
+            'Kofi Boateng,kofi@example.com,231770000001,Male,1990-02-01,Liberia,Sinkor,ushers\n'
+            'Ama Owusu,ama@example.com,231770000002,Female,1991-03-04,LR,Paynesville,\n'
+            f'Taken Email,{self.taken.email},231770000003,Male,1992-01-01,LR,Sinkor,\n'
+            'Bad Date,bad@example.com,231770000004,Male,not a date,LR,Sinkor,\n'
+            'Twice,ama@example.com,231770000005,Female,1993-01-01,LR,Sinkor,\n'
+            'No Department,nodept@example.com,231770000006,Male,1994-01-01,LR,Sinkor,Choir\n'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 4))
+        self.assertEqual(
+            {error['row']: set(error['errors']) for error in response.data['errors']},
+            {4: {'email'}, 5: {'date_of_birth'}, 6: {'email'}, 7: {'department'}},
+        )
+
+        kofi = MemberRegistration.objects.get(email='kofi@example.com')
+        self.assertEqual((kofi.church_id, kofi.department_id, kofi.nationality.code), (self.church.pk, self.department.pk, 'LR'))
+        # bulk_create skips the signals, so the import keeps the counters and the search index itself
+        self.assertEqual(ChurchCounters.objects.get(church=self.church).members, 3)
+        self.assertTrue(MemberSearchTrigram.objects.filter(member=kofi).exists())
+
+    def test_file_type_is_checked(self):
+        self.assertEqual(self.upload('', name='members.txt').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {}, format='multipart').status_code, 400)
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        for number in range(12):
+            create_member(self.church, full_name=f'Member {number}')
+        create_member(create_church('Bethel'))
+        self.client.force_authenticate(self.church.church_admin)
+
+    def export(self, export_format):
+        response = self.client.get(f'/api/members/?format={export_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_and_jsonl_hold_the_same_values(self):
+        csv_rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        jsonl_rows = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        # Every row of the church, not a page
+        self.assertEqual(len(csv_rows), 12)
+        for csv_row, jsonl_row in zip(csv_rows, jsonl_rows):
+            for field in ('id', 'full_name', 'date_of_birth', 'created_at'):
+                self.assertEqual(csv_row[field], str(jsonl_row[field]))
+
+        # Datetimes are written as the API renders them
+        listed = {row['id']: row for row in self.client.get('/api/members/?page_size=100').data['results']}
+        self.assertEqual(jsonl_rows[0]['created_at'], listed[jsonl_rows[0]['id']]['created_at'])
+
+
+class MemberSearchTests(APITestCase):
+    url = '/api/members/search/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.kofi = create_member(self.church, full_name='Kofi Boateng')
+        self.ama = create_member(self.church, full_name='Ama Owusu')
+        create_member(create_church('Bethel'), full_name='Kofi Boateng')
+        self.client.force_authenticate(self.church.church_admin)
+
+    def search(self, text):
+        response = self.client.get(self.url, {'q': text})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_typos_and_prefixes_find_the_member_of_the_church(self):
+        self.assertEqual(self.search('Kofi Boateng'), [self.kofi.pk])
+        self.assertEqual(self.search('Kofy Boatang'), [self.kofi.pk])
+        self.assertEqual(self.search('Owu'), [self.ama.pk])
+
+    def test_soft_deleted_members_are_not_found(self):
+        self.kofi.is_deleted = True
+        self.kofi.save()
+        self.assertFalse(MemberSearchTrigram.objects.filter(member=self.kofi).exists())
+        self.assertEqual(self.search('Kofi Boateng'), [])
+
+        # Nor does a full reindex bring them back
+        call_command('rebuild_member_search', stdout=io.StringIO())
+        self.assertFalse(MemberSearchTrigram.objects.filter(member=self.kofi).exists())
+
+        self.kofi.is_deleted = False
+        self.kofi.save(update_fields=['is_deleted'])
+        self.assertEqual(self.search('Kofi Boateng'), [self.kofi.pk])
+
+
+class MemberListValuesTests(APITestCase):
+    url = '/api/members/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        department = ChurchDepartment.objects.create(church=self.church, name='Ushers')
+        create_member(self.church, full_name='Kofi Boateng', department=department, profile_image='profile_photos/kofi.jpg')
+        create_member(self.church, full_name='Ama Owusu', nationality='GH')
+        self.client.force_authenticate(self.church.church_admin)
+
+    def test_rows_match_the_serializer(self):
+        with mock.patch('accounts.values.build_rows', wraps=values.build_rows) as build_rows:
+            response = self.client.get(self.url)
+        build_rows.assert_called_once()
+
+        request = Request(APIRequestFactory().get(self.url))
+        members = MemberRegistration.objects.filter(church=self.church)
+        serialized = MemberRegistrationSerializer(members, many=True, context={'request': request}).data
+        listed = {row['full_name']: row for row in response.data['results']}
+        self.assertEqual(listed, {row['full_name']: row for row in serialized})
+        # Country names and absolute image URLs, as the serializer renders them
+        self.assertEqual(listed['Ama Owusu']['nationality'], 'Ghana')
+        self.assertEqual(listed['Kofi Boateng']['profile_image'], 'http://testserver/media/profile_photos/kofi.jpg')
+
+
+@mock.patch('accounts.sync.SETTLE_SECONDS', 0)
+class DeltaSyncTests(APITestCase):
+    url = '/api/sync/songs/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.songs = [ChoirSong.objects.create(church=self.church, title=f'Hymn {number}') for number in range(3)]
+        ChoirSong.objects.create(church=create_church('Bethel'), title='Other church')
+        self.client.force_authenticate(self.church.church_admin)
+
+    def feed(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_follow_the_cursor(self):
+        first = self.feed(page_size=2)
+        self.assertEqual([item['id'] for item in first['results']], [song.pk for song in self.songs[:2]])
+        self.assertIsNotNone(first['next'])
+
+        second = self.feed(page_size=2, cursor=first['cursor'])
+        self.assertEqual([item['id'] for item in second['results']], [self.songs[2].pk])
+        self.assertIsNone(second['next'])
+
+        # Nothing changed since: the kept cursor returns an empty page and stays put
+        third = self.feed(cursor=second['cursor'])
+        self.assertEqual((third['results'], third['cursor']), ([], second['cursor']))
+
+    def test_changes_and_deletions_since_the_cursor(self):
+        cursor = self.feed()['cursor']
+
+        edited, soft_deleted, removed = self.songs
+        removed_pk = removed.pk
+        edited.title = 'Hymn 0 (new key)'
+        edited.save()
+        soft_deleted.is_deleted = True
+        soft_deleted.save()
+        removed.delete()
+
+        results = self.feed(cursor=cursor)['results']
+        self.assertEqual([item['id'] for item in results], [edited.pk, soft_deleted.pk, removed_pk])
+        self.assertEqual(results[0]['title'], 'Hymn 0 (new key)')
+        self.assertEqual(set(results[1]), {'id', 'is_deleted', 'updated_at'})
+        self.assertEqual(set(results[2]), {'id', 'is_deleted', 'updated_at'})
+        self.assertTrue(results[2]['is_deleted'])
+
+        # Hard deletes of a whole church leave no tombstones
+        other = create_church('Calvary')
+        ChoirSong.objects.create(church=other, title='Gone with the church')
+        other.delete()
+        self.assertEqual(DeletedRecord.objects.count(), 1)
+
+    def test_updated_since(self):
+        self.assertEqual(self.feed(updated_since='2000-01-01T00:00:00Z')['results'][0]['id'], self.songs[0].pk)
+        self.assertEqual(self.feed(updated_since='2999-01-01T00:00:00')['results'], [])
+        self.assertEqual(self.client.get(self.url, {'updated_since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+    def test_resources_follow_the_list_permissions(self):
+        self.assertEqual(self.client.get('/api/sync/unknown/').status_code, 404)
+        member = create_account(ChoirMemberAccount, self.church)
+        self.client.force_authenticate(member.user)
+        self.assertEqual(self.client.get('/api/sync/songs/').status_code, 200)
+        self.assertEqual(self.client.get('/api/sync/members/').status_code, 403)
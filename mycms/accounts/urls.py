@@ -11,11 +11,17 @@ urlpatterns = [
 
     # member endpoint
     path('api/create/members/', views.MemberCreateView.as_view(), name='register-member'),
+    path('api/import/members/', views.MemberImportView.as_view(), name='import-members'),
     path('api/members/', views.MemberListView.as_view(), name='member-list'),
+    path('api/members/search/', views.MemberSearchView.as_view(), name='member-search'),
     path('api/members/<int:pk>/', views.MemberDetailView.as_view(), name='member-update-delete'),
 
     path('api/general-stats/', views.GeneralStatisticsView.as_view(), name='general-stats'),
     path('api/choir-stats/', views.ChoirStatsView.as_view(), name='choir-stats'),
+    path('api/membership-cache-stats/', views.MembershipCacheStatsView.as_view(), name='membership-cache-stats'),
+
+    # Delta sync feeds for offline clients
+    path('api/sync/<str:resource>/', views.DeltaSyncView.as_view(), name='delta-sync'),
 
     # Department endpoints
     path('api/create/departments/',views.DepartmentCreateView.as_view()),
@@ -0,0 +1,167 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .prefetch import SerializerRelatedMixin
+
+
+# Fields whose output is the database value itself, so values() rows need no conversion
+PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.IntegerField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+def _lookup(model, source):
+    """
+    The values() lookup and model field behind a dotted serializer source ('choir_member.member.full_name').
+    """
+    path, current, model_field = [], model, None
+    for name in source.split('.'):
+        if current is None:
+            raise UnsupportedField(source)
+        try:
+            model_field = current._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise UnsupportedField(source)
+        if model_field.many_to_many or model_field.one_to_many:
+            raise UnsupportedField(source)
+        path.append(name)
+        current = model_field.related_model
+    return '__'.join(path), model_field
+
+
+def _converter(field, model_field):
+    """
+    How a values() value becomes the field's output: None if it is output as is, else a function
+    of (value, context). Raises UnsupportedField for fields that need the model instance.
+    Dates, datetimes and decimals in DRF's default formats get a shortcut; anything else calls
+    the field's own to_representation().
+    """
+    if hasattr(field, 'values_converter'):
+        convert = field.values_converter()
+        return lambda value, context: convert(value)
+    if isinstance(field, serializers.FileField):
+        storage = model_field.storage
+        if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return lambda value, context: value or None
+
+        def file_url(value, context):
+            if not value:
+                return None
+            url = storage.url(value)
+            request = context['request']
+            return request.build_absolute_uri(url) if request is not None else url
+        return file_url
+    if isinstance(field, PLAIN_FIELDS):
+        return None
+    if isinstance(field, (serializers.RelatedField, serializers.BaseSerializer, serializers.SerializerMethodField)):
+        raise UnsupportedField(field.field_name)
+
+    if isinstance(field, serializers.DateTimeField) and _iso_format(field, api_settings.DATETIME_FORMAT):
+        if hasattr(field, 'timezone'):
+            return lambda value, context: field.to_representation(value)
+
+        def datetime_iso(value, context):
+            if value.tzinfo is None or context['timezone'] is None:
+                return field.to_representation(value)
+            value = value.astimezone(context['timezone']).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return datetime_iso
+    if isinstance(field, serializers.DateField) and _iso_format(field, api_settings.DATE_FORMAT):
+        return lambda value, context: value.isoformat()
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if isinstance(field, serializers.DecimalField) and coerce_to_string and field.decimal_places is not None and not field.localize:
+        exponent = -field.decimal_places
+
+        def decimal_string(value, context):
+            # The database already returns the field's decimal places; others are quantized by DRF
+            if value.as_tuple().exponent == exponent:
+                return f"{value:f}"
+            return field.to_representation(value)
+        return decimal_string
+    return lambda value, context: field.to_representation(value)
+
+
+def _iso_format(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+@lru_cache(maxsize=256)
+def values_mapping(serializer_class, model, fields=None):
+    """
+    Precompile how to build a serializer's output from queryset.values() rows:
+    a tuple of (output name, values() lookup, converter) per rendered field.
+    None if the serializer cannot be rendered that way (methods, nested serializers,
+    many relations, or its own to_representation()); it is then serialized as usual.
+    """
+    if serializer_class.to_representation is not serializers.Serializer.to_representation:
+        return None
+    mapping = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only or (fields is not None and name not in fields):
+            continue
+        if field.source == '*':
+            return None
+        try:
+            lookup, model_field = _lookup(model, field.source)
+            mapping.append((name, lookup, _converter(field, model_field)))
+        except UnsupportedField:
+            return None
+    return tuple(mapping)
+
+
+def build_rows(rows, mapping, request=None):
+    """
+    Turn values() rows into the serializer's output.
+    """
+    context = {
+        'request': request,
+        'timezone': timezone.get_current_timezone() if settings.USE_TZ else None,
+    }
+    results = []
+    for row in rows:
+        item = {}
+        for name, lookup, convert in mapping:
+            value = row[lookup]
+            item[name] = value if convert is None or value is None else convert(value, context)
+        results.append(item)
+    return results
+
+
+class ValuesListMixin(SerializerRelatedMixin):
+    """
+    List view mixin that builds rows from queryset.values() with a precompiled field mapping
+    instead of running the ModelSerializer per row and field. The output is the same as the
+    serializer's; views whose serializer cannot be mapped (see values_mapping) serialize as usual.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        fields, narrowed = self.get_sparse_fields()
+        mapping = values_mapping(self.get_serializer_class(), queryset.model, fields if narrowed else None)
+        if mapping is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(queryset)
+        self.count_queryset = queryset
+        # The pagination reads the id and ordering field of the rows to build its cursors
+        ordering_field = getattr(self, 'keyset_ordering_field', 'created_at')
+        keep = {'id', *(f.name for f in queryset.model._meta.concrete_fields if f.name == ordering_field)}
+        lookups = {lookup for _, lookup, _ in mapping}
+        queryset = queryset.values(*lookups, *(keep - lookups))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(build_rows(page, mapping, request))
+        return Response(build_rows(queryset, mapping, request))
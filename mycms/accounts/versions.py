@@ -0,0 +1,95 @@
+from functools import wraps
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from announcement.models import ChurchAnnouncement
+from church_activity.models import ChurchActivity
+from song.models import ChoirSong
+from .membership import ALL_ROLES
+from .models import ChurchDepartment, ChurchVersion
+
+
+# Church resources served with ETag / Last-Modified: model -> resource name
+VERSIONED_MODELS = {
+    ChurchAnnouncement: 'announcements',
+    ChoirSong: 'songs',
+    ChurchActivity: 'activities',
+    ChurchDepartment: 'departments',
+}
+RESOURCES = tuple(VERSIONED_MODELS.values())
+
+
+def create_versions(church_ids):
+    """
+    Start the versions of the given churches' resources, so every later write finds a row to bump.
+    """
+    now = timezone.now()
+    ChurchVersion.objects.bulk_create(
+        [ChurchVersion(church_id=church_id, resource=resource, updated_at=now) for church_id in church_ids for resource in RESOURCES],
+        ignore_conflicts=True,
+    )
+
+
+def bump_version(church_id, resource):
+    """
+    Mark a church's resource as changed. Runs in the writer's transaction, so readers see the new
+    version exactly when they can see the write.
+    """
+    ChurchVersion.objects.filter(church_id=church_id, resource=resource).update(
+        version=F('version') + 1, updated_at=timezone.now(),
+    )
+
+
+def bump_version_on_write(sender, instance, **kwargs):
+    """
+    Saving or deleting a row (soft deletes are saves) changes its church's version of the resource.
+    """
+    bump_version(instance.church_id, VERSIONED_MODELS[sender])
+
+
+def version_stamp(church_id, resource):
+    """
+    The (version, updated_at) of a church's resource, created for churches that predate the versions.
+    """
+    version, _ = ChurchVersion.objects.get_or_create(
+        church_id=church_id, resource=resource, defaults={'updated_at': timezone.now()},
+    )
+    return version.version, version.updated_at
+
+
+def conditional_get(resource, roles=ALL_ROLES):
+    """
+    Decorator for the get() of views serving one of the church's `resource`.
+    Responses carry an ETag and Last-Modified taken from the church's version of the resource, and a
+    request whose If-None-Match / If-Modified-Since still matches gets a 304 without the view running.
+    Users without one of `roles` (who get an error from the view) and system admins are served as usual.
+    Last-Modified has one-second precision, so clients should revalidate with the ETag.
+    Reading the version is one query: a 304 costs only that, a 200 costs it on top of the view's own.
+    """
+    def decorator(get):
+        @wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            membership = request.church_membership
+            if not membership.allows(*roles):
+                return get(view, request, *args, **kwargs)
+
+            version, updated_at = version_stamp(membership.church_id, resource)
+            # The same URL rendered as JSON, HTML or CSV must not share a tag
+            renderer = getattr(request, 'accepted_renderer', None)
+            etag = f'W/"{resource}-{membership.church_id}-{version}-{getattr(renderer, "format", "")}"'
+            last_modified = int(updated_at.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = get(view, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers['ETag'] = etag
+                response.headers['Last-Modified'] = http_date(last_modified)
+                # Per-user data: browsers may keep it, but must revalidate before reuse
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -1,11 +1,12 @@
 from django.shortcuts import get_object_or_404
-from .serializers import ChurchAccountSerializer,MemberRegistrationSerializer, ChoirDirectorAccountSerializer,ChoirMemberAccountSerializer, SecretaryAccountAccountSerializer,DepartmentSerializer
+from .serializers import ChurchAccountSerializer,MemberRegistrationSerializer, MemberSearchResultSerializer, ChoirDirectorAccountSerializer,ChoirMemberAccountSerializer, SecretaryAccountAccountSerializer,DepartmentSerializer
 
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import generics 
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.authtoken.models import Token
 from .models import ChurchAccount, ChoirDirectorAccount, MemberRegistration,ChoirMemberAccount, SecretaryAccount, ChurchDepartment
 from django.core.exceptions import PermissionDenied
@@ -14,15 +15,20 @@ from django.contrib.auth import authenticate
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import PermissionDenied, NotFound
-from rest_framework.pagination import PageNumberPagination
-from announcement.models import ChurchAnnouncement
+from .pagination import CustomPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .prefetch import SerializerRelatedMixin, optimize_for_serializer
+from .exports import ExportMixin
+from .values import ValuesListMixin
+from .imports import IMPORT_FORMATS, import_members
+from .search import SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_members
+from .versions import conditional_get
+from .sync import SYNC_RESOURCES, PAGE_SIZE, MAX_PAGE_SIZE, parse_position, sync_page
+from .fieldsets import readable_fields, select_fields
+from .statistics import STATISTICS_FIELDS, CHOIR_STATISTICS_FIELDS, church_statistics
+from .membership import CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER, membership_cache_stats
 
 
-class CustomPagination(PageNumberPagination):
-    page_size = 10  # Default items per page
-    page_size_query_param = 'page_size'  # Allow client to specify page size
-    max_page_size = 100  # Max items per page
-
 class CreateChurchAccount(generics.CreateAPIView):
     """
     Create a new church account. Only superusers (system admins) can perform this action.
@@ -54,7 +60,7 @@ class CreateChurchAccount(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChurchAccountList(generics.ListAPIView):
+class ChurchAccountList(SerializerRelatedMixin, generics.ListAPIView):
     """
     List all church accounts.
     """
@@ -137,7 +143,7 @@ class ChurchAccountDeleteView(APIView):
 
 ########################################################    
 
-class MemberListView(generics.ListAPIView):
+class MemberListView(ExportMixin, ValuesListMixin, generics.ListAPIView):
     """
     View to retrieve all members with pagination and filtering.
     Both Church Admin and Secretary can access this view.
@@ -145,22 +151,45 @@ class MemberListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = MemberRegistrationSerializer
     pagination_class = CustomPagination
+    export_fields = [
+        'id', 'full_name', 'gender', 'date_of_birth', 'phone_number', 'email', 'nationality', 'address',
+        'department__name', 'status', 'is_deleted', 'created_at',
+    ]
+    export_filename = 'members'
     # filter_backends = [DjangoFilterBackend]
     # filterset_fields = ['full_name', 'gender', 'email']  # Add filterable fields
 
     def get_queryset(self):
         # Determine the church account based on the user role
-        try:
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=self.request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to view members.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to view members.")
 
         # Query members associated with the church
-        return MemberRegistration.objects.filter(church=church_account)
+        return MemberRegistration.objects.filter(church_id=membership.church_id)
+
+class MemberSearchView(APIView):
+    """
+    View to find members by name, phone number or email, tolerating typos and partial words.
+    `?q=` is the search text (words of at least two characters) and `?limit=` the number of results (20 by default, at most 100), best match first.
+    Both Church Admin and Secretary can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to view members.")
+
+        try:
+            limit = min(int(request.query_params.get('limit', SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            return Response({"limit": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        text = request.query_params.get('q', '')
+        members = search_members(MemberRegistration.objects.all(), membership.church_id, text, max(limit, 1))
+        serializer = MemberSearchResultSerializer(members, many=True, context={"request": request})
+        return Response({"results": serializer.data}, status=status.HTTP_200_OK)
 
 class MemberCreateView(APIView):
     """
@@ -176,26 +205,18 @@ class MemberCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChoirMemberAccount.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a church secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                return Response(
-                    {"detail": "You are not associated with any church."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -204,6 +225,37 @@ class MemberCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class MemberImportView(APIView):
+    """
+    View to register many members at once from an uploaded CSV or XLSX file (multipart field `file`).
+    The header row names the member fields: full_name, email, phone_number, gender, date_of_birth,
+    nationality, address and optionally department (id or name).
+    Valid rows are created; invalid rows are returned with their row number and errors.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        if request.user.is_superuser:
+            raise PermissionDenied("Superusers are not allowed to perform CRUD operations on members.")
+
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in IMPORT_FORMATS:
+            return Response({"file": ["Upload a .csv or .xlsx file."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = import_members(upload, membership.church_id, file_format)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST)
+
 class MemberDetailView(APIView):
     """
     View to retrieve, update, and delete a member.
@@ -212,27 +264,22 @@ class MemberDetailView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = MemberRegistrationSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=user)
-                return secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage members.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and secretary can manage members
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to manage members.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the MemberRegistration object and ensure it belongs to the church.
         """
         try:
-            return MemberRegistration.objects.get(id=pk, church=church)
+            return MemberRegistration.objects.get(id=pk, church_id=church_id)
         except MemberRegistration.DoesNotExist:
             raise NotFound("Member not found or you do not have permission to access this record.")
 
@@ -240,8 +287,8 @@ class MemberDetailView(APIView):
         """
         Retrieve a member by their ID.
         """
-        church = self.get_church(request.user)
-        member = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        member = self.get_object(pk, church_id)
         serializer = MemberRegistrationSerializer(member)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -249,8 +296,8 @@ class MemberDetailView(APIView):
         """
         Update a member's information.
         """
-        church = self.get_church(request.user)
-        member = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        member = self.get_object(pk, church_id)
         serializer = MemberRegistrationSerializer(member, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -261,8 +308,8 @@ class MemberDetailView(APIView):
         """
         Delete a member.
         """
-        church = self.get_church(request.user)
-        member = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        member = self.get_object(pk, church_id)
         member.delete()
         return Response({"detail": "Member has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
@@ -282,20 +329,13 @@ class ChoirMemberAccountCreateAPIView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChoirMemberAccount.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        try:
-            # If the user is a church admin, fetch the church they manage
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a choir director
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                return Response({"detail": "You do not belong to any church."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Pass the ChurchAccount instance to the serializer
-        serializer = self.serializer_class(data=request.data, context={"church": church_account})
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or choir director)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            return Response({"detail": "You do not belong to any church."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Pass the church id to the serializer
+        serializer = self.serializer_class(data=request.data, context={"church_id": membership.church_id})
 
         if serializer.is_valid():
             serializer.save()
@@ -304,7 +344,7 @@ class ChoirMemberAccountCreateAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChoirMemberAccountListAPIView(generics.ListAPIView):
+class ChoirMemberAccountListAPIView(SerializerRelatedMixin, generics.ListAPIView):
     """
     View to retrieve all choir members with pagination and search filters.
     Both Church Admin and Choir Director can access this view.
@@ -315,26 +355,21 @@ class ChoirMemberAccountListAPIView(generics.ListAPIView):
 
     def get_queryset(self):
         # Determine the church account based on the user role
-        try:
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=self.request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to view choir members.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to view choir members.")
 
         # Query choir members associated with the church
-        choirs = ChoirMemberAccount.objects.filter(church=church_account)
+        choirs = ChoirMemberAccount.objects.filter(church_id=membership.church_id)
 
-        # Apply search filters based on query parameters
+        # Apply search filters based on query parameters; name and gender live on the member
         full_name = self.request.query_params.get('full_name', None)
         if full_name:
-            choirs = choirs.filter(full_name__icontains=full_name)
+            choirs = choirs.filter(member__full_name__icontains=full_name)
 
         gender = self.request.query_params.get('gender', None)
         if gender:
-            choirs = choirs.filter(gender=gender)
+            choirs = choirs.filter(member__gender=gender)
 
         return choirs
 
@@ -346,27 +381,22 @@ class ChoirMemberAccountDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChoirMemberAccountSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                choir_directory = ChoirDirectorAccount.objects.get(user=user)
-                return choir_directory.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage choir.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and choir director can manage choir members
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to manage choir.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChoirMemberAccount object and ensure it belongs to the church.
         """
         try:
-            return ChoirMemberAccount.objects.get(id=pk, church=church)
+            return ChoirMemberAccount.objects.get(id=pk, church_id=church_id)
         except ChoirMemberAccount.DoesNotExist:
             raise NotFound("Choir not found or you do not have permission to access this record.")
 
@@ -374,8 +404,8 @@ class ChoirMemberAccountDetailAPIView(APIView):
         """
         Retrieve a choir by their ID.
         """
-        church = self.get_church(request.user)
-        choir = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        choir = self.get_object(pk, church_id)
         serializer = ChoirMemberAccountSerializer(choir)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -383,8 +413,8 @@ class ChoirMemberAccountDetailAPIView(APIView):
         """
         Update a choir's information.
         """
-        church = self.get_church(request.user)
-        choir = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        choir = self.get_object(pk, church_id)
         serializer = ChoirMemberAccountSerializer(choir, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -395,8 +425,8 @@ class ChoirMemberAccountDetailAPIView(APIView):
         """
         Delete a choir.
         """
-        church = self.get_church(request.user)
-        choir = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        choir = self.get_object(pk, church_id)
         choir.delete()
         return Response({"detail": "choir has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
     
@@ -416,11 +446,12 @@ class ChoirDirectorAccountCreateAPIView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChoirMemberAccount.")
 
-        # Adjust this line to use the correct field (likely 'church_admin')
-        church = get_object_or_404(ChurchAccount, church_admin=request.user)
-
-        # Pass the ChurchAccount instance to the serializer
-        serializer = self.serializer_class(data=request.data, context={"church": church})
+        # Only church admins can create these accounts
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN):
+            raise NotFound("No ChurchAccount matches the given query.")
+        # Pass the church id to the serializer
+        serializer = self.serializer_class(data=request.data, context={"church_id": membership.church_id})
 
         if serializer.is_valid():
             serializer.save()
@@ -441,36 +472,23 @@ class ChoirDirectorAccountListView(APIView):
             raise PermissionDenied("Superusers are not allowed to view ChoirDirectorAccount records.")
 
         # Get the church account for the logged-in user (whether admin or director)
-        church_account = self.get_church_account(request.user)
-        if not church_account:
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
             return Response({"detail": "You do not belong to any church."}, status=status.HTTP_403_FORBIDDEN)
 
         # Restrict choir directors from viewing other choir directors' records
-        if hasattr(request.user, 'choirdirectoraccount'):
+        if CHOIR_DIRECTOR in membership.roles:
             return Response({"detail": "You are not authorized to view other choir directors' records."}, status=status.HTTP_403_FORBIDDEN)
 
         # Retrieve all choir director records associated with the same church
-        choir_directors = ChoirDirectorAccount.objects.filter(church=church_account)
+        choir_directors = optimize_for_serializer(
+            ChoirDirectorAccount.objects.filter(church_id=membership.church_id), ChoirDirectorAccountSerializer
+        )
 
         # Serialize and return the records
         serializer = ChoirDirectorAccountSerializer(choir_directors, many=True)
         return Response(serializer.data)
 
-    def get_church_account(self, user):
-        """
-        Try to fetch the church account for the given user. This handles both church admins and choir directors.
-        """
-        # First, check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # If the user is not a church admin, check if they are a choir director
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                return None
-
 class ChoirDirectorAccountDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -552,11 +570,12 @@ class SecretaryAccountCreateAPIView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChoirMemberAccount.")
 
-        # Adjust this line to use the correct field (likely 'church_admin')
-        church = get_object_or_404(ChurchAccount, church_admin=request.user)
-
-        # Pass the ChurchAccount instance to the serializer
-        serializer = self.serializer_class(data=request.data, context={"church": church})
+        # Only church admins can create these accounts
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN):
+            raise NotFound("No ChurchAccount matches the given query.")
+        # Pass the church id to the serializer
+        serializer = self.serializer_class(data=request.data, context={"church_id": membership.church_id})
 
         if serializer.is_valid():
             serializer.save()
@@ -622,9 +641,7 @@ class SecretaryAccountDetailView(generics.RetrieveUpdateAPIView):
         """
         Override the default update method to save the church field correctly.
         """
-        user = self.request.user
-        church_account = ChurchAccount.objects.get(church_admin=user)
-        serializer.validated_data['church'] = church_account  # Ensure the correct church is associated
+        serializer.validated_data['church_id'] = self.request.church_membership.church_id  # Ensure the correct church is associated
 
         # Save the updated member instance
         serializer.save()
@@ -640,37 +657,20 @@ class SecretaryAccountListView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to view ChoirDirectorAccount records.")
 
-        # Get the church account for the logged-in user (whether admin or director)
-        church_account = self.get_church_account(request.user)
-        if not church_account:
+        # Get the church account for the logged-in user (whether admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
             return Response({"detail": "You do not belong to any church."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Restrict choir directors from viewing other choir directors' records
-        if hasattr(request.user, 'choirdirectoraccount'):
-            return Response({"detail": "You are not authorized to view other choir directors' records."}, status=status.HTTP_403_FORBIDDEN)
-
         # Retrieve all choir director records associated with the same church
-        secretary = SecretaryAccount.objects.filter(church=church_account)
+        secretary = optimize_for_serializer(
+            SecretaryAccount.objects.filter(church_id=membership.church_id), SecretaryAccountAccountSerializer
+        )
 
         # Serialize and return the records
         serializer = SecretaryAccountAccountSerializer(secretary, many=True)
         return Response(serializer.data)
 
-    def get_church_account(self, user):
-        """
-        Try to fetch the church account for the given user. This handles both church admins and choir directors.
-        """
-        # First, check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # If the user is not a church admin, check if they are a choir director
-            try:
-                secretary = SecretaryAccount.objects.get(user=user)
-                return secretary.church
-            except SecretaryAccount.DoesNotExist:
-                return None
-
 class SecretaryAccountDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -760,26 +760,18 @@ class DepartmentCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on announcements.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if they are a choir director or secretary
-                try:
-                    secretary_account = SecretaryAccount.objects.get(user=request.user)
-                    church_account = secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    return Response(
-                        {"detail": "You are not associated with any church."},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -795,40 +787,26 @@ class DepartmentListView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = DepartmentSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                # Check if the user is a choir director
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                try:
-                    # Check if the user is a secretary
-                    secretary_account = SecretaryAccount.objects.get(user=user)
-                    return secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    try:
-                    # Check if the user is a choir member
-                        choir = ChoirMemberAccount.objects.get(user=user)
-                        return choir.church
-                    except ChoirMemberAccount.DoesNotExist:
-                        raise PermissionDenied("You are not associated with any church.")
+        # Any role within the church can view departments
+        membership = request.church_membership
+        if not membership:
+            raise PermissionDenied("You are not associated with any church.")
+        return membership.church_id
 
+    @conditional_get('departments')
     def get(self, request):
         """
         Retrieve all departments associated with the user's church.
         """
         # Get the church account associated with the user
-        church = self.get_church(request.user)
+        church_id = self.get_church(request)
 
         # Filter announcements by the church
-        departments = ChurchDepartment.objects.filter(church=church, is_deleted=False).order_by('-created_at')
+        departments = ChurchDepartment.objects.filter(church_id=church_id, is_deleted=False).order_by('-created_at')
 
         
         # Serialize the announcements
@@ -842,36 +820,32 @@ class DepartmentDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = DepartmentSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                # Check if the user is a secretary
-                secretary_account = SecretaryAccount.objects.get(user=user)
-                return secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You are not associated with any church.")
-
-    def get_department(self, pk, church):
+        # Only the church admin and secretary can manage departments
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You are not associated with any church.")
+        return membership.church_id
+
+    def get_department(self, pk, church_id):
         """
         Helper method to get a specific department and ensure it belongs to the church.
         """
         try:
-            return ChurchDepartment.objects.get(id=pk, church=church, is_deleted=False)
+            return ChurchDepartment.objects.get(id=pk, church_id=church_id, is_deleted=False)
         except ChurchDepartment.DoesNotExist:
             raise NotFound("Department not found or you do not have permission to access it.")
 
+    @conditional_get('departments', roles=(CHURCH_ADMIN, SECRETARY))
     def get(self, request, pk):
         """
         Retrieve a single department by its ID.
         """
-        church = self.get_church(request.user)
-        department = self.get_department(pk, church)
+        church_id = self.get_church(request)
+        department = self.get_department(pk, church_id)
         serializer = self.serializer_class(department)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -879,10 +853,10 @@ class DepartmentDetailUpdateDeleteView(APIView):
         """
         Update an department's information.
         """
-        church = self.get_church(request.user)
-        department = self.get_department(pk, church)
+        church_id = self.get_church(request)
+        department = self.get_department(pk, church_id)
         serializer = self.serializer_class(
-            department, data=request.data, partial=True, context={"church": church, "request": request}
+            department, data=request.data, partial=True, context={"church_id": church_id, "request": request}
         )
 
         if serializer.is_valid():
@@ -895,8 +869,8 @@ class DepartmentDetailUpdateDeleteView(APIView):
         """
         Soft delete an department.
         """
-        church = self.get_church(request.user)
-        department = self.get_department(pk, church)
+        church_id = self.get_church(request)
+        department = self.get_department(pk, church_id)
 
         # Perform a soft delete by marking `is_deleted` as True
         department.is_deleted = True
@@ -905,65 +879,102 @@ class DepartmentDetailUpdateDeleteView(APIView):
 
 
 # statistics view
-class GeneralStatisticsView(APIView):
+class StatisticsView(APIView):
     """
-    View to retrieve total members, total female members, and total male members, total choirs, total announcements.
+    Base view for the totals read from the church counters.
+    - Church users get the totals of their own church.
+    - System admins get the totals of every church plus a per-church breakdown, or of one church with `?church=<id>`.
     """
     permission_classes = [IsAuthenticated]
+    statistics_fields = STATISTICS_FIELDS
 
     def get(self, request):
-        """
-        Get the total number of members, total females, and total males.
-        """
-        # Get the total number of choirs
-        total_choirs = ChoirMemberAccount.objects.filter(is_deleted=False).count()
-        # Get the total number of members
-        total_members = MemberRegistration.objects.filter(is_deleted=False).count()
-        # Get the total number of announcements
-        total_announcements = ChurchAnnouncement.objects.filter(is_deleted=False).count()
+        if request.user.is_superuser:
+            church_id = request.query_params.get('church')
+            if church_id:
+                # Totals of a single church
+                try:
+                    stats = church_statistics([int(church_id)], self.statistics_fields)
+                except ValueError:
+                    raise NotFound("No ChurchAccount matches the given query.")
+                if not stats:
+                    raise NotFound("No ChurchAccount matches the given query.")
+                return Response(next(iter(stats.values())), status=200)
 
-        # Get the total number of female members
-        total_female = MemberRegistration.objects.filter(gender='Female', is_deleted=False).count()
+            # Totals across all churches, with the breakdown per church
+            churches = list(church_statistics(fields=self.statistics_fields).values())
+            totals = {key: sum(church[key] for church in churches) for key in self.statistics_fields}
+            return Response({**totals, 'churches': churches}, status=200)
 
-        # Get the total number of male members
-        total_male = MemberRegistration.objects.filter(gender='Male', is_deleted=False).count()
+        membership = request.church_membership
+        if not membership:
+            raise PermissionDenied("You do not have permission to view statistics.")
 
-        
+        stats = church_statistics([membership.church_id], self.statistics_fields)[membership.church_id]
 
         # Return the response
-        return Response({
-            "total_members": total_members,
-            "total_female": total_female,
-            "total_male": total_male,
-            'total_choirs': total_choirs,
-            'total_announcements': total_announcements,
-        }, status=200)
+        return Response({key: stats[key] for key in self.statistics_fields}, status=200)
 
-class ChoirStatsView(APIView):
+
+class GeneralStatisticsView(StatisticsView):
+    """
+    View to retrieve total members, total female members, and total male members, total choirs, total announcements.
+    """
+    statistics_fields = STATISTICS_FIELDS
+
+
+class ChoirStatsView(StatisticsView):
     """
     View to retrieve total choirs, total female choirs, and total male choirs.
     """
-    permission_classes = [IsAuthenticated]
-    
+    statistics_fields = CHOIR_STATISTICS_FIELDS
+
+class MembershipCacheStatsView(APIView):
+    """
+    View to retrieve hit/miss counters of the church membership cache. Only system admins can access this view.
+    """
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
     def get(self, request):
-        """
-        Get the total number of choirs, total females, and total males.
-        """
-        # Get the total number of choirs
-        total_choirs = ChoirMemberAccount.objects.filter(is_deleted=False).count()
-        
-        # Get the total number of female choirs
-        total_female = ChoirMemberAccount.objects.filter(member__gender='Female', is_deleted=False).count()
-        
-        # Get the total number of male choirs
-        total_male = ChoirMemberAccount.objects.filter(member__gender='Male', is_deleted=False).count()
-        
-        # Return the response
-        return Response({
-            "total_choirs": total_choirs,
-            "total_female": total_female,
-            "total_male": total_male
-        }, status=200)
+        return Response(membership_cache_stats(), status=status.HTTP_200_OK)
+
+class DeltaSyncView(APIView):
+    """
+    Delta feed of one of the church's resources (members, songs, announcements, activities, dues, tithes,
+    church-attendance, choir-attendance) for clients keeping an offline copy.
+    - `?updated_since=<ISO 8601 timestamp>` lists the rows changed after it, oldest change first; without it the feed starts from the beginning.
+    - Deleted rows come as tombstones: `{"id": ..., "is_deleted": true, "updated_at": ...}`.
+    - `cursor` resumes the feed: fetch `next` while it is set, then keep `cursor` for the next sync.
+    - `?page_size=` (100 by default, at most 500) and `?fields=` / `?omit=` work as on the list views.
+    Each resource can be read by the roles that can read its list view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, resource):
+        if resource not in SYNC_RESOURCES:
+            raise NotFound("Unknown resource.")
+        model, serializer_class, roles = SYNC_RESOURCES[resource]
+        membership = request.church_membership
+        if not membership.allows(*roles):
+            raise PermissionDenied(f"You do not have permission to view {resource}.")
+
+        try:
+            page_size = min(int(request.query_params.get('page_size', PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"page_size": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        position = parse_position(request.query_params)
+        available = readable_fields(serializer_class().fields)
+        fields = select_fields(request, available)
+
+        items, cursor, has_more = sync_page(
+            model.objects.all(), resource, membership.church_id, position, max(page_size, 1),
+            tuple(fields) if len(fields) < len(available) else None, request,
+        )
+        next_link = None
+        if has_more:
+            next_link = remove_query_param(request.build_absolute_uri(), 'updated_since')
+            next_link = replace_query_param(next_link, 'cursor', cursor)
+        return Response({"next": next_link, "cursor": cursor, "results": items}, status=status.HTTP_200_OK)
 
 class LoginAPIView(APIView):
     permission_classes = [AllowAny]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('announcement', '0002_churchannouncement_announce_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='churchannouncement',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='announce_church_updated_idx'),
+        ),
+    ]
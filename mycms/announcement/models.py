@@ -18,3 +18,8 @@ class ChurchAnnouncement(models.Model):
     
     class Meta:
         verbose_name_plural = 'Church Announcements'
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='announce_church_deleted_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='announce_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='announce_church_updated_idx'),
+        ]
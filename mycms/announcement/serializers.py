@@ -13,7 +13,7 @@
 # #         # Ensure that the church is set here when creating a member
 # #         user = self.context['request'].user  # Accessing the request object to get the logged-in user
 # #         church_account = ChurchAccount.objects.get(church_admin=user)  # Get the church associated with the user
-# #         validated_data['church'] = church_account  # Set the church field programmatically
+# #         validated_data['church_id'] = church_id  # Set the church field programmatically
 # #         return super().create(validated_data)
 
 # ############################Testing
@@ -45,6 +45,7 @@
 
 from rest_framework import serializers
 from .models import ChurchAnnouncement
+from accounts.fieldsets import SparseFieldsetMixin
 
 
 # class ChurchAnnouncementSerializer(serializers.ModelSerializer):
@@ -60,12 +61,12 @@ from .models import ChurchAnnouncement
 #                 raise serializers.ValidationError("Church information is missing in the context.")
 
 #             # Set the church field for the new member
-#             validated_data['church'] = church_account
+#             validated_data['church_id'] = church_id
 #             return super().create(validated_data)
 
 
 
-class ChurchAnnouncementSerializer(serializers.ModelSerializer):
+class ChurchAnnouncementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ChurchAnnouncement
         fields = ['id', 'church', 'author', 'title', 'content', 'is_deleted', 'created_at', 'updated_at']
@@ -73,10 +74,10 @@ class ChurchAnnouncementSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new member
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
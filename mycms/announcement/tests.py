@@ -1,3 +1,78 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from accounts.membership import membership_cache
+from accounts.testing import create_church
+from .models import ChurchAnnouncement
+
+
+class AnnouncementConditionalGetTests(APITestCase):
+    url = '/announcement/api/announcements/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.announcement = ChurchAnnouncement.objects.create(church=self.church, title='Rehearsal', content='Saturday at 4')
+        self.client.force_authenticate(self.church.church_admin)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        # The version lookup alone: the view does not run
+        self.assertEqual(len(queries), 1)
+
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # A write in another church leaves this church's version alone
+        ChurchAnnouncement.objects.create(church=create_church('Bethel'), title='Other', content='Other church')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        for write in (
+            lambda: ChurchAnnouncement.objects.create(church=self.church, title='Picnic', content='Sunday'),
+            lambda: self.client.put(f'{self.url}{self.announcement.pk}/', {'title': 'Rehearsal moved'}),
+            lambda: self.client.delete(f'{self.url}{self.announcement.pk}/'),
+        ):
+            write()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_each_format_has_its_own_etag(self):
+        self.assertNotEqual(self.client.get(self.url)['ETag'], self.client.get(self.url, {'format': 'api'})['ETag'])
+
+
+class AnnounceStatsViewTests(APITestCase):
+    url = '/announcement/api/announcement-stats/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        ChurchAnnouncement.objects.create(church=self.church, title='Rehearsal', content='Saturday at 4')
+        ChurchAnnouncement.objects.create(church=create_church('Bethel'), title='Picnic', content='Sunday')
+
+    def test_church_users_get_their_church_only(self):
+        self.client.force_authenticate(self.church.church_admin)
+        self.assertEqual(self.client.get(self.url).data, {'announcements': 1})
+
+    def test_system_admins_get_every_church(self):
+        self.client.force_authenticate(User.objects.create_superuser('root', 'root@example.com', None))
+        self.assertEqual(self.client.get(self.url).data, {'announcements': 2})
+
+    def test_users_without_a_church_are_refused(self):
+        self.client.force_authenticate(User.objects.create_user('visitor'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -4,11 +4,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from .models import ChurchAnnouncement
 from .serializers import ChurchAnnouncementSerializer
-from accounts.models import ChurchAccount,SecretaryAccount,ChoirDirectorAccount, ChoirMemberAccount
+from accounts.models import ChurchAccount,SecretaryAccount,ChoirDirectorAccount, ChoirMemberAccount, ChurchCounters
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework import generics
 from accounts.views import CustomPagination
+from accounts.prefetch import SerializerRelatedMixin
 from datetime import datetime
+from accounts.membership import CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR
+from accounts.counters import get_church_counters
+from accounts.versions import conditional_get
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 
 
 
@@ -26,30 +32,18 @@ class AnnouncementCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on announcements.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if they are a choir director or secretary
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                try:
-                    secretary_account = SecretaryAccount.objects.get(user=request.user)
-                    church_account = secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    return Response(
-                        {"detail": "You are not associated with any church."},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin, choir director or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -58,7 +52,7 @@ class AnnouncementCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class AnnouncementListView(generics.ListAPIView):
+class AnnouncementListView(SerializerRelatedMixin, generics.ListAPIView):
     """
     View to create and retrieve announcements with pagination.
     """
@@ -66,34 +60,21 @@ class AnnouncementListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
+    @conditional_get('announcements')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         """
         Retrieve announcements for the user's church.
         """
-        user = self.request.user
-        try:
-            # Check if the user is a church admin
-            church = ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                # Check if the user is a choir director
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                church = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                try:
-                    # Check if the user is a secretary
-                    secretary_account = SecretaryAccount.objects.get(user=user)
-                    church = secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    try:
-                        # Check if the user is a choir member
-                        choir = ChoirMemberAccount.objects.get(user=user)
-                        church = choir.church
-                    except ChoirMemberAccount.DoesNotExist:
-                        raise PermissionDenied("You are not associated with any church.")
+        # Any role within the church can read its announcements
+        membership = self.request.church_membership
+        if not membership:
+            raise PermissionDenied("You are not associated with any church.")
 
         # Return announcements filtered by the user's church
-        return ChurchAnnouncement.objects.filter(church=church, is_deleted=False).order_by('-created_at')
+        return ChurchAnnouncement.objects.filter(church_id=membership.church_id, is_deleted=False).order_by('-created_at')
 
 class AnnouncementDetailUpdateDeleteView(APIView):
     """
@@ -102,41 +83,32 @@ class AnnouncementDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChurchAnnouncementSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                # Check if the user is a choir director
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                try:
-                    # Check if the user is a secretary
-                    secretary_account = SecretaryAccount.objects.get(user=user)
-                    return secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    raise PermissionDenied("You are not associated with any church.")
-
-    def get_announcement(self, pk, church):
+        # Only the church admin, choir director and secretary can manage announcements
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR, SECRETARY):
+            raise PermissionDenied("You are not associated with any church.")
+        return membership.church_id
+
+    def get_announcement(self, pk, church_id):
         """
         Helper method to get a specific announcement and ensure it belongs to the church.
         """
         try:
-            return ChurchAnnouncement.objects.get(id=pk, church=church, is_deleted=False)
+            return ChurchAnnouncement.objects.get(id=pk, church_id=church_id, is_deleted=False)
         except ChurchAnnouncement.DoesNotExist:
             raise NotFound("Announcement not found or you do not have permission to access it.")
 
+    @conditional_get('announcements', roles=(CHURCH_ADMIN, CHOIR_DIRECTOR, SECRETARY))
     def get(self, request, pk):
         """
         Retrieve a single announcement by its ID.
         """
-        church = self.get_church(request.user)
-        announcement = self.get_announcement(pk, church)
+        church_id = self.get_church(request)
+        announcement = self.get_announcement(pk, church_id)
         serializer = self.serializer_class(announcement)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -144,10 +116,10 @@ class AnnouncementDetailUpdateDeleteView(APIView):
         """
         Update an announcement's information.
         """
-        church = self.get_church(request.user)
-        announcement = self.get_announcement(pk, church)
+        church_id = self.get_church(request)
+        announcement = self.get_announcement(pk, church_id)
         serializer = self.serializer_class(
-            announcement, data=request.data, partial=True, context={"church": church, "request": request}
+            announcement, data=request.data, partial=True, context={"church_id": church_id, "request": request}
         )
 
         if serializer.is_valid():
@@ -160,8 +132,8 @@ class AnnouncementDetailUpdateDeleteView(APIView):
         """
         Soft delete an announcement.
         """
-        church = self.get_church(request.user)
-        announcement = self.get_announcement(pk, church)
+        church_id = self.get_church(request)
+        announcement = self.get_announcement(pk, church_id)
 
         # Perform a soft delete by marking `is_deleted` as True
         announcement.is_deleted = True
@@ -171,12 +143,22 @@ class AnnouncementDetailUpdateDeleteView(APIView):
 # Announcement statistics view
 class AnnounceStatsView(APIView):
      """
-        Get the total number of members, total females, and total males.
+        Get the total number of announcements of the user's church (of all churches for system admins),
+        read from the maintained church counters.
         """
+     permission_classes = [IsAuthenticated]
+
      def get(self, request):
         # Get the total number of announcements
-
-        announcements = ChurchAnnouncement.objects.filter(is_deleted=False).count()
+        if request.user.is_superuser:
+            announcements = ChurchCounters.objects.filter(church__is_deleted=False).aggregate(
+                total=Coalesce(Sum('announcements'), 0)
+            )['total']
+        else:
+            membership = request.church_membership
+            if not membership:
+                raise PermissionDenied("You do not have permission to view announcement statistics.")
+            announcements = get_church_counters(membership.church_id).announcements
 
         return Response({
             "announcements": announcements,
@@ -0,0 +1,66 @@
+from django.db.models import Case, Count, ExpressionWrapper, F, FilteredRelation, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Round
+
+from accounts.models import ChoirMemberAccount
+from .models import ChoirAttendance
+
+
+# `?ordering=` values of the attendance rates; ties are listed by member and activity
+RATE_ORDERINGS = {
+    'rate': ('rate', 'choir', 'activities'),
+    '-rate': ('-rate', 'choir', 'activities'),
+    'full_name': ('full_name', 'choir', 'activities'),
+}
+
+
+def activity_sessions(church_id, start, end, activity_id=None):
+    """
+    Number of sessions each activity held between `start` and `end`: the days it has any attendance recorded.
+    """
+    attendance = ChoirAttendance.objects.filter(church_id=church_id, is_deleted=False, date__range=(start, end))
+    if activity_id is not None:
+        attendance = attendance.filter(activities_id=activity_id)
+    return dict(
+        attendance.order_by().values('activities').annotate(sessions=Count('date', distinct=True))
+        .values_list('activities', 'sessions')
+    )
+
+
+def attendance_rates(church_id, start, end, activity_id=None, ordering='rate'):
+    """
+    Rows of {choir, activities, full_name, activity_name, sessions, present, rate} for every active choir member
+    and every activity held between `start` and `end`, sorted by `ordering`. `present` counts the days the member
+    was present (0 for members never recorded), `sessions` the days the activity was held (so members recorded
+    only when present still get a true rate) and `rate` is the percentage present, to one decimal.
+    One GROUP BY (choir, activities) over the church's active choir members joined to the activities held, with
+    the church, activity and date range in the join to their attendance, so it reads the (church, choir, date)
+    index and pages in SQL.
+    """
+    sessions = activity_sessions(church_id, start, end, activity_id)
+    if not sessions:
+        return ChoirMemberAccount.objects.none()
+
+    rows = (
+        ChoirMemberAccount.objects.filter(church_id=church_id, is_deleted=False, member__is_deleted=False)
+        .annotate(
+            # Every activity held, once per member
+            held=FilteredRelation('church__churchactivity', condition=Q(church__churchactivity__pk__in=list(sessions))),
+            attended=FilteredRelation('choir_practice', condition=Q(
+                choir_practice__church_id=church_id, choir_practice__activities=F('held__pk'),
+                choir_practice__date__range=(start, end), choir_practice__is_present=True,
+                choir_practice__is_deleted=False,
+            )),
+        )
+        .filter(held__isnull=False)
+        .values(choir=F('pk'), activities=F('held__pk'), full_name=F('member__full_name'), activity_name=F('held__name'))
+        .annotate(
+            sessions=Case(
+                *[When(held__pk=activity, then=Value(count)) for activity, count in sessions.items()],
+                output_field=IntegerField(),
+            ),
+            # Days rather than rows, so duplicate records of a day count once
+            present=Count('attended__date', distinct=True),
+        )
+        .annotate(rate=Round(ExpressionWrapper(F('present') * 100.0 / F('sessions'), output_field=FloatField()), 1))
+    )
+    return rows.order_by(*RATE_ORDERINGS[ordering])
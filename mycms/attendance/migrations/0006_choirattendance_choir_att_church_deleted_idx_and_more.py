@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_memberregistration_member_church_deleted_idx_and_more'),
+        ('attendance', '0005_choirattendance_date'),
+        ('church_activity', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'is_deleted', '-date_recorded'], name='choir_att_church_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'year', 'month'], name='choir_att_church_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['church', '-date_recorded'], name='choir_att_church_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='churchserviceattendance',
+            index=models.Index(fields=['church', 'is_deleted', '-date_recorded'], name='service_att_church_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='churchserviceattendance',
+            index=models.Index(fields=['church', 'year', 'month'], name='service_att_church_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='churchserviceattendance',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['church', '-date_recorded'], name='service_att_church_active_idx'),
+        ),
+    ]
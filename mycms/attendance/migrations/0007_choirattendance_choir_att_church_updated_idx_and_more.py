@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('attendance', '0006_choirattendance_choir_att_church_deleted_idx_and_more'),
+        ('church_activity', '0002_churchactivity_activity_church_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='choir_att_church_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='churchserviceattendance',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='service_att_church_updated_idx'),
+        ),
+    ]
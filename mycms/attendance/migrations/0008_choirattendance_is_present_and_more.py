@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('attendance', '0007_choirattendance_choir_att_church_updated_idx_and_more'),
+        ('church_activity', '0002_churchactivity_activity_church_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='choirattendance',
+            name='is_present',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'activities', 'date'], name='choir_att_activity_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('attendance', '0008_choirattendance_is_present_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'week'), ('month', 'month'), ('year', 'year')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('attendance_type', models.CharField(max_length=200)),
+                ('services', models.IntegerField(default=0)),
+                ('men', models.IntegerField(default=0)),
+                ('women', models.IntegerField(default=0)),
+                ('male_children', models.IntegerField(default=0)),
+                ('female_children', models.IntegerField(default=0)),
+                ('visitors', models.IntegerField(default=0)),
+                ('total_attendees', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('church', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.churchaccount')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('church', 'granularity', 'period_start', 'attendance_type'), name='service_att_rollup_unique')],
+            },
+        ),
+    ]
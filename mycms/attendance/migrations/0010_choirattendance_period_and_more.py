@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('attendance', '0009_serviceattendancerollup'),
+        ('church_activity', '0002_churchactivity_activity_church_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='choirattendance',
+            name='choir_att_church_period_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='churchserviceattendance',
+            name='service_att_church_period_idx',
+        ),
+        migrations.AddField(
+            model_name='choirattendance',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='churchserviceattendance',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'period'], name='choir_att_church_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='churchserviceattendance',
+            index=models.Index(fields=['church', 'period'], name='service_att_church_period_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('attendance', '0011_populate_period'),
+        ('church_activity', '0002_churchactivity_activity_church_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', '-date_recorded'], name='choir_att_church_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'activities', '-date_recorded'], name='choir_att_activity_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'choir', 'date'], name='choir_att_member_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirattendance',
+            index=models.Index(fields=['church', 'date'], name='choir_att_church_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0012_choirattendance_choir_att_church_recent_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='choirattendance',
+            name='choir_att_church_deleted_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='choirattendance',
+            name='choir_att_church_active_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='choirattendance',
+            name='choir_att_activity_recent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='choirattendance',
+            name='choir_att_church_date_idx',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import ChurchAccount, ChoirMemberAccount
+from accounts.periods import month_period
 from choice.views import month_choices, days_of_week_choices, week_choices
 from church_activity.models import ChurchActivity
 from datetime import datetime
@@ -18,6 +19,7 @@ class ChurchServiceAttendance(models.Model):
     total_attendees = models.IntegerField(null=True, blank=True)
     month = models.CharField(max_length=20, choices=month_choices, default='Select')
     year = models.IntegerField()
+    period = models.DateField(null=True, blank=True, editable=False)  # First day of the month, set on save
     is_deleted = models.BooleanField(default=False)
     date_recorded = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -29,9 +31,50 @@ class ChurchServiceAttendance(models.Model):
     
     def save(self, *args, **kwargs):
         self.total_attendees = self.number_of_men + self.number_of_women + self.number_of_male_children + self.number_of_female_children + self.vistor
+        self.period = month_period(self.month, self.year)
         super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-date_recorded'], name='service_att_church_deleted_idx'),
+            models.Index(fields=['church', 'period'], name='service_att_church_period_idx'),
+            models.Index(fields=['church', '-date_recorded'], condition=models.Q(is_deleted=False), name='service_att_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='service_att_church_updated_idx'),
+        ]
  
 
+class ServiceAttendanceRollup(models.Model):
+    """
+    Service attendance totals of a church per week, month or year and attendance type, kept up to date
+    by the signal handlers in attendance.rollups. Writes that skip signals (bulk_create, queryset.update)
+    are reconciled with `manage.py rebuild_attendance_rollups`.
+    """
+    GRANULARITIES = (('week', 'week'), ('month', 'month'), ('year', 'year'))
+
+    church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='+')
+    granularity = models.CharField(max_length=5, choices=GRANULARITIES)
+    period_start = models.DateField()  # Monday of the week, first day of the month or year
+    attendance_type = models.CharField(max_length=200)
+    services = models.IntegerField(default=0)
+    men = models.IntegerField(default=0)
+    women = models.IntegerField(default=0)
+    male_children = models.IntegerField(default=0)
+    female_children = models.IntegerField(default=0)
+    visitors = models.IntegerField(default=0)
+    total_attendees = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.church_id} {self.attendance_type} ({self.granularity} of {self.period_start})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['church', 'granularity', 'period_start', 'attendance_type'], name='service_att_rollup_unique',
+            ),
+        ]
+
+
 class ChoirAttendance(models.Model):
     church = models.ForeignKey(ChurchAccount, on_delete=models.CASCADE, related_name='church_choir_attendance')
     activities = models.ForeignKey(ChurchActivity, on_delete=models.CASCADE, related_name='activity')
@@ -41,6 +84,8 @@ class ChoirAttendance(models.Model):
     date = models.DateField(default=datetime.today, blank=True, null=True)
     month = models.CharField(max_length=20, choices=month_choices)
     year = models.IntegerField()
+    period = models.DateField(null=True, blank=True, editable=False)  # First day of the month, set on save
+    is_present = models.BooleanField(default=True)  # Roll calls record absences too
     is_deleted = models.BooleanField(default=False)
     date_recorded = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -48,8 +93,21 @@ class ChoirAttendance(models.Model):
 
     def __str__(self):
         return self.choir.member.full_name
+
+    def save(self, *args, **kwargs):
+        self.period = month_period(self.month, self.year)
+        super().save(*args, **kwargs)
     
     class Meta:
         ordering = ['-date_recorded']
+        indexes = [
+            # One index per access path: the list's newest-first order (soft-deleted rows are listed too, so it
+            # also serves the live rows), months, the sync cursor, and dates per activity or choir member
+            models.Index(fields=['church', '-date_recorded'], name='choir_att_church_recent_idx'),
+            models.Index(fields=['church', 'period'], name='choir_att_church_period_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='choir_att_church_updated_idx'),
+            models.Index(fields=['church', 'activities', 'date'], name='choir_att_activity_date_idx'),
+            models.Index(fields=['church', 'choir', 'date'], name='choir_att_member_date_idx'),
+        ]
     
     
\ No newline at end of file
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+
+from accounts.models import ChoirMemberAccount
+from accounts.periods import MONTHS
+from church_activity.models import ChurchActivity
+from .models import ChoirAttendance
+
+
+# In date.weekday() order
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def period_fields(date):
+    """
+    The day, week of the month (1-5), month, year and period stored with a choir attendance taken on `date`.
+    """
+    return {
+        'day': DAYS[date.weekday()],
+        'week': str((date.day - 1) // 7 + 1),
+        'month': MONTHS[date.month - 1],
+        'year': date.year,
+        'period': date.replace(day=1),
+    }
+
+
+def record_roll_call(church_id, activity_id, date, present, absent):
+    """
+    Record the attendance of the listed choir members at an activity on a date, in one transaction.
+    Members with a record for that activity and date already have it updated rather than duplicated,
+    so resubmitting a roll call changes nothing. Members left out are not touched.
+    Returns (records of the listed members, number created, number updated).
+    """
+    attendance = {choir_id: True for choir_id in present}
+    attendance.update({choir_id: False for choir_id in absent})
+
+    with transaction.atomic():
+        # Locking the activity serializes roll calls of the same activity, so resubmits cannot race each other
+        try:
+            activity = ChurchActivity.objects.select_for_update().only('pk').get(pk=activity_id, church_id=church_id)
+        except ChurchActivity.DoesNotExist:
+            raise NotFound("Activity not found or you do not have permission to access it.")
+
+        known = set(
+            ChoirMemberAccount.objects.filter(church_id=church_id, is_deleted=False, pk__in=attendance)
+            .values_list('pk', flat=True)
+        )
+        unknown = sorted(set(attendance) - known)
+        if unknown:
+            raise ValidationError({"choir": [f"Unknown choir members: {', '.join(map(str, unknown))}."]})
+
+        existing = ChoirAttendance.objects.filter(
+            church_id=church_id, activities=activity, date=date, choir_id__in=attendance, is_deleted=False,
+        ).only('pk', 'choir_id', 'is_present')
+        records, changed = {}, []
+        for record in existing:
+            if record.choir_id in records:
+                continue  # Duplicates entered one by one before roll calls: the first one is kept up to date
+            records[record.choir_id] = record
+            if record.is_present != attendance[record.choir_id]:
+                record.is_present = attendance[record.choir_id]
+                # bulk_update skips auto_now, and the delta sync feed reads updated_at
+                record.updated_at = timezone.now()
+                changed.append(record)
+        ChoirAttendance.objects.bulk_update(changed, ['is_present', 'updated_at'])
+
+        fields = period_fields(date)
+        created = ChoirAttendance.objects.bulk_create([
+            ChoirAttendance(
+                church_id=church_id, activities=activity, choir_id=choir_id, date=date, is_present=is_present, **fields,
+            )
+            for choir_id, is_present in attendance.items()
+            if choir_id not in records
+        ])
+
+    # Not every database returns the primary keys of bulk_create, so the records are read back by their key
+    rows = ChoirAttendance.objects.filter(
+        church_id=church_id, activities=activity, date=date, choir_id__in=attendance, is_deleted=False,
+    ).select_related('choir__member').order_by('choir__member__full_name', 'pk')
+    return rows, len(created), len(changed)
@@ -0,0 +1,194 @@
+import datetime
+from collections import Counter
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DateField, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+from .models import ChurchServiceAttendance, ServiceAttendanceRollup
+
+
+GRANULARITIES = [granularity for granularity, _ in ServiceAttendanceRollup.GRANULARITIES]
+
+# Rollup field -> the ChurchServiceAttendance field it sums
+SUM_FIELDS = {
+    'men': 'number_of_men',
+    'women': 'number_of_women',
+    'male_children': 'number_of_male_children',
+    'female_children': 'number_of_female_children',
+    'visitors': 'vistor',
+    'total_attendees': 'total_attendees',
+}
+ROLLUP_FIELDS = ('services', *SUM_FIELDS)
+
+# Fields of an attendance row its rollups depend on
+TRACKED_FIELDS = ('church_id', 'attendance_type', 'date', 'date_recorded', 'is_deleted', *SUM_FIELDS.values())
+
+
+def period_start(date, granularity):
+    """
+    First day of the week (Monday), month or year `date` falls in.
+    """
+    if granularity == 'week':
+        return date - datetime.timedelta(days=date.weekday())
+    if granularity == 'month':
+        return date.replace(day=1)
+    return date.replace(month=1, day=1)
+
+
+def attendance_date(state):
+    """
+    The day a service took place: its `date`, or the day it was recorded for rows without one.
+    """
+    date = state['date'] or timezone.localdate(state['date_recorded'])
+    # The field's default (datetime.today) leaves a datetime on instances that were never reloaded
+    return date.date() if isinstance(date, datetime.datetime) else date
+
+
+def contributions(state):
+    """
+    What one attendance row adds to each rollup it belongs to: {(church_id, granularity, period_start, attendance_type): Counter}.
+    """
+    if state is None or state['is_deleted']:
+        return {}
+    values = Counter(services=1, **{field: state[source] or 0 for field, source in SUM_FIELDS.items()})
+    date = attendance_date(state)
+    return {
+        (state['church_id'], granularity, period_start(date, granularity), state['attendance_type']): values
+        for granularity in GRANULARITIES
+    }
+
+
+def record_change(old_state, new_state):
+    """
+    Apply the difference between an attendance row's rollups before and after a change.
+    """
+    if old_state == new_state:
+        return
+    deltas = {}
+    for key, values in contributions(old_state).items():
+        deltas.setdefault(key, Counter()).subtract(values)
+    for key, values in contributions(new_state).items():
+        deltas.setdefault(key, Counter()).update(values)
+    apply_deltas(deltas)
+
+
+def apply_deltas(deltas):
+    """
+    Add `deltas` to the rollup rows with F() increments, creating the rows periods get their first service in.
+    Rollups left without any service are removed.
+    """
+    for (church_id, granularity, start, attendance_type), delta in deltas.items():
+        changes = {field: F(field) + value for field, value in delta.items() if value}
+        if not changes:
+            continue
+        rows = ServiceAttendanceRollup.objects.filter(
+            church_id=church_id, granularity=granularity, period_start=start, attendance_type=attendance_type,
+        )
+        if not rows.update(updated_at=timezone.now(), **changes):
+            try:
+                with transaction.atomic():
+                    ServiceAttendanceRollup.objects.create(
+                        church_id=church_id, granularity=granularity, period_start=start,
+                        attendance_type=attendance_type, **delta,
+                    )
+            except IntegrityError:
+                # Created concurrently by another write to the same period
+                rows.update(updated_at=timezone.now(), **changes)
+        if delta['services'] < 0:
+            rows.filter(services__lte=0).delete()
+
+
+def load_rollup_state(sender, instance, **kwargs):
+    """
+    Read the rollup fields of an attendance row as currently stored, to apply the change once the write is done.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance._rollup_state = None
+        return
+    rows = sender._base_manager.filter(pk=instance.pk)
+    if connection.in_atomic_block:
+        rows = rows.select_for_update()
+    instance._rollup_state = rows.values(*TRACKED_FIELDS).first()
+
+
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    old_state = None if created else getattr(instance, '_rollup_state', None)
+    # Fields that were deferred and not saved keep their stored value
+    new_state = {**(old_state or {}), **{
+        field: value for field, value in instance.__dict__.items() if field in TRACKED_FIELDS
+    }}
+    record_change(old_state, new_state)
+    instance._rollup_state = None
+
+
+def update_rollups_on_delete(sender, instance, **kwargs):
+    record_change(getattr(instance, '_rollup_state', None), None)
+    instance._rollup_state = None
+
+
+def rebuild_rollups(church_ids=None):
+    """
+    Recompute the rollups of the given churches (all churches by default) from the attendance rows.
+    Returns the number of rollup rows written.
+    """
+    attendance = ChurchServiceAttendance.objects.filter(is_deleted=False)
+    rollups = ServiceAttendanceRollup.objects.all()
+    if church_ids is not None:
+        attendance = attendance.filter(church_id__in=church_ids)
+        rollups = rollups.filter(church_id__in=church_ids)
+
+    day = Coalesce('date', TruncDate('date_recorded'), output_field=DateField())
+    truncs = {'week': TruncWeek, 'month': TruncMonth, 'year': TruncYear}
+    rows = []
+    for granularity in GRANULARITIES:
+        grouped = (
+            attendance.order_by()
+            .annotate(period_start=truncs[granularity](day, output_field=DateField()))
+            .values('church_id', 'period_start', 'attendance_type')
+            .annotate(
+                services=Count('pk'),
+                **{field: Coalesce(Sum(source), Value(0)) for field, source in SUM_FIELDS.items()},
+            )
+        )
+        rows += [
+            ServiceAttendanceRollup(
+                church_id=row['church_id'], granularity=granularity, period_start=row['period_start'],
+                attendance_type=row['attendance_type'], **{field: row[field] for field in ROLLUP_FIELDS},
+            )
+            for row in grouped
+        ]
+
+    with transaction.atomic():
+        rollups.delete()
+        ServiceAttendanceRollup.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def attendance_trends(church_id, granularity, start=None, end=None, attendance_type=None, by_type=False):
+    """
+    Attendance totals of a church per period, oldest first, read from the rollups.
+    Periods are summed over the attendance types unless `by_type` asks for one row per period and type.
+    """
+    rollups = ServiceAttendanceRollup.objects.filter(church_id=church_id, granularity=granularity)
+    if start is not None:
+        rollups = rollups.filter(period_start__gte=period_start(start, granularity))
+    if end is not None:
+        rollups = rollups.filter(period_start__lte=end)
+    if attendance_type:
+        rollups = rollups.filter(attendance_type=attendance_type)
+
+    if by_type:
+        return list(
+            rollups.order_by('period_start', 'attendance_type').values('period_start', 'attendance_type', *ROLLUP_FIELDS)
+        )
+    # Annotations cannot reuse the field names, so the sums are renamed back afterwards
+    totals = (
+        rollups.order_by('period_start').values('period_start')
+        .annotate(**{f"{field}_sum": Sum(field) for field in ROLLUP_FIELDS})
+    )
+    return [
+        {'period_start': row['period_start'], **{field: row[f"{field}_sum"] for field in ROLLUP_FIELDS}}
+        for row in totals
+    ]
@@ -3,29 +3,30 @@ from .models import ChurchServiceAttendance, ChoirAttendance
 from accounts.models import ChurchAccount, ChoirDirectorAccount
 from rest_framework.exceptions import PermissionDenied
 from choice.views import days_of_week_choices, week_choices, month_choices
+from accounts.fieldsets import SparseFieldsetMixin
 
 
 
-class ChurchServiceAttendanceSerializer(serializers.ModelSerializer):
+class ChurchServiceAttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ChurchServiceAttendance
         fields = ['id', 'church', 'attendance_type', 'number_of_men', 'number_of_women', 
                  'number_of_male_children', 'number_of_female_children','vistor',
-                  'month', 'year', 'total_attendees', 'is_deleted', 'date_recorded', 'updated_at']
+                  'month', 'year', 'period', 'total_attendees', 'is_deleted', 'date_recorded', 'updated_at']
         
-        read_only_fields = ['total_attendees', 'is_deleted', 'church', 'date_recorded', 'updated_at']
+        read_only_fields = ['total_attendees', 'period', 'is_deleted', 'church', 'date_recorded', 'updated_at']
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new member
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
     
-class ChoirAttendanceSerializer(serializers.ModelSerializer):
+class ChoirAttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source='choir.member.full_name', read_only=True)
     day = serializers.ChoiceField(choices=days_of_week_choices)
     week = serializers.ChoiceField(choices=week_choices)
@@ -34,16 +35,36 @@ class ChoirAttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChoirAttendance
         fields = ['id', 'church', 'choir', 'activities','full_name', 'day', 'week', 'month', 'year', 
-                  'is_deleted', 'date_recorded', 'updated_at']
+                  'period', 'is_present', 'is_deleted', 'date_recorded', 'updated_at']
         
-        read_only_fields = ['is_deleted', 'church', 'date_recorded', 'updated_at']
+        read_only_fields = ['period', 'is_deleted', 'church', 'date_recorded', 'updated_at']
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new member
-        validated_data['church'] = church_account
-        return super().create(validated_data)
\ No newline at end of file
+        validated_data['church_id'] = church_id
+        return super().create(validated_data)
+
+
+class ChoirRollCallSerializer(serializers.Serializer):
+    """
+    A roll call of the choir for one activity on one date: the ids of the choir member accounts present and absent.
+    """
+    activity = serializers.IntegerField()
+    date = serializers.DateField()
+    present = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=1000)
+    absent = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=1000)
+
+    def validate(self, data):
+        if not data['present'] and not data['absent']:
+            raise serializers.ValidationError("List at least one choir member as present or absent.")
+        both = set(data['present']) & set(data['absent'])
+        if both:
+            raise serializers.ValidationError(
+                {"absent": [f"Choir members listed as both present and absent: {', '.join(map(str, sorted(both)))}."]}
+            )
+        return data
@@ -1,3 +1,294 @@
+import datetime
+import io
+
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from accounts.membership import membership_cache
+from accounts.models import ChoirMemberAccount
+from accounts.testing import QueryCountAssertionsMixin, create_account, create_church
+from church_activity.models import ChurchActivity
+from .models import ChoirAttendance, ChurchServiceAttendance, ServiceAttendanceRollup
+from .rollups import rebuild_rollups
+
+
+def create_activity(church, name='Choir practice'):
+    return ChurchActivity.objects.create(
+        church=church, name=name, start_time=datetime.time(17), end_time=datetime.time(19), day='Saturday',
+    )
+
+
+def create_attendance(church, activity, count, date=datetime.date(2026, 5, 2)):
+    for _ in range(count):
+        ChoirAttendance.objects.create(
+            church=church, activities=activity, choir=create_account(ChoirMemberAccount, church),
+            day='Saturday', week='1', date=date, month='May', year=2026,
+        )
+
+
+def create_service(church, date, attendance_type='Sunday service', men=10, women=20, visitors=2):
+    return ChurchServiceAttendance.objects.create(
+        church=church, attendance_type=attendance_type, date=date, month=date.strftime('%B'), year=date.year,
+        number_of_men=men, number_of_women=women, number_of_male_children=3, number_of_female_children=4, vistor=visitors,
+    )
+
+
+class ChoirAttendanceListQueryTests(QueryCountAssertionsMixin, APITestCase):
+    url = '/attendance/api/choir/attendance/'
+
+    def setUp(self):
+        super().setUp()
+        self.church = create_church()
+        self.activity = create_activity(self.church)
+        create_attendance(self.church, self.activity, 2)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.assertConstantQueries(
+            self.url, lambda: create_attendance(self.church, self.activity, 5), user=self.church.church_admin,
+        )
+
+    def test_query_budget(self):
+        self.assertEndpointQueries(self.url, 2, user=self.church.church_admin)
+        self.assertEndpointQueries(f'{self.url}?pagination=cursor', 1, user=self.church.church_admin)
+
+
+class ChoirRollCallTests(APITestCase):
+    url = '/attendance/api/choir/attendance/roll-call/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.activity = create_activity(self.church)
+        self.choir = [create_account(ChoirMemberAccount, self.church) for _ in range(3)]
+        self.client.force_authenticate(self.church.church_admin)
+
+    def roll_call(self, present, absent=(), **data):
+        payload = {
+            'activity': self.activity.pk, 'date': '2026-05-02',
+            'present': [account.pk for account in present], 'absent': [account.pk for account in absent], **data,
+        }
+        return self.client.post(self.url, payload, format='json')
+
+    def test_resubmitting_updates_instead_of_duplicating(self):
+        first = self.roll_call(self.choir[:2], self.choir[2:])
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((first.data['created'], first.data['updated']), (3, 0))
+        record = ChoirAttendance.objects.get(choir=self.choir[0])
+        self.assertEqual((record.day, record.week, record.month, record.year), ('Saturday', '1', 'May', 2026))
+
+        again = self.roll_call(self.choir[:2], self.choir[2:])
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual((again.data['created'], again.data['updated']), (0, 0))
+
+        # Only the member whose mark changed is updated; a late member is added
+        late = create_account(ChoirMemberAccount, self.church)
+        changed = self.roll_call([*self.choir, late])
+        self.assertEqual(changed.status_code, 201)
+        self.assertEqual((changed.data['created'], changed.data['updated']), (1, 1))
+        self.assertEqual(len(changed.data['results']), 4)
+
+        self.assertEqual(ChoirAttendance.objects.count(), 4)
+        self.assertEqual(ChoirAttendance.objects.filter(is_present=True).count(), 4)
+
+    def test_invalid_roll_calls_are_rejected(self):
+        outsider = create_account(ChoirMemberAccount, create_church('Bethel'))
+        self.assertEqual(self.roll_call([self.choir[0], outsider]).status_code, 400)
+        self.assertEqual(self.roll_call([self.choir[0]], [self.choir[0]]).status_code, 400)
+        self.assertEqual(self.roll_call([]).status_code, 400)
+        self.assertEqual(self.roll_call(self.choir, activity=create_activity(create_church('Calvary')).pk).status_code, 404)
+        self.assertFalse(ChoirAttendance.objects.exists())
+
+        self.client.force_authenticate(self.choir[0].user)
+        self.assertEqual(self.roll_call(self.choir).status_code, 403)
+
+
+class ServiceAttendanceRollupTests(TestCase):
+    def setUp(self):
+        self.church = create_church()
+        self.services = [
+            create_service(self.church, datetime.date(2026, 5, 3)),
+            create_service(self.church, datetime.date(2026, 5, 10), men=12),
+            create_service(self.church, datetime.date(2026, 5, 13), 'Midweek service', men=4, women=6, visitors=0),
+            create_service(self.church, datetime.date(2026, 6, 7)),
+        ]
+        create_service(create_church('Bethel'), datetime.date(2026, 5, 3))
+
+    def snapshot(self):
+        return sorted(
+            ServiceAttendanceRollup.objects.filter(church=self.church)
+            .values_list('granularity', 'period_start', 'attendance_type', 'services', 'men', 'women', 'visitors', 'total_attendees')
+        )
+
+    def test_signals_match_a_rebuild(self):
+        moved, soft_deleted, _, removed = self.services
+        moved.date = datetime.date(2026, 6, 14)
+        moved.number_of_men = 15
+        moved.save()
+        soft_deleted.is_deleted = True
+        soft_deleted.save()
+        removed.delete()
+
+        maintained = self.snapshot()
+        self.assertIn(('month', datetime.date(2026, 5, 1), 'Midweek service', 1, 4, 6, 0, 17), maintained)
+        self.assertIn(('month', datetime.date(2026, 6, 1), 'Sunday service', 1, 15, 20, 2, 44), maintained)
+        rebuild_rollups()
+        self.assertEqual(self.snapshot(), maintained)
+
+    def test_rebuild_command_reconciles_writes_that_skip_signals(self):
+        maintained = self.snapshot()
+        ChurchServiceAttendance.objects.filter(church=self.church).update(is_deleted=True)
+        self.assertEqual(self.snapshot(), maintained)
+
+        call_command('rebuild_attendance_rollups', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), [])
+
+
+class ServiceAttendanceTrendsTests(APITestCase):
+    url = '/attendance/api/church/attendance/trends/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        create_service(self.church, datetime.date(2026, 5, 3))
+        create_service(self.church, datetime.date(2026, 5, 13), 'Midweek service', men=4, women=6, visitors=0)
+        create_service(self.church, datetime.date(2026, 6, 7))
+        self.client.force_authenticate(self.church.church_admin)
+
+    def trends(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['period_start'], row.get('attendance_type'), row['services'], row['total_attendees']) for row in response.data['results']]
+
+    def test_totals_per_period(self):
+        self.assertEqual(self.trends(), [
+            (datetime.date(2026, 5, 1), None, 2, 56), (datetime.date(2026, 6, 1), None, 1, 39),
+        ])
+        self.assertEqual(self.trends(granularity='year'), [(datetime.date(2026, 1, 1), None, 3, 95)])
+        # A start inside a week still counts that whole week
+        self.assertEqual(self.trends(granularity='week', start='2026-05-14', end='2026-05-31'), [
+            (datetime.date(2026, 5, 11), None, 1, 17),
+        ])
+        self.assertEqual(self.trends(by_type='true', attendance_type='Midweek service'), [
+            (datetime.date(2026, 5, 1), 'Midweek service', 1, 17),
+        ])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'granularity': 'day', 'start': '05/01/2026'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'granularity', 'start'})
+
+
+class ChoirAttendanceRatesTests(APITestCase):
+    url = '/attendance/api/choir/attendance/rates/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.practice = create_activity(self.church)
+        self.service = create_activity(self.church, 'Sunday service')
+        self.regular = create_account(ChoirMemberAccount, self.church, full_name='Abena Regular')
+        self.sometimes = create_account(ChoirMemberAccount, self.church, full_name='Kwame Sometimes')
+        self.never = create_account(ChoirMemberAccount, self.church, full_name='Yaw Never')
+        left = create_account(ChoirMemberAccount, self.church, full_name='Esi Left')
+        left.is_deleted = True
+        left.save()
+        create_account(ChoirMemberAccount, create_church('Bethel'))
+
+        for date in (datetime.date(2026, 5, 2), datetime.date(2026, 5, 9)):
+            self.record(self.regular, self.practice, date, True)
+            self.record(self.sometimes, self.practice, date, date.day == 2)
+        self.record(self.regular, self.service, datetime.date(2026, 5, 3), True)
+        # A day recorded twice counts once
+        self.record(self.regular, self.service, datetime.date(2026, 5, 3), True)
+        self.client.force_authenticate(self.church.church_admin)
+
+    def record(self, account, activity, date, is_present):
+        ChoirAttendance.objects.create(
+            church=self.church, activities=activity, choir=account, date=date, is_present=is_present,
+            day='Saturday', week='1', month='May', year=2026,
+        )
+
+    def rates(self, **params):
+        response = self.client.get(self.url, {'start': '2026-05-01', 'end': '2026-05-31', **params})
+        self.assertEqual(response.status_code, 200)
+        return [(row['full_name'], row['activity_name'], row['present'], row['sessions'], row['rate']) for row in response.data['results']]
+
+    def test_every_active_member_gets_a_rate_per_activity(self):
+        self.assertEqual(sorted(self.rates()), [
+            ('Abena Regular', 'Choir practice', 2, 2, 100.0),
+            ('Abena Regular', 'Sunday service', 1, 1, 100.0),
+            ('Kwame Sometimes', 'Choir practice', 1, 2, 50.0),
+            ('Kwame Sometimes', 'Sunday service', 0, 1, 0.0),
+            ('Yaw Never', 'Choir practice', 0, 2, 0.0),
+            ('Yaw Never', 'Sunday service', 0, 1, 0.0),
+        ])
+
+    def test_ordering_and_activity(self):
+        rates = self.rates(activity=self.practice.pk)
+        self.assertEqual([row[0] for row in rates], ['Yaw Never', 'Kwame Sometimes', 'Abena Regular'])
+        self.assertEqual([row[0] for row in self.rates(activity=self.practice.pk, ordering='-rate')], ['Abena Regular', 'Kwame Sometimes', 'Yaw Never'])
+        self.assertEqual([row[0] for row in self.rates(ordering='full_name')][::2], ['Abena Regular', 'Kwame Sometimes', 'Yaw Never'])
+        # No activity held in the window, no rows
+        self.assertEqual(self.rates(start='2026-06-01', end='2026-06-30'), [])
+
+    def test_soft_deleted_members_are_left_out(self):
+        removed = create_account(ChoirMemberAccount, self.church, full_name='Ama Removed', is_deleted=True)
+        self.record(removed, self.practice, datetime.date(2026, 5, 2), True)
+        self.assertNotIn('Ama Removed', {row[0] for row in self.rates()})
+
+    def test_rates_are_paged(self):
+        response = self.client.get(self.url, {'start': '2026-05-01', 'end': '2026-05-31', 'page_size': 4, 'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'start': '2026-05-31', 'end': '2026-05-01', 'ordering': 'name', 'activity': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'start', 'ordering', 'activity'})
+
+
+class ChoirAttendanceFilterTests(APITestCase):
+    url = '/attendance/api/choir/attendance/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.practice = create_activity(self.church)
+        self.service = create_activity(self.church, 'Sunday service')
+        self.member = create_account(ChoirMemberAccount, self.church)
+        self.records = {
+            name: ChoirAttendance.objects.create(
+                church=self.church, activities=activity, choir=self.member, date=date,
+                day=date.strftime('%A'), week=str((date.day - 1) // 7 + 1), month=date.strftime('%B'), year=date.year,
+            )
+            for name, activity, date in [
+                ('practice', self.practice, datetime.date(2026, 5, 2)),
+                ('service', self.service, datetime.date(2026, 5, 10)),
+                ('june', self.practice, datetime.date(2026, 6, 6)),
+            ]
+        }
+        create_attendance(self.church, self.practice, 1, datetime.date(2026, 5, 9))
+        self.client.force_authenticate(self.church.church_admin)
+
+    def listed(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        ids = {record.pk: name for name, record in self.records.items()}
+        return sorted(ids.get(row['id'], 'other') for row in response.data['results'])
+
+    def test_filters(self):
+        self.assertEqual(self.listed(activity=self.service.pk), ['service'])
+        self.assertEqual(self.listed(choir=self.member.pk), ['june', 'practice', 'service'])
+        self.assertEqual(self.listed(choir=self.member.pk, activity=self.practice.pk), ['june', 'practice'])
+        self.assertEqual(self.listed(start='2026-05-03', end='2026-05-31'), ['other', 'service'])
+        self.assertEqual(self.listed(week='2'), ['service'])
+        self.assertEqual(self.listed(day='sunday'), ['service'])
+        self.assertEqual(self.listed(period_from='2026-06'), ['june'])
 
-# Create your tests here.
+    def test_invalid_filters(self):
+        for params in ({'activity': 'x'}, {'choir': '-1'}, {'start': '2026-02-30'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(set(response.data), set(params))
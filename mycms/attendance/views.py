@@ -1,4 +1,10 @@
-from .serializers import ChurchServiceAttendanceSerializer, ChoirAttendanceSerializer
+from .serializers import ChurchServiceAttendanceSerializer, ChoirAttendanceSerializer, ChoirRollCallSerializer
+from .rollcall import record_roll_call
+from .rollups import GRANULARITIES, attendance_trends
+from .analytics import RATE_ORDERINGS, attendance_rates
+from django.utils.dateparse import parse_date
+from django.utils import timezone
+import datetime
 from .models import ChurchServiceAttendance, ChoirAttendance
 from rest_framework import status
 from rest_framework.response import Response
@@ -6,9 +12,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from accounts.models import ChurchAccount, SecretaryAccount, ChoirDirectorAccount, ChoirMemberAccount
 from django.core.exceptions import PermissionDenied
-from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from accounts.views import CustomPagination
+from accounts.pagination import ReportPagination
+from accounts.prefetch import SerializerRelatedMixin
+from accounts.exports import ExportMixin
+from accounts.values import ValuesListMixin
+from accounts.periods import filter_by_period, parse_day
 from rest_framework import generics
+from accounts.membership import CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER
 
 
 # Create your views here.
@@ -26,26 +38,18 @@ class ChurchserviceAttendanceCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on Church Attendance.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a church secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                return Response(
-                    {"detail": "You are not associated with any church."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -55,7 +59,7 @@ class ChurchserviceAttendanceCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChurchserviceAttendanceListView(generics.ListAPIView):
+class ChurchserviceAttendanceListView(ExportMixin, ValuesListMixin, generics.ListAPIView):
     """
     View to retrieve all attendance with pagination.
     Both Church Admin and Secretary can access this view.
@@ -63,32 +67,62 @@ class ChurchserviceAttendanceListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChurchServiceAttendanceSerializer
     pagination_class = CustomPagination  # Use pagination for large datasets
+    export_fields = [
+        'id', 'attendance_type', 'date', 'number_of_men', 'number_of_women', 'number_of_male_children',
+        'number_of_female_children', 'vistor', 'total_attendees', 'month', 'year', 'period',
+        'is_deleted', 'date_recorded',
+    ]
+    export_filename = 'church_attendance'
+    keyset_ordering_field = 'date_recorded'
 
     def get_queryset(self):
         # Determine the church account based on the user role
-        try:
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=self.request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                try:
-                    choir_director = ChoirDirectorAccount.objects.get(user=self.request.user)
-                    church_account = choir_director.church
-                except ChoirDirectorAccount.DoesNotExist:
-                    try:
-                        choir = ChoirMemberAccount.objects.get(user=self.request.user)
-                        church_account = choir.church
-                    except ChoirMemberAccount.DoesNotExist:
-                        raise PermissionDenied("You do not have permission to view attendance.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER):
+            raise PermissionDenied("You do not have permission to view attendance.")
 
         # Query attendance records associated with the church
-        church_attendance = ChurchServiceAttendance.objects.filter(church=church_account)
+        church_attendance = ChurchServiceAttendance.objects.filter(church_id=membership.church_id)
+
+        return filter_by_period(church_attendance, self.request.query_params)
 
-        # You can add any additional filtering here if required
 
-        return church_attendance
+class ChurchserviceAttendanceTrendsView(APIView):
+    """
+    View to chart service attendance over time, read from the precomputed rollups.
+    - `?granularity=` is `week`, `month` (default) or `year`; `?start=` and `?end=` (YYYY-MM-DD) bound the periods.
+    - `?attendance_type=` keeps one type of service; `?by_type=true` gives one row per period and type
+      instead of the totals of each period.
+    Every role within the church can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER):
+            raise PermissionDenied("You do not have permission to view attendance.")
+
+        params = request.query_params
+        errors = {}
+        granularity = params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            errors['granularity'] = [f"Choose one of: {', '.join(GRANULARITIES)}."]
+        bounds = {}
+        for name in ('start', 'end'):
+            try:
+                bounds[name] = parse_date(params[name]) if params.get(name) else None
+            except ValueError:
+                bounds[name] = None
+            if params.get(name) and bounds[name] is None:
+                errors[name] = ["Enter a valid date (YYYY-MM-DD)."]
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = attendance_trends(
+            membership.church_id, granularity, bounds['start'], bounds['end'],
+            params.get('attendance_type'), params.get('by_type', '').lower() in ('1', 'true', 'yes'),
+        )
+        return Response({"granularity": granularity, "results": results}, status=status.HTTP_200_OK)
 
 
 class ChurchserviceAttendanceDetailUpdateDeleteView(APIView):
@@ -99,27 +133,22 @@ class ChurchserviceAttendanceDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChurchServiceAttendanceSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=user)
-                return secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage attendance.")
+        # Only the church admin and secretary can manage church attendance
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to manage attendance.")
+        return membership.church_id
 
-    def get_object(self, pk, church):
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChurchServiceAttendance object and ensure it belongs to the church.
         """
         try:
-            return ChurchServiceAttendance.objects.get(id=pk, church=church)
+            return ChurchServiceAttendance.objects.get(id=pk, church_id=church_id)
         except ChurchServiceAttendance.DoesNotExist:
             raise NotFound("Attendance not found or you do not have permission to access this record.")
 
@@ -127,8 +156,8 @@ class ChurchserviceAttendanceDetailUpdateDeleteView(APIView):
         """
         Retrieve a attendance by their ID.
         """
-        church = self.get_church(request.user)
-        church_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        church_attendance = self.get_object(pk, church_id)
         serializer = ChurchServiceAttendanceSerializer(church_attendance)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -136,8 +165,8 @@ class ChurchserviceAttendanceDetailUpdateDeleteView(APIView):
         """
         Update a attendance's information.
         """
-        church = self.get_church(request.user)
-        church_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        church_attendance = self.get_object(pk, church_id)
         serializer = ChurchServiceAttendanceSerializer(church_attendance, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -148,8 +177,8 @@ class ChurchserviceAttendanceDetailUpdateDeleteView(APIView):
         """
         Delete a attendance.
         """
-        church = self.get_church(request.user)
-        church_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        church_attendance = self.get_object(pk, church_id)
         church_attendance.delete()
         return Response({"detail": "Attendance has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
@@ -169,26 +198,18 @@ class ChoirAttendanceCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on Church Attendance.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a church secretary
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                return Response(
-                    {"detail": "You are not associated with any church."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or choir director)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -198,36 +219,147 @@ class ChoirAttendanceCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChoirAttendanceListView(generics.ListAPIView):
+class ChoirRollCallView(APIView):
     """
-    View to retrieve all attendance with pagination.
+    View to take the attendance of the whole choir at an activity at once.
+    Takes `activity`, `date` and the `present` and `absent` choir member account ids; day, week, month and year
+    are derived from the date. Submitting the same roll call again updates the records instead of duplicating them.
     Both Church Admin and Choir Director can access this view.
     """
     permission_classes = [IsAuthenticated]
-    serializer_class = ChurchServiceAttendanceSerializer
-    pagination_class = CustomPagination  # Use pagination for large datasets
+    serializer_class = ChoirRollCallSerializer
 
-    def get_queryset(self):
-        # Determine the church account based on the user role
-        try:
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
+    def post(self, request):
+        if request.user.is_superuser:
+            raise PermissionDenied("Superusers are not allowed to perform CRUD operations on Choir Attendance.")
+
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        records, created, updated = record_roll_call(
+            membership.church_id, data['activity'], data['date'], data['present'], data['absent'],
+        )
+        return Response(
+            {
+                "created": created,
+                "updated": updated,
+                "results": ChoirAttendanceSerializer(records, many=True, context={"request": request}).data,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class ChoirAttendanceRatesView(APIView):
+    """
+    View to compare how often each choir member attends each activity over a date window.
+    - `?start=` and `?end=` (YYYY-MM-DD) bound the window, the last 90 days by default.
+    - `?activity=` keeps one activity; `?ordering=` is `rate` (lowest attendance first, the default), `-rate` or `full_name`.
+    - Paginated with `?page=` and `?page_size=` (50 by default, at most 500).
+    Both Church Admin and Choir Director can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+    default_window = datetime.timedelta(days=89)
+
+    def get(self, request):
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to view attendance rates.")
+
+        params = request.query_params
+        errors = {}
+        bounds = {}
+        for name in ('start', 'end'):
             try:
-                choir_director = ChoirDirectorAccount.objects.get(user=self.request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                try:
-                    choir = ChoirMemberAccount.objects.get(user=self.request.user)
-                    church_account = choir.church
-                except ChoirMemberAccount.DoesNotExist:
-                    raise PermissionDenied("You do not have permission to view attendance.")
+                bounds[name] = parse_date(params[name]) if params.get(name) else None
+            except ValueError:
+                bounds[name] = None
+            if params.get(name) and bounds[name] is None:
+                errors[name] = ["Enter a valid date (YYYY-MM-DD)."]
+        end = bounds['end'] or timezone.localdate()
+        start = bounds['start'] or end - self.default_window
+        if not errors and start > end:
+            errors['start'] = ["The start must not be after the end."]
+
+        activity = params.get('activity')
+        if activity is not None and not activity.isdigit():
+            errors['activity'] = ["A valid integer is required."]
+        ordering = params.get('ordering', 'rate')
+        if ordering not in RATE_ORDERINGS:
+            errors['ordering'] = [f"Choose one of: {', '.join(RATE_ORDERINGS)}."]
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = attendance_rates(
+            membership.church_id, start, end, int(activity) if activity is not None else None, ordering,
+        )
+        paginator = ReportPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        response = paginator.get_paginated_response(page)
+        response.data['start'], response.data['end'] = start, end
+        return response
 
-        # Query attendance records associated with the church
-        church_attendance = ChurchServiceAttendance.objects.filter(church=church_account)
 
-        # You can add any additional filtering here if required
+class ChoirAttendanceListView(ExportMixin, ValuesListMixin, generics.ListAPIView):
+    """
+    View to retrieve the choir attendance records with pagination, newest first.
+    - `?activity=` and `?choir=` keep the records of one activity or choir member (account id).
+    - `?start=` and `?end=` (YYYY-MM-DD) bound the attendance date; `?week=` (1-5) and `?day=` (e.g. Sunday)
+      match the stored week of the month and day.
+    - `?period_from=`, `?period_to=` and `?ordering=period` work as on the other monthly lists (see accounts.periods).
+    Church Admin, Choir Director and Choir Members can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ChoirAttendanceSerializer
+    pagination_class = CustomPagination  # Use pagination for large datasets
+    export_fields = [
+        'id', 'choir', 'choir__member__full_name', 'activities', 'activities__name', 'date', 'day', 'week',
+        'month', 'year', 'period', 'is_present', 'is_deleted', 'date_recorded',
+    ]
+    export_filename = 'choir_attendance'
+    keyset_ordering_field = 'date_recorded'
 
-        return church_attendance
+    def get_queryset(self):
+        # Determine the church account based on the user role
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR, CHOIR_MEMBER):
+            raise PermissionDenied("You do not have permission to view attendance.")
+
+        params = self.request.query_params
+        # `activities` is rendered as an id, so only the member's name needs a join
+        attendance = ChoirAttendance.objects.filter(church_id=membership.church_id).select_related('choir__member')
+
+        # Each filter is an equality or range the (church, activities/choir, ...) indexes can seek
+        for name, lookup in (('activity', 'activities_id'), ('choir', 'choir_id')):
+            value = params.get(name)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({name: ["A valid integer is required."]})
+                attendance = attendance.filter(**{lookup: int(value)})
+
+        start, end = parse_day(params, 'start'), parse_day(params, 'end')
+        if start:
+            attendance = attendance.filter(date__gte=start)
+        if end:
+            attendance = attendance.filter(date__lte=end)
+
+        week = params.get('week')
+        if week:
+            attendance = attendance.filter(week=week)
+        day = params.get('day')
+        if day:
+            # Stored capitalized, so the comparison stays an equality instead of a case-insensitive scan
+            attendance = attendance.filter(day=day.capitalize())
+
+        return filter_by_period(attendance, params)
 
 class ChoirAttendanceDetailUpdateDeleteView(APIView):
     """
@@ -237,27 +369,22 @@ class ChoirAttendanceDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChoirAttendanceSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage attendance.")
+        # Only the church admin and choir director can manage choir attendance
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to manage attendance.")
+        return membership.church_id
 
-    def get_object(self, pk, church):
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChoirAttendance object and ensure it belongs to the church.
         """
         try:
-            return ChoirAttendance.objects.get(id=pk, church=church)
+            return ChoirAttendance.objects.get(id=pk, church_id=church_id)
         except ChoirAttendance.DoesNotExist:
             raise NotFound("Attendance not found or you do not have permission to access this record.")
 
@@ -265,8 +392,8 @@ class ChoirAttendanceDetailUpdateDeleteView(APIView):
         """
         Retrieve a attendance by their ID.
         """
-        church = self.get_church(request.user)
-        choir_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        choir_attendance = self.get_object(pk, church_id)
         serializer = ChoirAttendanceSerializer(choir_attendance)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -274,8 +401,8 @@ class ChoirAttendanceDetailUpdateDeleteView(APIView):
         """
         Update a attendance's information.
         """
-        church = self.get_church(request.user)
-        choir_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        choir_attendance = self.get_object(pk, church_id)
         serializer = ChoirAttendanceSerializer(choir_attendance, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -286,7 +413,7 @@ class ChoirAttendanceDetailUpdateDeleteView(APIView):
         """
         Delete a attendance.
         """
-        church = self.get_church(request.user)
-        church_attendance = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        church_attendance = self.get_object(pk, church_id)
         church_attendance.delete()
         return Response({"detail": "Attendance has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -15,5 +15,8 @@ class ChurchActivity(models.Model):
 
     def __str__(self):
         return f"{self.name}"
-    
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'updated_at', 'id'], name='activity_church_updated_idx'),
+        ]
@@ -10,6 +10,9 @@ from django.core.exceptions import PermissionDenied
 from rest_framework import generics
 from rest_framework.exceptions import NotFound
 from accounts.views import CustomPagination
+from accounts.prefetch import SerializerRelatedMixin
+from accounts.versions import conditional_get
+from accounts.membership import CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER
 
     
 
@@ -27,26 +30,18 @@ class ChurchActivityCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChurchActivity.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a church secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                return Response(
-                    {"detail": "You are not associated with any church."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -55,7 +50,7 @@ class ChurchActivityCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ChurchActivityListView(generics.ListAPIView):
+class ChurchActivityListView(SerializerRelatedMixin, generics.ListAPIView):
     """
     View to retrieve all activities with pagination.
     Church Admin, Secretary, Choir Director, and Choir Members can access this view.
@@ -64,32 +59,18 @@ class ChurchActivityListView(generics.ListAPIView):
     serializer_class = ChurchActivitySerializer
     pagination_class = CustomPagination  # Use pagination for large datasets
 
+    @conditional_get('activities')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         # Determine the church account based on the user role
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=self.request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                # Check if the user is a choir director
-                try:
-                    choir_director_account = ChoirDirectorAccount.objects.get(user=self.request.user)
-                    church_account = choir_director_account.church
-                except ChoirDirectorAccount.DoesNotExist:
-                    # Check if the user is a choir member
-                    try:
-                        choir_member_account = ChoirMemberAccount.objects.get(user=self.request.user)
-                        church_account = choir_member_account.church
-                    except ChoirMemberAccount.DoesNotExist:
-                        raise PermissionDenied("You do not have permission to view activities.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER):
+            raise PermissionDenied("You do not have permission to view activities.")
 
         # Retrieve activities associated with the church
-        activities = ChurchActivity.objects.filter(church=church_account)
+        activities = ChurchActivity.objects.filter(church_id=membership.church_id)
 
         # Apply search filters based on query parameters
         name = self.request.query_params.get('name', None)
@@ -106,36 +87,32 @@ class ChurchActivityDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChurchActivitySerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=user)
-                return secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage activity.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and secretary can manage activities
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to manage activity.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChurchActivity object and ensure it belongs to the church.
         """
         try:
-            return ChurchActivity.objects.get(id=pk, church=church)
+            return ChurchActivity.objects.get(id=pk, church_id=church_id)
         except ChurchActivity.DoesNotExist:
             raise NotFound("Activity not found or you do not have permission to access this record.")
 
+    @conditional_get('activities', roles=(CHURCH_ADMIN, SECRETARY))
     def get(self, request, pk):
         """
         Retrieve a activity by their ID.
         """
-        church = self.get_church(request.user)
-        activity = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        activity = self.get_object(pk, church_id)
         serializer = ChurchActivitySerializer(activity)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -143,8 +120,8 @@ class ChurchActivityDetailUpdateDeleteView(APIView):
         """
         Update a activity's information.
         """
-        church = self.get_church(request.user)
-        activity = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        activity = self.get_object(pk, church_id)
         serializer = ChurchActivitySerializer(activity, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -155,7 +132,7 @@ class ChurchActivityDetailUpdateDeleteView(APIView):
         """
         Delete a activity.
         """
-        church = self.get_church(request.user)
-        activity = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        activity = self.get_object(pk, church_id)
         activity.delete()
         return Response({"detail": "Activity has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
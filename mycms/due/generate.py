@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from accounts.models import ChurchAccount, ChoirMemberAccount
+from accounts.periods import month_period
+from .models import ChoirDue
+
+
+def generate_dues(church_id, month, year, amount_due, amount_paid, date_paid=None):
+    """
+    Create the dues of a month for every active choir member of a church, in one transaction.
+    Members who already have a due for that month are skipped, so generating a month again changes nothing.
+    Returns (number created, number skipped).
+    """
+    period = month_period(month, year)
+    with transaction.atomic():
+        # Locking the church serializes generations for it, so two requests cannot both create a member's due
+        ChurchAccount.objects.select_for_update().only('pk').get(pk=church_id)
+
+        members = ChoirMemberAccount.objects.filter(church_id=church_id, is_deleted=False, member__is_deleted=False)
+        # One query with a set-based existence check tells which members already have a due for the month
+        billed = ChoirDue.objects.filter(church_id=church_id, period=period, is_deleted=False, choir_member=OuterRef('pk'))
+        rows = list(members.annotate(billed=Exists(billed)).values_list('pk', 'billed'))
+        unbilled = [choir_member_id for choir_member_id, has_due in rows if not has_due]
+        skipped = len(rows) - len(unbilled)
+
+        # bulk_create skips ChoirDue.save(), so the fields it derives are set here
+        created = ChoirDue.objects.bulk_create([
+            ChoirDue(
+                church_id=church_id, choir_member_id=choir_member_id,
+                amount_due=amount_due, amount_paid=amount_paid, balance=amount_due - amount_paid,
+                date_paid=date_paid or period, month=month, year=year, period=period,
+            )
+            for choir_member_id in unbilled
+        ], batch_size=1000)
+    return len(created), skipped
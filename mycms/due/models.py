@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import ChurchAccount, ChoirMemberAccount
+from accounts.periods import month_period
 from django.core.validators import MinValueValidator
 from django.db.models import Sum
 from choice.views import month_choices
@@ -16,6 +17,7 @@ class ChoirDue(models.Model):
     balance = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.00)])
     month = models.CharField(max_length=25, choices=month_choices)
     year = models.IntegerField()
+    period = models.DateField(null=True, blank=True, editable=False)  # First day of the month, set on save
     is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -26,6 +28,7 @@ class ChoirDue(models.Model):
     
     def save(self, *args, **kwargs):
         self.balance = self.amount_due - self.amount_paid
+        self.period = month_period(self.month, self.year)
         super().save(*args, **kwargs)
 
     def clean(self):
@@ -38,3 +41,9 @@ class ChoirDue(models.Model):
     
     class Meta:
         verbose_name_plural = 'choir member dues'
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='due_church_deleted_idx'),
+            models.Index(fields=['church', 'period'], name='due_church_period_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='due_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='due_church_updated_idx'),
+        ]
@@ -1,26 +1,47 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import ChoirDue
+from accounts.fieldsets import SparseFieldsetMixin
+from choice.views import month_choices
 
 
 
-class ChoirDueSerializer(serializers.ModelSerializer):
+class ChoirDueSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source='choir_member.member.full_name', read_only=True)
 
     class Meta:
         model = ChoirDue
         fields = [
             'id', 'church', 'choir_member', 'full_name', 'amount_due',
-            'amount_paid', 'date_paid', 'balance', 'month', 'year', 'is_deleted',
+            'amount_paid', 'date_paid', 'balance', 'month', 'year', 'period', 'is_deleted',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['is_deleted', 'church', 'full_name', 'balance', 'created_at', 'updated_at']
+        read_only_fields = ['is_deleted', 'church', 'full_name', 'balance', 'period', 'created_at', 'updated_at']
 
     def validate(self, data):
         choir_member = data.get('choir_member')
-        church = self.context['request'].user.choirdirectoraccount.church
+        church_id = self.context['request'].church_membership.church_id
 
         # Ensure the choir member belongs to the correct church
-        if choir_member.church != church:
+        if choir_member.church_id != church_id:
             raise serializers.ValidationError("The choir member does not belong to the specified church.")
         return data
 
+
+
+class ChoirDueGenerateSerializer(serializers.Serializer):
+    """
+    The dues of one month to create for the whole choir: the amount each member owes and, optionally, has paid.
+    `date_paid` defaults to the first day of the month.
+    """
+    month = serializers.ChoiceField(choices=month_choices)
+    year = serializers.IntegerField(min_value=1, max_value=9999)
+    amount_due = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.00'))
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.00'), default=Decimal('0.00'))
+    date_paid = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data['amount_paid'] > data['amount_due']:
+            raise serializers.ValidationError({"amount_paid": ["The amount paid cannot exceed the amount due."]})
+        return data
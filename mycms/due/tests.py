@@ -1,3 +1,90 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from accounts.membership import membership_cache
+from accounts.models import ChoirMemberAccount
+from accounts.testing import QueryCountAssertionsMixin, create_account, create_church
+from .models import ChoirDue
+
+
+def create_dues(church, count, month='May', year=2026):
+    for _ in range(count):
+        ChoirDue.objects.create(
+            church=church, choir_member=create_account(ChoirMemberAccount, church), amount_due=Decimal('10.00'),
+            amount_paid=Decimal('4.00'), date_paid=datetime.date(year, 5, 1), month=month, year=year,
+        )
+
+
+class ChoirDueListQueryTests(QueryCountAssertionsMixin, APITestCase):
+    url = '/due/api/choir-dues/'
+
+    def setUp(self):
+        super().setUp()
+        self.church = create_church()
+        create_dues(self.church, 2)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.assertConstantQueries(self.url, lambda: create_dues(self.church, 5), user=self.church.church_admin)
+
+    def test_query_budget(self):
+        self.assertEndpointQueries(self.url, 2, user=self.church.church_admin)
+        # ?fields= keeps to the values() rows as well
+        self.assertEndpointQueries(f'{self.url}?fields=id,full_name', 2, user=self.church.church_admin)
+
+
+class ChoirDueGenerateTests(APITestCase):
+    url = '/due/api/generate/choir-dues/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.choir = [create_account(ChoirMemberAccount, self.church) for _ in range(3)]
+        create_account(ChoirMemberAccount, create_church('Bethel'))
+        self.client.force_authenticate(self.church.church_admin)
+
+    def generate(self, **data):
+        return self.client.post(self.url, {'month': 'May', 'year': 2026, 'amount_due': '10.00', **data}, format='json')
+
+    def test_generating_a_month_again_creates_nothing(self):
+        first = self.generate(amount_paid='4.00')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data, {'created': 3, 'skipped': 0})
+        due = ChoirDue.objects.get(choir_member=self.choir[0])
+        # Set by generate_dues, as bulk_create skips ChoirDue.save()
+        self.assertEqual((due.balance, due.period, due.date_paid), (Decimal('6.00'), datetime.date(2026, 5, 1), datetime.date(2026, 5, 1)))
+
+        again = self.generate()
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data, {'created': 0, 'skipped': 3})
+        self.assertEqual(ChoirDue.objects.filter(church=self.church).count(), 3)
+
+    def test_only_unbilled_active_members_get_a_due(self):
+        create_dues(self.church, 1)  # A member already billed for May
+        left = self.choir[0]
+        left.is_deleted = True
+        left.save()
+        # A deleted due does not count as billed
+        ChoirDue.objects.create(
+            church=self.church, choir_member=self.choir[1], amount_due=Decimal('10.00'), amount_paid=Decimal('0.00'),
+            date_paid=datetime.date(2026, 5, 1), month='May', year=2026, is_deleted=True,
+        )
+
+        response = self.generate(date_paid='2026-05-15')
+        self.assertEqual(response.data, {'created': 2, 'skipped': 1})
+        self.assertFalse(ChoirDue.objects.filter(choir_member=left).exists())
+        self.assertEqual(ChoirDue.objects.get(choir_member=self.choir[2]).date_paid, datetime.date(2026, 5, 15))
+
+        # Another month is billed separately
+        self.assertEqual(self.generate(month='June').data, {'created': 3, 'skipped': 0})
+
+    def test_invalid_requests(self):
+        response = self.generate(month='Mai', amount_due='-1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'month', 'amount_due'})
+        self.assertEqual(self.generate(amount_paid='12.00').status_code, 400)
+        self.assertFalse(ChoirDue.objects.exists())
+
+        self.client.force_authenticate(self.choir[0].user)
+        self.assertEqual(self.generate().status_code, 403)
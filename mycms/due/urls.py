@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('api/create/choir-dues/', views.ChoirDueCreateAPIView.as_view(), name='add_choir_due'),
+    path('api/generate/choir-dues/', views.ChoirDueGenerateAPIView.as_view(), name='generate_choir_dues'),
     path('api/choir-dues/', views.ChoirDueListAPIView.as_view(), name='choir_due_list'),
     path('api/choir-dues/<int:pk>/', views.ChoirDueDetailUpdateDeleteAPIView.as_view(), name='choir_due'),
 ]
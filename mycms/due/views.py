@@ -3,7 +3,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import ChoirDue
-from .serializers import ChoirDueSerializer
+from .serializers import ChoirDueSerializer, ChoirDueGenerateSerializer
+from .generate import generate_dues
 from accounts.models import ChoirMemberAccount
 from rest_framework import generics
 from rest_framework.exceptions import PermissionDenied
@@ -13,25 +14,29 @@ from rest_framework.exceptions import PermissionDenied, NotFound
 from accounts.models import ChurchAccount, ChoirDirectorAccount
 from rest_framework.generics import ListAPIView
 from accounts.views import CustomPagination
+from accounts.exports import ExportMixin
+from accounts.values import ValuesListMixin
+from accounts.periods import filter_by_period
+from accounts.membership import CHURCH_ADMIN, CHOIR_DIRECTOR
 
 
 
-class ChoirDueListAPIView(ListAPIView):
+class ChoirDueListAPIView(ExportMixin, ValuesListMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChoirDueSerializer
     pagination_class = CustomPagination
+    export_fields = [
+        'id', 'choir_member__member__full_name', 'amount_due', 'amount_paid', 'balance', 'date_paid', 'month',
+        'year', 'period', 'is_deleted', 'created_at',
+    ]
+    export_filename = 'choir_dues'
 
     def get_queryset(self):
-        try:
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=self.request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to view choir dues.")
-        
-        dues = ChoirDue.objects.filter(church=church_account)
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to view choir dues.")
+
+        dues = ChoirDue.objects.filter(church_id=membership.church_id)
 
         # Apply filters
         full_name = self.request.query_params.get('full_name', None)
@@ -42,22 +47,50 @@ class ChoirDueListAPIView(ListAPIView):
         if gender:
             dues = dues.filter(gender=gender)
 
-        return dues
+        return filter_by_period(dues, self.request.query_params)
     
 class ChoirDueCreateAPIView(generics.CreateAPIView):
     serializer_class = ChoirDueSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        user = self.request.user
-        choir_director = getattr(user, 'choirdirectoraccount', None)
-        
-        if choir_director:
+        membership = self.request.church_membership
+
+        if membership.allows(CHOIR_DIRECTOR):
             # Automatically associate the due with the director's church
-            serializer.save(church=choir_director.church)
+            serializer.save(church_id=membership.church_id)
         else:
             raise PermissionError("Only choir directors can create dues.")
 
+class ChoirDueGenerateAPIView(APIView):
+    """
+    View to create the dues of a month for every active choir member at once.
+    Takes `month`, `year`, `amount_due` and optionally `amount_paid` (0 by default) and `date_paid`.
+    Members who already have a due for the month are skipped, so generating a month again creates nothing.
+    Both Church Admin and Choir Director can access this view.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ChoirDueGenerateSerializer
+
+    def post(self, request):
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to create choir dues.")
+
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        created, skipped = generate_dues(
+            membership.church_id, data['month'], data['year'], data['amount_due'], data['amount_paid'],
+            data.get('date_paid'),
+        )
+        return Response(
+            {"created": created, "skipped": skipped},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
 class ChoirDueDetailUpdateDeleteAPIView(APIView):
     """
     View to retrieve, update, and delete a choir due.
@@ -66,27 +99,22 @@ class ChoirDueDetailUpdateDeleteAPIView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ChoirDueSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a choir director
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage choir dues.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and choir director can manage choir dues
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to manage choir dues.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChoirDue object and ensure it belongs to the church.
         """
         try:
-            return ChoirDue.objects.get(id=pk, church=church)
+            return ChoirDue.objects.get(id=pk, church_id=church_id)
         except ChoirDue.DoesNotExist:
             raise NotFound("Choir due not found or you do not have permission to access this record.")
 
@@ -94,8 +122,8 @@ class ChoirDueDetailUpdateDeleteAPIView(APIView):
         """
         Retrieve a choir due by its ID.
         """
-        church = self.get_church(request.user)
-        due = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        due = self.get_object(pk, church_id)
         serializer = self.serializer_class(due)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -103,8 +131,8 @@ class ChoirDueDetailUpdateDeleteAPIView(APIView):
         """
         Update a choir due's information.
         """
-        church = self.get_church(request.user)
-        due = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        due = self.get_object(pk, church_id)
         serializer = self.serializer_class(due, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
@@ -115,8 +143,8 @@ class ChoirDueDetailUpdateDeleteAPIView(APIView):
         """
         Delete a choir due.
         """
-        church = self.get_church(request.user)
-        due = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        due = self.get_object(pk, church_id)
         due.delete()
         return Response({"detail": "Choir Due has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
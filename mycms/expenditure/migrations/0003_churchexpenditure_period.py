@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('expenditure', '0002_churchexpenditure_expenditure_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='churchexpenditure',
+            name='expenditure_church_period_idx',
+        ),
+        migrations.AddField(
+            model_name='churchexpenditure',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='churchexpenditure',
+            index=models.Index(fields=['church', 'period'], name='expenditure_church_period_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+import datetime
+
+from django.db import migrations
+
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+MODELS = ['ChurchExpenditure']
+
+
+def populate_period(apps, schema_editor):
+    # One set-based UPDATE per stored (year, month); rows without a valid month keep a null period
+    for name in MODELS:
+        model = apps.get_model('expenditure', name)
+        for year in model.objects.order_by().values_list('year', flat=True).distinct():
+            if not datetime.MINYEAR <= year <= datetime.MAXYEAR:
+                continue
+            for number, month in enumerate(MONTHS, start=1):
+                model.objects.filter(year=year, month=month).update(period=datetime.date(year, number, 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenditure', '0003_churchexpenditure_period'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_period, migrations.RunPython.noop),
+    ]
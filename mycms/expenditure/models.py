@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import ChurchAccount
+from accounts.periods import month_period
 from django.core.validators import MinValueValidator
 from choice.views import month_choices, expense_types_choices
 
@@ -14,6 +15,7 @@ class ChurchExpenditure(models.Model):
     descriptions = models.CharField(max_length=255, blank=True, null=True)
     month = models.CharField(max_length=25, choices=month_choices)
     year = models.IntegerField()
+    period = models.DateField(null=True, blank=True, editable=False)  # First day of the month, set on save
     is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -21,3 +23,14 @@ class ChurchExpenditure(models.Model):
 
     def __str__(self):
         return f"{self.item}"
+
+    def save(self, *args, **kwargs):
+        self.period = month_period(self.month, self.year)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='expenditure_church_deleted_idx'),
+            models.Index(fields=['church', 'period'], name='expenditure_church_period_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='expenditure_church_active_idx'),
+        ]
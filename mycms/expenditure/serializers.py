@@ -3,23 +3,24 @@ from .models import ChurchExpenditure
 from accounts.models import ChurchAccount
 from rest_framework import serializers
 from choice.views import expense_types_choices
+from accounts.fieldsets import SparseFieldsetMixin
 
 
 
-class ExpenditureSerializer(serializers.ModelSerializer):
+class ExpenditureSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     expenses_type = serializers.ChoiceField(choices=expense_types_choices)
     class Meta:
         model = ChurchExpenditure
-        fields = ['id', 'church', 'expenses_type', 'item', 'lrd_amount', 'usd_amount', 'descriptions', 'month', 'year', 'is_deleted', 'created_at', 'updated_at']
-        read_only_fields = [ 'church', 'is_deleted', 'created_at', 'updated_at']
+        fields = ['id', 'church', 'expenses_type', 'item', 'lrd_amount', 'usd_amount', 'descriptions', 'month', 'year', 'period', 'is_deleted', 'created_at', 'updated_at']
+        read_only_fields = [ 'church', 'period', 'is_deleted', 'created_at', 'updated_at']
 
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new department
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
@@ -1,3 +1,60 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from accounts.membership import membership_cache
+from accounts.testing import create_church
+from .models import ChurchExpenditure
+
+
+class ExpenditurePeriodTests(APITestCase):
+    url = '/expenditure/api/expenditures/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.expenditures = {
+            (month, year): ChurchExpenditure.objects.create(
+                church=self.church, expenses_type='Ministry_Expenses', item=f'{month} {year}', month=month, year=year,
+            )
+            for month, year in [('December', 2025), ('January', 2026), ('March', 2026), ('May', 2026)]
+        }
+        self.client.force_authenticate(self.church.church_admin)
+
+    def items(self, **params):
+        response = self.client.get(self.url, {'page_size': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['item'] for row in response.data['results']]
+
+    def test_period_is_set_on_save(self):
+        expenditure = self.expenditures['March', 2026]
+        self.assertEqual(expenditure.period, datetime.date(2026, 3, 1))
+        expenditure.month, expenditure.year = 'February', 2027
+        expenditure.save()
+        expenditure.refresh_from_db()
+        self.assertEqual(expenditure.period, datetime.date(2027, 2, 1))
+
+    def test_range_and_ordering(self):
+        self.assertEqual(self.items(ordering='period'), ['December 2025', 'January 2026', 'March 2026', 'May 2026'])
+        self.assertEqual(self.items(ordering='-period'), ['May 2026', 'March 2026', 'January 2026', 'December 2025'])
+        # Both ends are included; a full date stands for its month
+        self.assertEqual(
+            self.items(period_from='2025-12', period_to='2026-03-31', ordering='period'),
+            ['December 2025', 'January 2026', 'March 2026'],
+        )
+        self.assertEqual(self.items(period_from='2026-02', ordering='period'), ['March 2026', 'May 2026'])
+        self.assertEqual(self.items(period_to='2025-12'), ['December 2025'])
+
+    def test_invalid_parameters(self):
+        for params in ({'period_from': 'May 2026'}, {'period_to': '2026-13'}, {'ordering': 'item'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(set(response.data), set(params))
+
+    def test_month_ordering_cannot_be_paged_by_cursor(self):
+        for params in ({'ordering': 'period', 'pagination': 'cursor'}, {'ordering': '-period', 'cursor': 'abc'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(set(response.data), {'ordering'})
+        # Without a month ordering the keyset pages are fine
+        self.assertEqual(self.client.get(self.url, {'period_from': '2026-01', 'pagination': 'cursor'}).status_code, 200)
@@ -9,6 +9,10 @@ from accounts.models import ChurchAccount, SecretaryAccount, ChoirDirectorAccoun
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework import generics
 from accounts.views import CustomPagination
+from accounts.exports import ExportMixin
+from accounts.values import ValuesListMixin
+from accounts.periods import MONTHS, filter_by_period
+from accounts.membership import CHURCH_ADMIN, SECRETARY
 
         
     
@@ -27,26 +31,18 @@ class ExpenditureCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on expenditure.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if they are a choir director or secretary
-                try:
-                    secretary_account = SecretaryAccount.objects.get(user=request.user)
-                    church_account = secretary_account.church
-                except SecretaryAccount.DoesNotExist:
-                    return Response(
-                        {"detail": "You are not associated with any church."},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or secretary)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -55,7 +51,7 @@ class ExpenditureCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ExpenditureListView(generics.ListAPIView):
+class ExpenditureListView(ExportMixin, ValuesListMixin, generics.ListAPIView):
     """
     View to retrieve all expenditures with pagination.
     Both Church Admin and Secretary can access this view.
@@ -63,23 +59,20 @@ class ExpenditureListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ExpenditureSerializer
     pagination_class = CustomPagination  # Use pagination for large datasets
+    export_fields = [
+        'id', 'expenses_type', 'item', 'usd_amount', 'lrd_amount', 'descriptions', 'month', 'year',
+        'period', 'is_deleted', 'created_at',
+    ]
+    export_filename = 'expenditures'
 
     def get_queryset(self):
         # Determine the church account based on the user role
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=self.request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to view expenditures.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to view expenditures.")
 
         # Retrieve all expenditures associated with the church
-        expenditures = ChurchExpenditure.objects.filter(church=church_account)
+        expenditures = ChurchExpenditure.objects.filter(church_id=membership.church_id)
 
         # Apply search filters based on query parameters
         expenses_type = self.request.query_params.get('expenses_type', None)
@@ -88,9 +81,11 @@ class ExpenditureListView(generics.ListAPIView):
         
         month = self.request.query_params.get('month', None)
         if month:
-            expenditures = expenditures.filter(month__icontains=month)
+            # Resolved against the month names, so the database compares for equality instead of scanning with LIKE
+            expenditures = expenditures.filter(month__in=[name for name in MONTHS if month.lower() in name.lower()])
 
-        return expenditures
+        # `?period_from=` / `?period_to=` (YYYY-MM) and `?ordering=period` use the (church, period) index
+        return filter_by_period(expenditures, self.request.query_params)
     
 class ExpenditureDetailUpdateDeleteView(APIView):
     """
@@ -100,27 +95,22 @@ class ExpenditureDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ExpenditureSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=user)
-                return secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage expenditure.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and secretary can manage expenditures
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise PermissionDenied("You do not have permission to manage expenditure.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChurchExpenditure object and ensure it belongs to the church.
         """
         try:
-            return ChurchExpenditure.objects.get(id=pk, church=church)
+            return ChurchExpenditure.objects.get(id=pk, church_id=church_id)
         except ChurchExpenditure.DoesNotExist:
             raise NotFound("Expenditure not found or you do not have permission to access this record.")
 
@@ -128,8 +118,8 @@ class ExpenditureDetailUpdateDeleteView(APIView):
         """
         Retrieve a expenditure by their ID.
         """
-        church = self.get_church(request.user)
-        expenditure = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        expenditure = self.get_object(pk, church_id)
         serializer = ExpenditureSerializer(expenditure)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -137,8 +127,8 @@ class ExpenditureDetailUpdateDeleteView(APIView):
         """
         Update a expenditure's information.
         """
-        church = self.get_church(request.user)
-        expenditure = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        expenditure = self.get_object(pk, church_id)
         serializer = ExpenditureSerializer(expenditure, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -149,7 +139,7 @@ class ExpenditureDetailUpdateDeleteView(APIView):
         """
         Delete a member.
         """
-        church = self.get_church(request.user)
-        expenditure = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        expenditure = self.get_object(pk, church_id)
         expenditure.delete()
         return Response({"detail": "Expenditure has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
@@ -62,10 +62,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.QueryTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.ChurchMembershipMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,11 +85,15 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'accounts.renderers.ORJSONRenderer',  # JSONRenderer output, rendered with orjson when installed
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,  # Number of records per page
@@ -97,6 +103,36 @@ REST_FRAMEWORK = {
     # ],
 }
 
+# Cache of each user's church and role (see accounts.membership)
+CHURCH_MEMBERSHIP_CACHE = {
+    'MAX_SIZE': 2048,  # Users kept in each process's LRU cache
+    'TIMEOUT': 300,  # Seconds before an entry is resolved again
+    'SHARED_CACHE_ALIAS': None,  # Set to a CACHES alias (e.g. 'default') to share entries between processes
+}
+
+# Per-request SQL instrumentation (see accounts.middleware.QueryTimingMiddleware)
+QUERY_TIMING = {
+    'SAMPLE_RATE': 100 if DEBUG else 1,  # Percentage of requests whose SQL is captured (all are timed): every one in development, a sample in production
+    'SLOW_REQUEST_MS': 500,  # Requests slower than this are logged with their slowest queries
+    'TOP_QUERIES': 5,  # Number of slowest statements included in the log
+}
+
+# Delta sync feeds for offline clients (see accounts.sync)
+DELTA_SYNC = {
+    'PAGE_SIZE': 100,  # Changes per page without ?page_size=
+    'MAX_PAGE_SIZE': 500,  # Largest ?page_size= accepted
+    'SETTLE_SECONDS': 2,  # Changes younger than this wait for the next sync, so slow commits are not skipped
+}
+
+# Cache of token -> user lookups (see accounts.authentication)
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 2048,  # Tokens kept in each process's LRU cache
+    # Seconds before a token is checked against the database again. Without a shared cache, other processes
+    # accept a deleted token or deactivated user for up to this long.
+    'TIMEOUT': 30,
+    'SHARED_CACHE_ALIAS': None,  # Set to a CACHES alias (e.g. 'default') so deletions reach every process at once
+}
+
 ROOT_URLCONF = 'mycms.urls'
 
 TEMPLATES = [
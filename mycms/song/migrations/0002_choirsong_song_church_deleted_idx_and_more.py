@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_memberregistration_member_church_deleted_idx_and_more'),
+        ('song', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choirsong',
+            index=models.Index(fields=['church', 'is_deleted', '-created_at'], name='song_church_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choirsong',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['church', '-created_at'], name='song_church_active_idx'),
+        ),
+    ]
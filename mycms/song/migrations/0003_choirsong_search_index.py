@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table: the text lives in song_choirsong, the index in song_choirsong_fts
+    """
+    CREATE VIRTUAL TABLE song_choirsong_fts USING fts5(
+        title, author, song_content,
+        content='song_choirsong', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER song_choirsong_fts_insert AFTER INSERT ON song_choirsong BEGIN
+        INSERT INTO song_choirsong_fts(rowid, title, author, song_content)
+        VALUES (new.id, new.title, new.author, new.song_content);
+    END
+    """,
+    """
+    CREATE TRIGGER song_choirsong_fts_delete AFTER DELETE ON song_choirsong BEGIN
+        INSERT INTO song_choirsong_fts(song_choirsong_fts, rowid, title, author, song_content)
+        VALUES ('delete', old.id, old.title, old.author, old.song_content);
+    END
+    """,
+    """
+    CREATE TRIGGER song_choirsong_fts_update AFTER UPDATE OF title, author, song_content ON song_choirsong BEGIN
+        INSERT INTO song_choirsong_fts(song_choirsong_fts, rowid, title, author, song_content)
+        VALUES ('delete', old.id, old.title, old.author, old.song_content);
+        INSERT INTO song_choirsong_fts(rowid, title, author, song_content)
+        VALUES (new.id, new.title, new.author, new.song_content);
+    END
+    """,
+    # Index the existing songs
+    "INSERT INTO song_choirsong_fts(song_choirsong_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS song_choirsong_fts_update",
+    "DROP TRIGGER IF EXISTS song_choirsong_fts_delete",
+    "DROP TRIGGER IF EXISTS song_choirsong_fts_insert",
+    "DROP TABLE IF EXISTS song_choirsong_fts",
+]
+
+# Must match song.search.SEARCH_VECTOR for the planner to use the index
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX song_choirsong_search_idx ON song_choirsong USING GIN (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || song_content)
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARD = ["DROP INDEX IF EXISTS song_choirsong_search_idx"]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('song', '0002_choirsong_song_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('song', '0003_choirsong_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='choirsong',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='song_church_updated_idx'),
+        ),
+    ]
@@ -17,4 +17,9 @@ class ChoirSong(models.Model):
     
     class Meta:
         verbose_name_plural = 'Choirs songs'
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='song_church_deleted_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='song_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='song_church_updated_idx'),
+        ]
 
@@ -0,0 +1,86 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import escape
+
+
+# Full-text index over title, author and lyrics. On SQLite it is an FTS5 table kept in sync
+# with song_choirsong by triggers; on PostgreSQL a GIN index over SEARCH_VECTOR (see migration 0003).
+FTS_TABLE = 'song_choirsong_fts'
+SEARCH_CONFIG = 'english'
+SEARCH_VECTOR = (
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || song_content)"
+)
+
+# BM25 column weights: a hit in the title counts more than one in the author or the lyrics
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+SNIPPET_WORDS = 12
+# The database marks the hits with control characters, so the lyrics can be HTML-escaped before
+# the markers become <mark> tags (see highlight)
+HIT_START, HIT_END = '\x02', '\x03'
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match, the last one as a prefix
+    (the user may still be typing). Quoting each word keeps FTS5 syntax characters inert.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_songs(queryset, text):
+    """
+    Restrict a ChoirSong queryset to the songs matching `text`, best match first.
+    Each song gets a `rank` and a raw `snippet` of the matching lyrics with the hits between HIT_START
+    and HIT_END; `highlight` turns it into safe HTML.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        match = fts_query(text)
+        if match is None:
+            return queryset.none()
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        # The unary + keeps SQLite from probing the FTS table once per song by rowid (one MATCH per
+        # row); the join then starts from the MATCH and looks songs up by primary key.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'song_choirsong.id = +{FTS_TABLE}.rowid', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={
+                'rank': f'bm25({FTS_TABLE}, {weights})',
+                'snippet': f"snippet({FTS_TABLE}, 2, char(2), char(3), '…', {SNIPPET_WORDS})",
+            },
+        ).order_by('rank', '-id')
+
+    if connection.vendor == 'postgresql':
+        query = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.extra(
+            where=[f'{SEARCH_VECTOR} @@ {query}'],
+            params=[text],
+            select={
+                'rank': f'-ts_rank_cd({SEARCH_VECTOR}, {query})',
+                'snippet': (
+                    f"ts_headline('{SEARCH_CONFIG}', song_content, {query}, "
+                    f"'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxWords={SNIPPET_WORDS}, MinWords=5')"
+                ),
+            },
+            select_params=[text, text],
+        ).order_by('rank', '-id')
+
+    # Other databases have no full-text index: fall back to substring matching
+    return queryset.filter(
+        Q(title__icontains=text) | Q(author__icontains=text) | Q(song_content__icontains=text)
+    ).order_by('-id')
+
+
+def highlight(snippet):
+    """
+    A raw search snippet as HTML: the lyrics escaped and the hits wrapped in <mark>.
+    """
+    return escape(snippet).replace(HIT_START, '<mark>').replace(HIT_END, '</mark>')
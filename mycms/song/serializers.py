@@ -2,22 +2,36 @@ from rest_framework import serializers
 from .models import ChoirSong
 from accounts.models import ChurchAccount, ChoirDirectorAccount
 from rest_framework.exceptions import PermissionDenied
+from accounts.fieldsets import SparseFieldsetMixin
+from .search import highlight
 
 
 
-class SongSerializer(serializers.ModelSerializer):
+class SnippetField(serializers.CharField):
+    """
+    A search snippet as HTML: escaped lyrics with the hits wrapped in <mark>.
+    """
+
+    def to_representation(self, value):
+        return highlight(super().to_representation(value))
+
+
+class SongSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Highlighted lyrics excerpt, only present in search results (?q=)
+    snippet = SnippetField(read_only=True)
+
     class Meta:
         model = ChoirSong
-        fields = ['id', 'church', 'author', 'title', 'song_content', 'is_deleted', 'created_at', 'updated_at']
+        fields = ['id', 'church', 'author', 'title', 'song_content', 'snippet', 'is_deleted', 'created_at', 'updated_at']
         
         read_only_fields = ['is_deleted', 'church', 'created_at', 'updated_at']
 
     def create(self, validated_data):
         # Retrieve the church passed in the context
-        church_account = self.context.get("church", None)
-        if not church_account:
+        church_id = self.context.get("church_id", None)
+        if not church_id:
             raise serializers.ValidationError("Church information is missing in the context.")
 
         # Set the church field for the new member
-        validated_data['church'] = church_account
+        validated_data['church_id'] = church_id
         return super().create(validated_data)
\ No newline at end of file
@@ -1,3 +1,89 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from accounts.membership import membership_cache
+from accounts.testing import create_church
+from .models import ChoirSong
+
+
+class SongSearchTests(APITestCase):
+    url = '/song/api/songs/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.client.force_authenticate(self.church.church_admin)
+        self.in_lyrics = ChoirSong.objects.create(
+            church=self.church, title='Morning Hymn', song_content='Great is thy faithfulness, O God my Father',
+        )
+        self.in_title = ChoirSong.objects.create(
+            church=self.church, title='Great Is Thy Faithfulness', author='Chisholm', song_content='Morning by morning',
+        )
+        ChoirSong.objects.create(church=create_church('Bethel'), title='Faithfulness', song_content='Another church')
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {'q': text, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self.search('faithful')
+        # Title hits outrank lyrics hits; the last word matches as a prefix; other churches' songs are left out
+        self.assertEqual([song['id'] for song in results], [self.in_title.pk, self.in_lyrics.pk])
+        self.assertIn('<mark>faithfulness</mark>', results[1]['snippet'])
+
+    def test_snippets_escape_the_lyrics(self):
+        ChoirSong.objects.create(church=self.church, title='Hymn', song_content='<script>alert(1)</script> faithful & true')
+        snippet = self.search('faithful true')[0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertIn('<mark>faithful</mark> &amp; <mark>true</mark>', snippet)
+
+    def test_index_follows_writes(self):
+        self.in_lyrics.song_content = 'Amazing grace how sweet the sound'
+        self.in_lyrics.save()
+        self.assertEqual([song['id'] for song in self.search('faithfulness')], [self.in_title.pk])
+        self.assertEqual([song['id'] for song in self.search('amazing grace')], [self.in_lyrics.pk])
+
+        self.in_lyrics.delete()
+        self.assertEqual(self.search('amazing'), [])
+
+    def test_search_cannot_be_paged_by_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'faithful', 'pagination': 'cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'faithful', 'cursor': 'abc'}).status_code, 400)
+        self.assertEqual(len(self.search('faithful', page=1, page_size=1)), 1)
+
+
+class SongFieldsetTests(APITestCase):
+    url = '/song/api/songs/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        self.client.force_authenticate(self.church.church_admin)
+        self.song = ChoirSong.objects.create(church=self.church, title='Morning Hymn', author='Wesley', song_content='Lyrics')
+
+    def fields(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return set(response.data['results'][0])
+
+    def test_list_renders_the_summary_unless_asked(self):
+        # The snippet is only rendered for search results
+        self.assertEqual(self.fields(self.url), {'id', 'church', 'author', 'title', 'created_at', 'updated_at'})
+        self.assertIn('song_content', self.fields(self.url, fields='*'))
+        self.assertEqual(self.fields(self.url, fields='id,title,song_content'), {'id', 'title', 'song_content'})
+        self.assertEqual(self.fields(self.url, fields='id,title,author', omit='author'), {'id', 'title'})
+
+    def test_unrequested_columns_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.fields(self.url, fields='id,title')
+        select = next(query['sql'] for query in queries if 'FROM "song_choirsong"' in query['sql'] and 'COUNT' not in query['sql'])
+        self.assertNotIn('song_content', select)
+        self.assertNotIn('author', select)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(self.url, {'fields': 'id,lyrics', 'omit': 'colour'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'fields', 'omit'})
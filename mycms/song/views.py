@@ -8,8 +8,13 @@ from .serializers import SongSerializer
 from accounts.models import ChurchAccount, ChoirMemberAccount, ChoirDirectorAccount, SecretaryAccount
 from django.core.exceptions import PermissionDenied
 from rest_framework import generics
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from accounts.views import CustomPagination
+from accounts.prefetch import SerializerRelatedMixin
+from accounts.exports import ExportMixin
+from accounts.versions import conditional_get
+from .search import search_songs
+from accounts.membership import CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER
 
     
 
@@ -27,26 +32,18 @@ class SongCreateView(APIView):
         if request.user.is_superuser:
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on ChoirMemberAccount.")
 
-        # Retrieve the ChurchAccount based on the logged-in user
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=request.user)
-        except ChurchAccount.DoesNotExist:
-            # If not a church admin, check if they are a church secretary
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=request.user)
-                church_account = choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                return Response(
-                    {"detail": "You are not associated with any church."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Retrieve the ChurchAccount based on the logged-in user (church admin or choir director)
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            return Response(
+                {"detail": "You are not associated with any church."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": membership.church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -55,41 +52,35 @@ class SongCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class SongListView(generics.ListAPIView):
+class SongListView(ExportMixin, SerializerRelatedMixin, generics.ListAPIView):
     """
     View to retrieve all songs with pagination.
     Church Admin, Secretary, Choir Director, and Choir Members can access this view.
+    `?q=` searches title, author and lyrics, ranked by relevance, with a highlighted `snippet` per song;
+    search results are paged by page number, as cursor pages would lose the ranking.
+    Songs are listed without their lyrics; ask for them with `?fields=*` or `?fields=id,title,song_content`.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = SongSerializer
     pagination_class = CustomPagination  
+    summary_fields = ['id', 'church', 'author', 'title', 'snippet', 'created_at', 'updated_at']
+    export_fields = [
+        'id', 'title', 'author', 'song_content', 'is_deleted', 'created_at',
+    ]
+    export_filename = 'songs'
+
+    @conditional_get('songs')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
         # Determine the church account based on the user role
-        church_account = None
-        try:
-            # Check if the user is a church admin
-            church_account = ChurchAccount.objects.get(church_admin=self.request.user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                secretary_account = SecretaryAccount.objects.get(user=self.request.user)
-                church_account = secretary_account.church
-            except SecretaryAccount.DoesNotExist:
-                # Check if the user is a choir director
-                try:
-                    choir_director_account = ChoirDirectorAccount.objects.get(user=self.request.user)
-                    church_account = choir_director_account.church
-                except ChoirDirectorAccount.DoesNotExist:
-                    # Check if the user is a choir member
-                    try:
-                        choir_member_account = ChoirMemberAccount.objects.get(user=self.request.user)
-                        church_account = choir_member_account.church
-                    except ChoirMemberAccount.DoesNotExist:
-                        raise PermissionDenied("You do not have permission to view songs.")
+        membership = self.request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY, CHOIR_DIRECTOR, CHOIR_MEMBER):
+            raise PermissionDenied("You do not have permission to view songs.")
 
         # Retrieve all songs associated with the church
-        songs = ChoirSong.objects.filter(church=church_account)
+        songs = ChoirSong.objects.filter(church_id=membership.church_id)
 
         # Apply search filters based on query parameters
         title = self.request.query_params.get('title', None)
@@ -100,6 +91,15 @@ class SongListView(generics.ListAPIView):
         if author:
             songs = songs.filter(author__icontains=author)
 
+        # Full-text search over title, author and lyrics, best match first
+        q = self.request.query_params.get('q', None)
+        if q:
+            # Keyset pages are ordered by (created_at, id), not by rank
+            params = self.request.query_params
+            if params.get('cursor') or params.get('pagination') == 'cursor':
+                raise ValidationError({"q": ["Search results are paged with ?page=, not ?cursor= or ?pagination=cursor."]})
+            songs = search_songs(songs, q)
+
         return songs
 
 
@@ -111,36 +111,32 @@ class SongDetailUpdateDeleteView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = SongSerializer
 
-    def get_church(self, user):
+    def get_church(self, request):
         """
-        Helper method to get the church account associated with the user.
+        Helper method to get the id of the church associated with the user.
         """
-        try:
-            # Check if the user is a church admin
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            # Check if the user is a secretary
-            try:
-                choir_director = ChoirDirectorAccount.objects.get(user=user)
-                return choir_director.church
-            except ChoirDirectorAccount.DoesNotExist:
-                raise PermissionDenied("You do not have permission to manage songs.")
-
-    def get_object(self, pk, church):
+        # Only the church admin and choir director can manage songs
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, CHOIR_DIRECTOR):
+            raise PermissionDenied("You do not have permission to manage songs.")
+        return membership.church_id
+
+    def get_object(self, pk, church_id):
         """
         Helper method to get the ChoirSong object and ensure it belongs to the church.
         """
         try:
-            return ChoirSong.objects.get(id=pk, church=church)
+            return ChoirSong.objects.get(id=pk, church_id=church_id)
         except ChoirSong.DoesNotExist:
             raise NotFound("Song not found or you do not have permission to access this record.")
 
+    @conditional_get('songs', roles=(CHURCH_ADMIN, CHOIR_DIRECTOR))
     def get(self, request, pk):
         """
         Retrieve a song by their ID.
         """
-        church = self.get_church(request.user)
-        song = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        song = self.get_object(pk, church_id)
         serializer = SongSerializer(song)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -148,8 +144,8 @@ class SongDetailUpdateDeleteView(APIView):
         """
         Update a song's information.
         """
-        church = self.get_church(request.user)
-        song = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        song = self.get_object(pk, church_id)
         serializer = SongSerializer(song, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -160,7 +156,7 @@ class SongDetailUpdateDeleteView(APIView):
         """
         Delete a song.
         """
-        church = self.get_church(request.user)
-        song = self.get_object(pk, church)
+        church_id = self.get_church(request)
+        song = self.get_object(pk, church_id)
         song.delete()
         return Response({"detail": "Song has been deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
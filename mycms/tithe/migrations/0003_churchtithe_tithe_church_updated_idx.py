@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('tithe', '0002_churchtithe_tithe_church_deleted_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='churchtithe',
+            index=models.Index(fields=['church', 'updated_at', 'id'], name='tithe_church_updated_idx'),
+        ),
+    ]
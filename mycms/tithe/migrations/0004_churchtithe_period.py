@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_deletedrecord_and_more'),
+        ('tithe', '0003_churchtithe_tithe_church_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='churchtithe',
+            name='tithe_church_period_idx',
+        ),
+        migrations.AddField(
+            model_name='churchtithe',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='churchtithe',
+            index=models.Index(fields=['church', 'period'], name='tithe_church_period_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import ChurchAccount, MemberRegistration
+from accounts.periods import month_period
 from django.core.validators import MinValueValidator
 from choice.views import month_choices
 
@@ -12,6 +13,7 @@ class ChurchTithe(models.Model):
     payment_date = models.DateField()
     month = models.CharField(max_length=25, choices=month_choices)
     year = models.IntegerField()
+    period = models.DateField(null=True, blank=True, editable=False)  # First day of the month, set on save
     is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -19,6 +21,16 @@ class ChurchTithe(models.Model):
 
     def __str__(self):
         return f"{self.member.full_name}"
+
+    def save(self, *args, **kwargs):
+        self.period = month_period(self.month, self.year)
+        super().save(*args, **kwargs)
     
     class Meta:
-        unique_together = ('member', 'church')
\ No newline at end of file
+        unique_together = ('member', 'church')
+        indexes = [
+            models.Index(fields=['church', 'is_deleted', '-created_at'], name='tithe_church_deleted_idx'),
+            models.Index(fields=['church', 'period'], name='tithe_church_period_idx'),
+            models.Index(fields=['church', '-created_at'], condition=models.Q(is_deleted=False), name='tithe_church_active_idx'),
+            models.Index(fields=['church', 'updated_at', 'id'], name='tithe_church_updated_idx'),
+        ]
\ No newline at end of file
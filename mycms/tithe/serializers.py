@@ -3,23 +3,25 @@ from .models import ChurchTithe
 from datetime import date
 from choice.views import month_choices
 from accounts.models import ChurchAccount, SecretaryAccount
+from accounts.membership import CHURCH_ADMIN, SECRETARY
+from accounts.fieldsets import SparseFieldsetMixin
 
 
-class TitheSerializer(serializers.ModelSerializer):
+class TitheSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     month = serializers.ChoiceField(choices=month_choices)
 
     class Meta:
         model = ChurchTithe
         fields = ['id', 'church', 'member', 'usd_amount', 'lrd_amount', 'payment_date',
-                  'month', 'year', 'is_deleted', 'created_at', 'updated_at']
+                  'month', 'year', 'period', 'is_deleted', 'created_at', 'updated_at']
         
-        read_only_fields = ['is_deleted', 'church', 'created_at', 'updated_at']
+        read_only_fields = ['period', 'is_deleted', 'church', 'created_at', 'updated_at']
 
     def create(self, validated_data):
         # Ensure that the church is set here when creating a tithe
-        user = self.context['request'].user  # Access the logged-in user
-        church_account = self.get_church_account(user)  # Get the church account
-        validated_data['church'] = church_account  # Set the church field programmatically
+        request = self.context['request']  # Access the logged-in user's request
+        church_id = self.get_church_id(request)  # Get the church id
+        validated_data['church_id'] = church_id  # Set the church field programmatically
         return super().create(validated_data)
 
     def validate_payment_date(self, value):
@@ -28,19 +30,11 @@ class TitheSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("The payment date cannot be in the future.")
         return value
 
-    def get_church_account(self, user):
+    def get_church_id(self, request):
         """
-        Retrieve the ChurchAccount for the user, whether they are a church admin or secretary.
+        Retrieve the id of the church of the user, whether they are a church admin or secretary.
         """
-        # Check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            pass  # Continue to check if the user is a secretary
-
-        # Check if the user is a church secretary
-        try:
-            secretary_account = SecretaryAccount.objects.get(user=user)
-            return secretary_account.church
-        except SecretaryAccount.DoesNotExist:
-            raise serializers.ValidationError("You are not associated with any church.")
\ No newline at end of file
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            raise serializers.ValidationError("You are not associated with any church.")
+        return membership.church_id
\ No newline at end of file
@@ -1,3 +1,48 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from accounts import values
+from accounts.membership import membership_cache
+from accounts.testing import create_church, create_member
+from .models import ChurchTithe
+from .serializers import TitheSerializer
+
+
+class TitheListValuesTests(APITestCase):
+    url = '/tithe/api/tithes/'
+
+    def setUp(self):
+        membership_cache.clear()
+        self.church = create_church()
+        for usd, lrd, month in [(Decimal('10.5'), None, 'May'), (Decimal('0'), Decimal('1500.25'), 'June')]:
+            ChurchTithe.objects.create(
+                church=self.church, member=create_member(self.church), usd_amount=usd, lrd_amount=lrd,
+                payment_date=datetime.date(2026, 6, 1), month=month, year=2026,
+            )
+        self.client.force_authenticate(self.church.church_admin)
+
+    def serialized(self, fields=None):
+        request = Request(APIRequestFactory().get(self.url))
+        tithes = ChurchTithe.objects.filter(church=self.church)
+        return {row['id']: row for row in TitheSerializer(tithes, many=True, context={'request': request, 'fields': fields}).data}
+
+    def listed(self, **params):
+        with mock.patch('accounts.values.build_rows', wraps=values.build_rows) as build_rows:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        # The rows came from values(), not from the serializer
+        build_rows.assert_called_once()
+        return {row['id']: row for row in response.data['results']}
+
+    def test_rows_match_the_serializer(self):
+        listed = self.listed()
+        self.assertEqual(listed, self.serialized())
+        # Decimals keep their two places, as DRF renders them
+        self.assertEqual({row['usd_amount'] for row in listed.values()}, {'10.50', '0.00'})
+
+    def test_sparse_rows_match_the_serializer(self):
+        self.assertEqual(self.listed(fields='id,usd_amount,period,created_at'), self.serialized(('id', 'usd_amount', 'period', 'created_at')))
@@ -9,6 +9,10 @@ from accounts.models import ChurchAccount, SecretaryAccount
 from django.core.exceptions import PermissionDenied
 from rest_framework import generics
 from accounts.views import CustomPagination
+from accounts.exports import ExportMixin
+from accounts.values import ValuesListMixin
+from accounts.periods import filter_by_period
+from accounts.membership import CHURCH_ADMIN, SECRETARY
 
     
 
@@ -27,17 +31,17 @@ class TitheCreateView(APIView):
             raise PermissionDenied("Superusers are not allowed to perform CRUD operations on Tithe.")
 
         # Retrieve the ChurchAccount based on the logged-in user
-        church_account = self.get_church_account(request.user)
-        if not church_account:
+        church_id = self.get_church_id(request)
+        if not church_id:
             return Response(
                 {"detail": "You are not associated with any church."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Pass both the request and ChurchAccount instance to the serializer
+        # Pass both the request and the church id to the serializer
         serializer = self.serializer_class(
             data=request.data,
-            context={"church": church_account, "request": request},
+            context={"church_id": church_id, "request": request},
         )
 
         if serializer.is_valid():
@@ -46,60 +50,49 @@ class TitheCreateView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    def get_church_account(self, user):
+    def get_church_id(self, request):
         """
-        Retrieve the ChurchAccount for the user, whether they are a church admin or secretary.
+        Retrieve the id of the church of the user, whether they are a church admin or secretary.
         """
-        # Check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            pass  # Continue to check if the user is a secretary
-
-        # Check if the user is a church secretary
-        try:
-            secretary_account = SecretaryAccount.objects.get(user=user)
-            return secretary_account.church
-        except SecretaryAccount.DoesNotExist:
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
             return None
+        return membership.church_id
 
-class TitheListView(generics.ListAPIView):
+class TitheListView(ExportMixin, ValuesListMixin, generics.ListAPIView):
     """
     Retrieve all tithes for the church associated with the logged-in user with pagination.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = TitheSerializer
     pagination_class = CustomPagination  # Enable pagination
+    export_fields = [
+        'id', 'member__full_name', 'usd_amount', 'lrd_amount', 'payment_date', 'month', 'year', 'period',
+        'is_deleted', 'created_at',
+    ]
+    export_filename = 'tithes'
 
     def get_queryset(self):
         """
-        Get all tithes for the church the user belongs to.
+        Get all tithes for the church the user belongs to, narrowed and sorted by month (see accounts.periods).
         """
-        church_account = self.get_church_account(self.request.user)
-        if not church_account:
+        church_id = self.get_church_id(self.request)
+        if not church_id:
             raise PermissionDenied("You are not associated with any church.")
 
         # Get all tithes related to the church account
-        tithes = ChurchTithe.objects.filter(church=church_account)
+        tithes = ChurchTithe.objects.filter(church_id=church_id)
 
-        return tithes
+        return filter_by_period(tithes, self.request.query_params)
 
-    def get_church_account(self, user):
+    def get_church_id(self, request):
         """
-        Retrieve the ChurchAccount for the user, whether they are a church admin or secretary.
+        Retrieve the id of the church of the user, whether they are a church admin or secretary.
         """
-        # Check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            pass  # Continue to check if the user is a secretary
-
-        # Check if the user is a church secretary
-        try:
-            secretary_account = SecretaryAccount.objects.get(user=user)
-            return secretary_account.church
-        except SecretaryAccount.DoesNotExist:
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
             return None
+        return membership.church_id
 
 class TitheDetailUpdateDeleteView(APIView):
     """
@@ -117,8 +110,8 @@ class TitheDetailUpdateDeleteView(APIView):
             return Response({"detail": "Tithe not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has permission to access this tithe
-        church_account = self.get_church_account(request.user)
-        if church_account != tithe.church:
+        church_id = self.get_church_id(request)
+        if church_id != tithe.church_id:
             raise PermissionDenied("You do not have permission to access this tithe.")
 
         # Serialize the tithe and return it
@@ -134,8 +127,8 @@ class TitheDetailUpdateDeleteView(APIView):
             return Response({"detail": "Tithe not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has permission to update this tithe
-        church_account = self.get_church_account(request.user)
-        if church_account != tithe.church:
+        church_id = self.get_church_id(request)
+        if church_id != tithe.church_id:
             raise PermissionDenied("You do not have permission to update this tithe.")
 
         # Serialize and update the tithe record
@@ -154,8 +147,8 @@ class TitheDetailUpdateDeleteView(APIView):
             return Response({"detail": "Tithe not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has permission to delete this tithe
-        church_account = self.get_church_account(request.user)
-        if church_account != tithe.church:
+        church_id = self.get_church_id(request)
+        if church_id != tithe.church_id:
             raise PermissionDenied("You do not have permission to delete this tithe.")
 
         # Delete the tithe
@@ -171,19 +164,11 @@ class TitheDetailUpdateDeleteView(APIView):
         except ChurchTithe.DoesNotExist:
             return None
 
-    def get_church_account(self, user):
+    def get_church_id(self, request):
         """
-        Retrieve the ChurchAccount for the user, whether they are a church admin or secretary.
+        Retrieve the id of the church of the user, whether they are a church admin or secretary.
         """
-        # Check if the user is a church admin
-        try:
-            return ChurchAccount.objects.get(church_admin=user)
-        except ChurchAccount.DoesNotExist:
-            pass  # Continue to check if the user is a secretary
-
-        # Check if the user is a church secretary
-        try:
-            secretary_account = SecretaryAccount.objects.get(user=user)
-            return secretary_account.church
-        except SecretaryAccount.DoesNotExist:
-            return None
\ No newline at end of file
+        membership = request.church_membership
+        if not membership.allows(CHURCH_ADMIN, SECRETARY):
+            return None
+        return membership.church_id
\ No newline at end of file